@@ -9,12 +9,30 @@ from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import os
 import ast
 import base64 # Needed for potential image embedding if required
+from feedback_mining.schema import read_review_table
+from feedback_mining.segments import build_bitmap_index, select_rows
+from feedback_mining.query import to_arrow_table
+from feedback_mining.coherence import binary_document_term_matrix, topic_coherence
+from feedback_mining.doc_topics import ensure_doc_topic_matrix
+from feedback_mining.aspects import load_aspect_sentiment
+from feedback_mining.network_analytics import annotate_network, has_network_analytics
+from feedback_mining.topic_network import PROBABILITY_THRESHOLD, topic_network_at_threshold
+from feedback_mining.findings import summarize_findings
+from feedback_mining.bootstrap import topic_intervals
+from feedback_mining.term_network import load_term_network
+from feedback_mining.artifacts import resolve_artifacts
+from feedback_mining.vocabulary import load_trie_vectorizer
+from feedback_mining.memory import MemoryLedger, default_rss_budget, track_cache_entries
+from feedback_mining.execution import WorkerPool, pin_single_process
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from feedback_mining.wordclouds import wordcloud_paths
 
 # --- Mock ui_sections if they don't exist ---
 # (Ideally, these should be in a separate ui_sections.py file)
 try:
     from ui_sections import executive_summary_view, sentiment_view, topic_modeling_view, \
-                            network_view, recommendations_view, about_me_view
+                            network_view, recommendations_view, about_me_view, segment_filter_bar, \
+                            explore_view, memory_panel
 except ImportError:
     st.warning("Could not import `ui_sections`. Using mock functions.")
     class MockView:
@@ -23,14 +41,20 @@ except ImportError:
         def render_sentiment_analysis(self, *args, **kwargs): st.header("Sentiment Analysis")
         def render_topic_modeling(self, *args, **kwargs): st.header("Topic Modeling")
         def render_network_analysis(self, *args, **kwargs): st.header("Network Analysis")
+        def render_explore(self, *args, **kwargs): st.header("Explore")
         def render_recommendations(self, *args, **kwargs): st.header("Recommendations")
         def render_about_me(self, *args, **kwargs): st.header("About Me")
+        def render_segment_filter_bar(self, *args, **kwargs): return {}
+        def render_memory_panel(self, *args, **kwargs): pass
     executive_summary_view = MockView()
     sentiment_view = MockView()
     topic_modeling_view = MockView()
     network_view = MockView()
     recommendations_view = MockView()
     about_me_view = MockView()
+    memory_panel = MockView()
+    segment_filter_bar = MockView()
+    explore_view = MockView()
 # --- End Mock ---
 
 
@@ -45,7 +69,34 @@ DATA_FILE_PATH = os.path.join(DATA_DIR, 'reviews_final_for_streamlit.csv')
 TFIDF_VECTORIZER_PATH = os.path.join(ARTIFACTS_DIR, 'tfidf_vectorizer.joblib')
 LDA_MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'lda_model.joblib')
 FEATURE_NAMES_PATH = os.path.join(ARTIFACTS_DIR, 'tfidf_feature_names.joblib')
+VOCABULARY_TRIE_PATH = os.path.join(ARTIFACTS_DIR, 'tfidf_vocabulary.marisa')
+VOCABULARY_INDEX_PATH = os.path.join(ARTIFACTS_DIR, 'tfidf_vocabulary_index.npz')
+DOC_TOPIC_MATRIX_PATH = os.path.join(ARTIFACTS_DIR, 'doc_topic_matrix.npy')
+ASPECT_SENTIMENT_PATH = os.path.join(ARTIFACTS_DIR, 'aspect_sentiment.npz')
+STREAM_STATE_PATH = os.path.join(DATA_DIR, 'stream_aggregates.json') # Written by feedback_mining/streaming.py
 NETWORK_GRAPH_PATH = os.path.join(ARTIFACTS_DIR, 'topic_network.gexf')
+TERM_NETWORK_PATH = os.path.join(ARTIFACTS_DIR, 'term_network.npz')
+
+# --- Current Release (re-read on every rerun; see feedback_mining/artifacts.py) ---
+# The pipeline publishes each release to 'artifacts/releases/<version>/' and points 'artifacts/manifest.json' at it.
+# Without a manifest the fixed paths above are used, versioned by file size and modification time.
+# The doc-topic matrix is left out: the app writes it itself (see ensure_doc_topic_matrix), which must not trigger a reload.
+ARTIFACT_VERSION, ARTIFACT_PATHS = resolve_artifacts(ARTIFACTS_DIR, {
+    'data': DATA_FILE_PATH, 'vectorizer': TFIDF_VECTORIZER_PATH, 'lda_model': LDA_MODEL_PATH,
+    'feature_names': FEATURE_NAMES_PATH, 'doc_topic': DOC_TOPIC_MATRIX_PATH, 'aspects': ASPECT_SENTIMENT_PATH,
+    'network': NETWORK_GRAPH_PATH, 'vocabulary_trie': VOCABULARY_TRIE_PATH, 'vocabulary_index': VOCABULARY_INDEX_PATH,
+    'term_network': TERM_NETWORK_PATH,
+}, unversioned=('doc_topic',))
+DATA_FILE_PATH = ARTIFACT_PATHS['data']
+TFIDF_VECTORIZER_PATH = ARTIFACT_PATHS['vectorizer']
+LDA_MODEL_PATH = ARTIFACT_PATHS['lda_model']
+FEATURE_NAMES_PATH = ARTIFACT_PATHS['feature_names']
+VOCABULARY_TRIE_PATH = ARTIFACT_PATHS['vocabulary_trie']
+VOCABULARY_INDEX_PATH = ARTIFACT_PATHS['vocabulary_index']
+DOC_TOPIC_MATRIX_PATH = ARTIFACT_PATHS['doc_topic']
+ASPECT_SENTIMENT_PATH = ARTIFACT_PATHS['aspects']
+NETWORK_GRAPH_PATH = ARTIFACT_PATHS['network']
+TERM_NETWORK_PATH = ARTIFACT_PATHS['term_network']
 PROJECT_LOGO_FILENAME = "logo.png"
 PROJECT_LOGO_PATH = os.path.join(ASSETS_DIR, PROJECT_LOGO_FILENAME)
 
@@ -85,12 +136,13 @@ st.set_page_config(
 )
 
 # --- Project Specific Configurations ---
-NUM_TOPICS = 7
-topic_labels_dict = {
+NUM_TOPICS = 7 # Replaced by the loaded LDA model's topic count (see feedback_mining/topic_sweep.py)
+CURATED_TOPIC_LABELS = { # Hand-written labels for the 7-topic model
     1: "👚 Sizing & Fit", 2: "💖 Style & Appearance", 3: "🧵 Fabric & Material",
     4: "😌 Comfort & Wear", 5: "💰 Value & Returns", 6: "🎨 Color & Print",
     7: "💯 Overall Satisfaction"
 }
+topic_labels_dict = CURATED_TOPIC_LABELS
 
 # --- Page Definitions for option_menu ---
 PAGES = {
@@ -98,6 +150,7 @@ PAGES = {
     "Sentiment": {"func": sentiment_view.render_sentiment_analysis, "icon": "emoji-smile", "args": (None,)}, # Analyzer will be passed later
     "Topics": {"func": topic_modeling_view.render_topic_modeling, "icon": "tags", "args": (None, None, NUM_TOPICS, topic_labels_dict)}, # Models passed later
     "Network": {"func": network_view.render_network_analysis, "icon": "diagram-3", "args": (None, NUM_TOPICS, topic_labels_dict, None)}, # Graph/DF passed later
+    "Explore": {"func": explore_view.render_explore, "icon": "table", "args": (None, None, topic_labels_dict)}, # Query table/segment rows passed later
     "Recommendations": {"func": recommendations_view.render_recommendations, "icon": "lightbulb", "args": (NUM_TOPICS, topic_labels_dict)},
     "About Me": {"func": about_me_view.render_about_me, "icon": "person-circle", "args": (BASE_DIR, ASSETS_DIR)},
 }
@@ -105,11 +158,44 @@ PAGE_NAMES = list(PAGES.keys())
 PAGE_ICONS = [PAGES[p]["icon"] for p in PAGE_NAMES]
 
 
+# --- Memory accounting (see feedback_mining/memory.py) ---
+# Budgets in MB; the RSS budget defaults to 80% of the container memory limit, if there is one.
+RSS_BUDGET_MB = float(os.environ.get('FEEDBACK_MINING_RSS_BUDGET_MB', 0)) or None
+CACHE_BUDGET_MB = float(os.environ.get('FEEDBACK_MINING_CACHE_BUDGET_MB', 0)) or None
+
+@st.cache_resource
+def memory_ledger():
+    # Process-wide ledger of cache entries and sessions; its thread samples RSS and evicts over-budget caches.
+    ledger = MemoryLedger(rss_budget=int(RSS_BUDGET_MB * 1e6) if RSS_BUDGET_MB else default_rss_budget(),
+                          cache_budget=int(CACHE_BUDGET_MB * 1e6) if CACHE_BUDGET_MB else None)
+    ledger.start_sampler()
+    return ledger
+
+MEMORY_LEDGER = memory_ledger()
+MEMORY_LEDGER.enforce() # Before loading, so evictions make room for this run
+
+# Worker threads and BLAS threads per worker; by default min(4, CPUs) workers sharing the CPUs.
+POOL_WORKERS = int(os.environ.get('FEEDBACK_MINING_POOL_WORKERS', 0)) or None
+BLAS_THREADS = int(os.environ.get('FEEDBACK_MINING_BLAS_THREADS', 0)) or None
+
+@st.cache_resource
+def worker_pool():
+    # Process-wide pool for heavy model and analytics calls, shared by every session.
+    return WorkerPool(max_workers=POOL_WORKERS, blas_threads=BLAS_THREADS)
+
+WORKER_POOL = worker_pool()
+
+def run_heavy(func, *args, **kwargs):
+    # Runs a heavy call on the shared pool, queued behind the calling session's own calls.
+    ctx = get_script_run_ctx()
+    return WORKER_POOL.run(func, *args, session_id=ctx.session_id if ctx is not None else None, **kwargs)
+
 # --- Caching Functions (Keep as is) ---
+@track_cache_entries(MEMORY_LEDGER, 'cache_data')
 @st.cache_data
 def load_dataframe(file_path):
     try:
-        df = pd.read_csv(file_path)
+        df = read_review_table(file_path) # Compact runtime dtypes; unused columns are skipped
         list_like_cols = ['processed_tokens', 'active_lda_topics_above_threshold']
         for col in list_like_cols:
             if col in df.columns and not df[col].empty and df[col].dtype == 'object':
@@ -117,19 +203,27 @@ def load_dataframe(file_path):
                 if isinstance(first_valid_entry, str) and first_valid_entry.strip().startswith('[') and first_valid_entry.strip().endswith(']'):
                     try: df[col] = df[col].apply(lambda x: ast.literal_eval(x) if pd.notnull(x) and isinstance(x, str) else x)
                     except (ValueError, SyntaxError): pass
-        if 'dominant_lda_topic' in df.columns: df['dominant_lda_topic'] = df['dominant_lda_topic'].astype(int)
         if 'Review Text' in df.columns: df['Review Text'] = df['Review Text'].astype(str).fillna('')
         if 'processed_text_joined' in df.columns: df['processed_text_joined'] = df['processed_text_joined'].astype(str).fillna('')
         return df
-    except FileNotFoundError: st.error(f"FATAL ERROR: Main data file ('{os.path.basename(DATA_FILE_PATH)}') missing from '{DATA_DIR}'. App cannot function."); return None
+    except FileNotFoundError: st.error(f"FATAL ERROR: Main data file ('{os.path.basename(file_path)}') missing from '{os.path.dirname(file_path)}'. App cannot function."); return None
     except Exception as e: st.error(f"Fatal Error loading data from '{file_path}': {e}"); return None
 
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
 @st.cache_resource
 def load_sklearn_model(file_path, model_name="Model"):
-    try: return joblib.load(file_path)
-    except FileNotFoundError: st.error(f"FATAL ERROR: {model_name} file ('{os.path.basename(file_path)}') missing from '{ARTIFACTS_DIR}'. App cannot function."); return None
+    try: return pin_single_process(joblib.load(file_path)) # In-app calls run on the worker pool, not joblib workers
+    except FileNotFoundError: st.error(f"FATAL ERROR: {model_name} file ('{os.path.basename(file_path)}') missing from '{os.path.dirname(file_path)}'. App cannot function."); return None
     except Exception as e: st.error(f"Fatal Error loading {model_name} from '{file_path}': {e}"); return None
 
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_trie_vocabulary(trie_path, index_path):
+    # Memory-mapped trie vocabulary: replaces both the pickled vectorizer and the feature-name array.
+    try: return load_trie_vectorizer(trie_path, index_path)
+    except Exception as e: st.warning(f"Could not load the trie vocabulary from '{trie_path}': {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
 @st.cache_resource
 def load_networkx_graph(file_path):
     try:
@@ -139,16 +233,117 @@ def load_networkx_graph(file_path):
             if relabel_mapping: graph = nx.relabel_nodes(graph, relabel_mapping, copy=True)
         elif file_path.endswith('.joblib'): graph = joblib.load(file_path)
         else: st.error(f"Unsupported graph file format: {file_path}."); return None
+        if not has_network_analytics(graph): graph = annotate_network(graph) # Graph saved before the 'network_analytics' stage (no edge lift)
         return graph
-    except FileNotFoundError: st.error(f"FATAL ERROR: Network graph ('{os.path.basename(NETWORK_GRAPH_PATH)}') missing from '{ARTIFACTS_DIR}'. App cannot function."); return None
-    except Exception as e: st.error(f"Fatal Error loading graph from '{NETWORK_GRAPH_PATH}': {e}"); return None
+    except FileNotFoundError: st.error(f"FATAL ERROR: Network graph ('{os.path.basename(file_path)}') missing from '{os.path.dirname(file_path)}'. App cannot function."); return None
+    except Exception as e: st.error(f"Fatal Error loading graph from '{file_path}': {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_term_network_arrays(file_path):
+    # Optional artifact from the pipeline's 'term_network' stage; None if it has not been published.
+    if not os.path.exists(file_path): return None
+    try: return load_term_network(file_path)
+    except Exception as e: st.warning(f"Could not load the keyword network from '{file_path}': {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_segment_index(_df, file_path):
+    # Keyed by the data file path; '_df' is the cached frame loaded from it.
+    return build_bitmap_index(_df)
+
+# Streamlit keeps at most this many filtered segments / topic-network graphs; the memory ledger mirrors the caps.
+SEGMENT_CACHE_ENTRIES = 32
+TOPIC_NETWORK_CACHE_ENTRIES = 64
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource', max_entries=SEGMENT_CACHE_ENTRIES)
+@st.cache_resource(max_entries=SEGMENT_CACHE_ENTRIES)
+def select_segment(_df, _segment_index, file_path, selection_key):
+    # 'selection_key' is a hashable form of the filter bar selections.
+    row_positions = select_rows(_segment_index, dict(selection_key))
+    return _df if row_positions is None else _df.iloc[row_positions]
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_query_table(_df, file_path):
+    # Arrow form of the review table for the Explore page's query engine.
+    try: return to_arrow_table(_df)
+    except Exception as e: st.error(f"Error building query table from '{file_path}': {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_data')
+@st.cache_data
+def load_topic_coherence(_lda_model, _vectorizer, _df, file_path, model_path):
+    # Per-topic UMass/NPMI of the loaded model over the full review table, keyed by the data and model paths.
+    try:
+        def coherence():
+            presence = binary_document_term_matrix(_vectorizer.transform(_df['processed_text_joined']))
+            return topic_coherence(_lda_model.components_, presence)
+        return run_heavy(coherence)
+    except Exception as e: st.warning(f"Could not compute topic coherence: {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_doc_topic_matrix(_lda_model, _vectorizer, _df, file_path, data_path):
+    # Memory-mapped float32 doc-topic matrix aligned to the data rows; rebuilt from the models if missing or stale.
+    try: return run_heavy(ensure_doc_topic_matrix, file_path, _lda_model, _vectorizer, _df['processed_text_joined'])
+    except Exception as e: st.warning(f"Could not load the document-topic matrix: {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource')
+@st.cache_resource
+def load_aspect_sentiment_arrays(file_path, n_rows):
+    # Optional artifact from the pipeline's 'aspects' stage; None if missing or built for other data.
+    try: return load_aspect_sentiment(file_path, n_rows)
+    except Exception as e: st.warning(f"Could not load aspect sentiment from '{file_path}': {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_resource', max_entries=TOPIC_NETWORK_CACHE_ENTRIES)
+@st.cache_resource(max_entries=TOPIC_NETWORK_CACHE_ENTRIES)
+def load_topic_network_at_threshold(_doc_topic, _row_positions, file_path, selection_key, threshold):
+    # One graph per (data file, segment selection, threshold); '_row_positions' are the rows 'selection_key' selects.
+    return run_heavy(topic_network_at_threshold, _doc_topic, threshold, _row_positions)
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_data')
+@st.cache_data
+def load_findings(_df, _graph, file_path, selection_key, num_topics):
+    # Summary/Recommendations findings, one entry per (data file, segment selection, topic count).
+    try: return run_heavy(summarize_findings, _df, num_topics, _graph)
+    except Exception as e: st.warning(f"Could not compute the findings: {e}"); return None
+
+@track_cache_entries(MEMORY_LEDGER, 'cache_data')
+@st.cache_data
+def load_topic_intervals(_df, file_path, selection_key, num_topics):
+    # Bootstrap intervals of per-topic mean compound/rating, one entry per (data file, segment selection, topic count).
+    try: return run_heavy(topic_intervals, _df, num_topics)
+    except Exception as e: st.warning(f"Could not compute the topic confidence intervals: {e}"); return None
+
+@st.cache_resource
+def loaded_artifact_version():
+    # Process-wide record of the release the caches above hold.
+    return {'version': None}
+
+# --- Hot reload: a new release replaces the cached artifacts of the previous one ---
+artifact_tracker = loaded_artifact_version()
+if artifact_tracker['version'] != ARTIFACT_VERSION:
+    # Cleared before loading, so the old and new artifacts are never held in memory together.
+    for cached_loader in [load_dataframe, load_sklearn_model, load_trie_vocabulary, load_networkx_graph, load_term_network_arrays, load_segment_index, select_segment,
+                          load_query_table, load_topic_coherence, load_doc_topic_matrix, load_aspect_sentiment_arrays,
+                          load_topic_network_at_threshold, load_findings, load_topic_intervals]:
+        cached_loader.clear()
+    artifact_tracker['version'] = ARTIFACT_VERSION
 
 # --- Load Data and Models ---
 df_processed = load_dataframe(DATA_FILE_PATH)
-tfidf_vectorizer = load_sklearn_model(TFIDF_VECTORIZER_PATH, "TF-IDF Vectorizer")
+segment_index = load_segment_index(df_processed, DATA_FILE_PATH) if df_processed is not None else None
+review_query_table = load_query_table(df_processed, DATA_FILE_PATH) if df_processed is not None else None
+tfidf_vectorizer = None
+if os.path.exists(VOCABULARY_TRIE_PATH) and os.path.exists(VOCABULARY_INDEX_PATH):
+    tfidf_vectorizer = load_trie_vocabulary(VOCABULARY_TRIE_PATH, VOCABULARY_INDEX_PATH)
+if tfidf_vectorizer is not None: feature_names = tfidf_vectorizer # Indexes like the feature-name array
+else:
+    tfidf_vectorizer = load_sklearn_model(TFIDF_VECTORIZER_PATH, "TF-IDF Vectorizer")
+    feature_names = load_sklearn_model(FEATURE_NAMES_PATH, "TF-IDF Feature Names")
 lda_model = load_sklearn_model(LDA_MODEL_PATH, "LDA Model")
-feature_names = load_sklearn_model(FEATURE_NAMES_PATH, "TF-IDF Feature Names")
 topic_network_graph = load_networkx_graph(NETWORK_GRAPH_PATH)
+term_network = load_term_network_arrays(TERM_NETWORK_PATH)
 analyzer = None
 try: analyzer = SentimentIntensityAnalyzer()
 except LookupError:
@@ -156,12 +351,26 @@ except LookupError:
     analyzer = SentimentIntensityAnalyzer()
 except Exception as e: st.error(f"VADER Analyzer init error: {e}")
 
+# --- Topic count and labels follow the active LDA model ---
+if lda_model is not None and hasattr(lda_model, 'n_components'):
+    NUM_TOPICS = int(lda_model.n_components)
+    if NUM_TOPICS != len(CURATED_TOPIC_LABELS): # Curated labels describe the 7-topic model only
+        topic_labels_dict = {topic: f"Topic {topic}" for topic in range(1, NUM_TOPICS + 1)}
+
+topic_coherence_df, doc_topic_matrix = None, None
+if all(obj is not None for obj in [df_processed, lda_model, tfidf_vectorizer]):
+    topic_coherence_df = load_topic_coherence(lda_model, tfidf_vectorizer, df_processed, DATA_FILE_PATH, LDA_MODEL_PATH)
+    doc_topic_matrix = load_doc_topic_matrix(lda_model, tfidf_vectorizer, df_processed, DOC_TOPIC_MATRIX_PATH, DATA_FILE_PATH)
+aspect_sentiment = load_aspect_sentiment_arrays(ASPECT_SENTIMENT_PATH, len(df_processed)) if df_processed is not None else None
+topic_wordcloud_paths = wordcloud_paths(ARTIFACT_PATHS, ARTIFACTS_DIR, NUM_TOPICS) # Pre-rendered images of the current release
+
 # --- Update args with loaded data ---
 if df_processed is not None:
-    PAGES["Summary"]["args"] = (df_processed, NUM_TOPICS)
+    PAGES["Summary"]["args"] = (df_processed, NUM_TOPICS, STREAM_STATE_PATH, topic_labels_dict)
     PAGES["Sentiment"]["args"] = (df_processed, analyzer)
-    PAGES["Topics"]["args"] = (df_processed, lda_model, feature_names, NUM_TOPICS, topic_labels_dict)
-    PAGES["Network"]["args"] = (topic_network_graph, NUM_TOPICS, topic_labels_dict, df_processed)
+    PAGES["Topics"]["args"] = (df_processed, lda_model, feature_names, NUM_TOPICS, topic_labels_dict, topic_coherence_df, doc_topic_matrix, aspect_sentiment, topic_wordcloud_paths,
+                               lambda: load_topic_intervals(df_processed, DATA_FILE_PATH, (), NUM_TOPICS))
+    PAGES["Network"]["args"] = (topic_network_graph, NUM_TOPICS, topic_labels_dict, df_processed, None, term_network)
 
 essential_artifacts_loaded = all(obj is not None for obj in [df_processed, lda_model, tfidf_vectorizer, feature_names, topic_network_graph, analyzer])
 
@@ -169,7 +378,8 @@ essential_artifacts_loaded = all(obj is not None for obj in [df_processed, lda_m
 # --- Global CSS Styling (MERGED & ADAPTED) ---
 HEADER_TOP_ROW_HEIGHT_PX = 85 # Increased height for more content
 HEADER_BOTTOM_ROW_HEIGHT_PX = 60
-HEADER_TOTAL_HEIGHT_PX = HEADER_TOP_ROW_HEIGHT_PX + HEADER_BOTTOM_ROW_HEIGHT_PX
+HEADER_FILTER_ROW_HEIGHT_PX = 56 if segment_index is not None else 0
+HEADER_TOTAL_HEIGHT_PX = HEADER_TOP_ROW_HEIGHT_PX + HEADER_BOTTOM_ROW_HEIGHT_PX + HEADER_FILTER_ROW_HEIGHT_PX
 FOOTER_HEIGHT_PX = 80 # Increased for multi-line footer
 
 # --- Color Palette (Adapted from Google-like theme) ---
@@ -371,6 +581,35 @@ with header:
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
+    # Row 3: Global Segment Filters (applied to every data-driven page)
+    segment_selections = segment_filter_bar.render_segment_filter_bar(segment_index)
+
+
+# --- Apply segment filters to the page arguments ---
+df_segment, segment_rows, selection_key = df_processed, None, ()
+if df_processed is not None and segment_index is not None:
+    selection_key = tuple((name, tuple(values)) for name, values in segment_selections.items())
+    df_segment = select_segment(df_processed, segment_index, DATA_FILE_PATH, selection_key)
+    segment_rows = select_rows(segment_index, segment_selections)
+network_for_threshold = None
+if doc_topic_matrix is not None: # Network page threshold slider: graphs rebuilt from the doc-topic matrix
+    network_for_threshold = lambda threshold: load_topic_network_at_threshold(
+        doc_topic_matrix, segment_rows, DATA_FILE_PATH, selection_key, round(threshold, 2))
+topic_intervals_for_segment = None
+if df_segment is not None: # Topics page: bootstrapped only when the page asks for it
+    topic_intervals_for_segment = lambda: load_topic_intervals(df_segment, DATA_FILE_PATH, selection_key, NUM_TOPICS)
+findings = None
+if df_segment is not None: # Ranked on the segment's own reviews and co-occurrence network
+    findings_graph = network_for_threshold(PROBABILITY_THRESHOLD) if network_for_threshold is not None else topic_network_graph
+    findings = load_findings(df_segment, findings_graph, DATA_FILE_PATH, selection_key, NUM_TOPICS)
+    PAGES["Summary"]["args"] = (df_segment, NUM_TOPICS, STREAM_STATE_PATH, topic_labels_dict, findings)
+PAGES["Recommendations"]["args"] = (NUM_TOPICS, topic_labels_dict, findings)
+if df_processed is not None and segment_index is not None:
+    PAGES["Sentiment"]["args"] = (df_segment, analyzer)
+    PAGES["Topics"]["args"] = (df_segment, lda_model, feature_names, NUM_TOPICS, topic_labels_dict, topic_coherence_df, doc_topic_matrix, aspect_sentiment, topic_wordcloud_paths,
+                               topic_intervals_for_segment)
+    PAGES["Network"]["args"] = (topic_network_graph, NUM_TOPICS, topic_labels_dict, df_segment, network_for_threshold, term_network)
+    PAGES["Explore"]["args"] = (review_query_table, segment_rows, topic_labels_dict)
 
 # --- Update session state and rerun ---
 if selected_page and selected_page != st.session_state.current_page:
@@ -391,12 +630,19 @@ with content:
             actual_args = []
             for arg in args:
                 if arg is None: # Placeholder, needs to be replaced with loaded data
-                    if func == sentiment_view.render_sentiment_analysis:
-                        actual_args = [df_processed, analyzer]
+                    if func == executive_summary_view.render_executive_summary:
+                        actual_args = [df_segment, NUM_TOPICS, STREAM_STATE_PATH, topic_labels_dict, findings]
+                    elif func == recommendations_view.render_recommendations:
+                        actual_args = [NUM_TOPICS, topic_labels_dict, findings]
+                    elif func == sentiment_view.render_sentiment_analysis:
+                        actual_args = [df_segment, analyzer]
                     elif func == topic_modeling_view.render_topic_modeling:
-                         actual_args = [df_processed, lda_model, feature_names, NUM_TOPICS, topic_labels_dict]
+                         actual_args = [df_segment, lda_model, feature_names, NUM_TOPICS, topic_labels_dict, topic_coherence_df, doc_topic_matrix, aspect_sentiment, topic_wordcloud_paths,
+                                        topic_intervals_for_segment]
                     elif func == network_view.render_network_analysis:
-                        actual_args = [topic_network_graph, NUM_TOPICS, topic_labels_dict, df_processed]
+                        actual_args = [topic_network_graph, NUM_TOPICS, topic_labels_dict, df_segment, network_for_threshold, term_network]
+                    elif func == explore_view.render_explore:
+                        actual_args = [review_query_table, segment_rows, topic_labels_dict]
                     break # Assume all Nones need replacement based on function
                 else:
                     actual_args.append(arg)
@@ -411,7 +657,7 @@ with content:
         else:
             st.warning(f"Page '{st.session_state.current_page}' not found. Returning to Summary.")
             st.session_state.current_page = "Summary"
-            PAGES["Summary"]["func"](df_processed, NUM_TOPICS) # Call default page func
+            PAGES["Summary"]["func"](df_processed, NUM_TOPICS, STREAM_STATE_PATH, topic_labels_dict, findings) # Call default page func
             st.rerun()
 
 # --- Build Footer ---
@@ -445,10 +691,20 @@ st.sidebar.info(
     - **Sentiment**: Review positivity/negativity.
     - **Topics**: Key themes discussed.
     - **Network**: How topics relate.
+    - **Explore**: Ad-hoc breakdowns.
     - **Recommendations**: Business actions.
     - **About Me**: Developer info.
     """
 )
+st.sidebar.caption(f"Artifact release: `{ARTIFACT_VERSION}`")
+pool_stats = WORKER_POOL.stats()
+st.sidebar.caption(f"Worker pool: {pool_stats['running']}/{pool_stats['workers']} busy, {pool_stats['queued']} queued "
+                   f"({pool_stats['blas_threads']} BLAS threads each)"
+                   + (f"; p95 wait {pool_stats['wait_p95_ms']:,.0f} ms." if pool_stats['completed'] else "."))
+script_run_ctx = get_script_run_ctx()
+if script_run_ctx is not None:
+    MEMORY_LEDGER.record_session(script_run_ctx.session_id, st.session_state.to_dict())
+memory_panel.render_memory_panel(MEMORY_LEDGER)
 st.sidebar.warning(
     """
     **Layout Note:**
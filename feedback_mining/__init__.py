@@ -0,0 +1,4 @@
+# feedback_mining/__init__.py
+
+# This package holds the non-UI building blocks of the dashboard (data schema,
+# indexes, offline build stages). The Streamlit views live in 'ui_sections'.
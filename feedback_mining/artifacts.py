@@ -0,0 +1,170 @@
+# feedback_mining/artifacts.py
+"""
+Versioned, atomically published artifact releases.
+
+A release is a directory 'artifacts/releases/<version>/' holding every file the
+dashboard reads (the final dataset and the model artifacts). It is written in a
+temporary directory, named after a hash of its files' contents and renamed into
+place in one step. 'artifacts/manifest.json' then points at the new release; it
+is replaced atomically too, so readers see either the old release or the new
+one, never a mix. The dashboard reads the manifest on every rerun and includes
+its version in its cache keys.
+
+Without a manifest (e.g. artifacts copied in by hand), readers fall back to the
+fixed legacy paths, versioned by file size and modification time.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+MANIFEST_FILENAME = 'manifest.json'
+RELEASES_DIRNAME = 'releases'
+KEEP_RELEASES = 2 # The current release plus the previous one, which running sessions may still be reading
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _current_umask() -> int:
+    """Returns the process umask (read from /proc where possible, since setting it is not thread-safe)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def set_default_permissions(path: str) -> None:
+    """
+    Gives a `tempfile` file or directory the mode a normally created one would get.
+
+    `mkstemp`/`mkdtemp` create 0600 files and 0700 directories, which other users
+    (e.g. a dashboard running under another account) could not read once renamed
+    into place. This sets 0644 or 0755, minus the umask.
+    """
+    mode = 0o755 if os.path.isdir(path) else 0o644
+    os.chmod(path, mode & ~_current_umask())
+
+
+def _write_json_atomically(obj, file_path: str) -> None:
+    """Writes JSON via a temporary sibling file and `os.replace`."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(obj, f, indent=2)
+        set_default_permissions(tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def publish_release(artifacts_dir: str, writers: dict) -> dict:
+    """
+    Writes a new release and makes it current.
+
+    Args:
+        artifacts_dir (str): The artifacts directory holding the manifest and releases.
+        writers (dict): Mapping of artifact name to (filename, write_func); each
+            `write_func(path)` writes one file.
+
+    Returns:
+        dict: The new manifest ('version', 'created_at', 'release_dir', 'files').
+    """
+    releases_dir = os.path.join(artifacts_dir, RELEASES_DIRNAME)
+    os.makedirs(releases_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=releases_dir, prefix='.tmp-')
+    try:
+        files = {}
+        for name, (filename, write_func) in writers.items():
+            path = os.path.join(tmp_dir, filename)
+            write_func(path)
+            files[name] = {'file': filename, 'sha256': file_digest(path), 'bytes': os.path.getsize(path)}
+        version = hashlib.sha256(json.dumps({name: meta['sha256'] for name, meta in files.items()},
+                                            sort_keys=True).encode()).hexdigest()[:12]
+        release_dir = os.path.join(releases_dir, version)
+        if not os.path.isdir(release_dir): # Identical content is already published under this version
+            set_default_permissions(tmp_dir)
+            os.replace(tmp_dir, release_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    manifest = {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'release_dir': os.path.join(RELEASES_DIRNAME, version),
+        'files': files,
+    }
+    _write_json_atomically(manifest, os.path.join(artifacts_dir, MANIFEST_FILENAME))
+    prune_releases(artifacts_dir, version)
+    return manifest
+
+
+def prune_releases(artifacts_dir: str, current_version: str, keep: int = KEEP_RELEASES) -> None:
+    """Deletes all but the `keep` most recent releases (never the current one)."""
+    releases_dir = os.path.join(artifacts_dir, RELEASES_DIRNAME)
+    releases = sorted((entry for entry in os.scandir(releases_dir) if entry.is_dir() and not entry.name.startswith('.')),
+                      key=lambda entry: entry.stat().st_mtime, reverse=True)
+    kept = {current_version}
+    for entry in releases:
+        if entry.name in kept:
+            continue
+        if len(kept) < keep:
+            kept.add(entry.name)
+        else:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def read_manifest(artifacts_dir: str) -> dict | None:
+    """Returns the current manifest, or None if nothing has been published as a release."""
+    try:
+        with open(os.path.join(artifacts_dir, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def legacy_version(paths: dict) -> str:
+    """Versions files at fixed paths by their size and modification time."""
+    stats = {name: [os.stat(path).st_size, os.stat(path).st_mtime_ns] if os.path.exists(path) else None
+             for name, path in paths.items()}
+    return 'legacy-' + hashlib.sha256(json.dumps(stats, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def resolve_artifacts(artifacts_dir: str, legacy_paths: dict, unversioned: tuple = ()) -> tuple[str, dict]:
+    """
+    Returns the current artifact version and the path of every artifact.
+
+    Args:
+        artifacts_dir (str): The artifacts directory.
+        legacy_paths (dict): Mapping of artifact name to its fixed path, used for
+            names missing from the manifest or when there is no manifest.
+        unversioned (tuple): Names of legacy artifacts the reader writes itself
+            (and checks for staleness on its own); they are left out of the
+            legacy version so that writing them does not change it.
+
+    Returns:
+        tuple: (version, {name: path}).
+    """
+    manifest = read_manifest(artifacts_dir)
+    if manifest is None:
+        versioned = {name: path for name, path in legacy_paths.items() if name not in unversioned}
+        return legacy_version(versioned), dict(legacy_paths)
+    release_dir = os.path.join(artifacts_dir, manifest['release_dir'])
+    paths = dict(legacy_paths)
+    paths.update({name: os.path.join(release_dir, meta['file']) for name, meta in manifest['files'].items()})
+    return manifest['version'], paths
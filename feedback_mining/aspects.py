@@ -0,0 +1,209 @@
+# feedback_mining/aspects.py
+"""
+Aspect-level (per-topic) sentiment.
+
+A review that praises the style but complains about the fit gets one mixed
+compound score from VADER. Here each sentence of the raw review text is scored
+separately and assigned to its dominant LDA topic (using the published TF-IDF
+vectorizer and LDA model), and the sentence scores are averaged per review and
+topic.
+
+The result is stored like a CSR matrix: 'indptr' has one entry per review plus
+one, and the slice indptr[i]:indptr[i + 1] of 'topic', 'compound' and
+'n_sentences' holds review i's topics (1-based), mean sentence compound and
+number of sentences.
+"""
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from feedback_mining.artifacts import set_default_permissions
+from feedback_mining.sentiment import load_vader_analyzer
+from feedback_mining.text_processing import clean_text_basic, lemmatize_texts, load_spacy_model, load_stop_words
+
+ASPECT_SENTIMENT_FILENAME = 'aspect_sentiment.npz'
+ASPECT_MIN_PROBABILITY = 0.30 # A sentence is assigned to its dominant topic only if that topic reaches this probability
+ASPECT_BATCH_SIZE = 2000 # Reviews per worker task
+ASPECT_THROUGHPUT_TARGET = 500 # Reviews per second per worker; slower runs are reported
+ASPECT_COLUMNS = ['review', 'topic', 'compound', 'n_sentences']
+
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|[\r\n]+')
+_worker_state = {} # Per-process models, set up once by `_init_worker`
+
+
+def split_sentences(text) -> list[str]:
+    """Splits a review into sentences at ., ! or ? followed by whitespace, and at line breaks."""
+    if not isinstance(text, str):
+        return []
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT_RE.split(text) if sentence and sentence.strip()]
+
+
+def score_review_aspects(texts, vectorizer, lda_model, analyzer, spacy_model=None, stop_words: set[str] | None = None,
+                         min_probability: float = ASPECT_MIN_PROBABILITY, first_review: int = 0) -> pd.DataFrame:
+    """
+    Scores the sentences of a batch of reviews and averages them per review and topic.
+
+    Each sentence is scored with VADER on its raw text, then cleaned and
+    lemmatized like the review corpus and assigned to its dominant LDA topic.
+    Sentences with no vocabulary terms or no topic reaching `min_probability`
+    are left out.
+
+    Args:
+        texts: The raw review texts of the batch.
+        vectorizer: The fitted TF-IDF vectorizer.
+        lda_model: The fitted LDA model.
+        analyzer: A VADER `SentimentIntensityAnalyzer`.
+        spacy_model: The spaCy pipeline used for lemmatization, or None.
+        stop_words (set[str] | None): Stopwords removed before vectorizing.
+        min_probability (float): Minimum dominant-topic probability for a sentence.
+        first_review (int): Dataset row position of the batch's first review.
+
+    Returns:
+        pd.DataFrame: Columns 'review' (row position), 'topic' (1-based),
+            'compound' (mean over the sentences) and 'n_sentences', sorted by review and topic.
+    """
+    sentences, owners = [], []
+    for offset, text in enumerate(texts):
+        review_sentences = split_sentences(text)
+        sentences.extend(review_sentences)
+        owners.extend([first_review + offset] * len(review_sentences))
+    if not sentences:
+        return pd.DataFrame({column: [] for column in ASPECT_COLUMNS}).astype(_aspect_dtypes())
+
+    compounds = np.fromiter((analyzer.polarity_scores(sentence)['compound'] for sentence in sentences),
+                            dtype=np.float64, count=len(sentences))
+    processed = [' '.join(tokens) for tokens in lemmatize_texts(
+        (clean_text_basic(sentence) for sentence in sentences), spacy_model, stop_words)]
+    term_matrix = vectorizer.transform(processed)
+    sentence_topics = lda_model.transform(term_matrix)
+    dominant = sentence_topics.argmax(axis=1)
+    keep = (term_matrix.getnnz(axis=1) > 0) & (sentence_topics.max(axis=1) >= min_probability)
+
+    n_topics = sentence_topics.shape[1]
+    pair_keys = np.asarray(owners, dtype=np.int64)[keep] * n_topics + dominant[keep]
+    unique_keys, pair_index = np.unique(pair_keys, return_inverse=True)
+    n_sentences = np.bincount(pair_index, minlength=len(unique_keys))
+    compound_sums = np.bincount(pair_index, weights=compounds[keep], minlength=len(unique_keys))
+    return pd.DataFrame({
+        'review': unique_keys // n_topics,
+        'topic': unique_keys % n_topics + 1,
+        'compound': compound_sums / np.maximum(n_sentences, 1),
+        'n_sentences': n_sentences,
+    }).astype(_aspect_dtypes())
+
+
+def _aspect_dtypes() -> dict:
+    """Compact dtypes of the aspect table."""
+    return {'review': np.int32, 'topic': np.int8, 'compound': np.float32, 'n_sentences': np.int16}
+
+
+def _init_worker(vectorizer, lda_model, min_probability: float) -> None:
+    """Process-pool initializer: loads the NLP models once per worker."""
+    _worker_state.update(vectorizer=vectorizer, lda_model=lda_model, min_probability=min_probability,
+                         analyzer=load_vader_analyzer(), spacy_model=load_spacy_model(), stop_words=load_stop_words())
+
+
+def _score_batch(first_review: int, texts: list) -> pd.DataFrame:
+    """Scores one batch in a worker."""
+    state = _worker_state
+    return score_review_aspects(texts, state['vectorizer'], state['lda_model'], state['analyzer'],
+                                state['spacy_model'], state['stop_words'], state['min_probability'], first_review)
+
+
+def score_aspects_parallel(texts, vectorizer, lda_model, min_probability: float = ASPECT_MIN_PROBABILITY,
+                           batch_size: int = ASPECT_BATCH_SIZE, n_process: int | None = None) -> pd.DataFrame:
+    """
+    Scores aspect sentiment for all reviews in batches across a process pool.
+
+    Args:
+        texts: The raw review texts, in dataset row order.
+        vectorizer: The fitted TF-IDF vectorizer.
+        lda_model: The fitted LDA model.
+        min_probability (float): Minimum dominant-topic probability for a sentence.
+        batch_size (int): Reviews per worker task.
+        n_process (int | None): Number of worker processes (default: CPU count).
+
+    Returns:
+        pd.DataFrame: The aspect table (see `score_review_aspects`) for all reviews.
+    """
+    texts = list(texts)
+    n_process = n_process or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_process, initializer=_init_worker,
+                             initargs=(vectorizer, lda_model, min_probability)) as pool:
+        batches = list(pool.map(_score_batch, range(0, len(texts), batch_size),
+                                (texts[i:i + batch_size] for i in range(0, len(texts), batch_size))))
+    aspects = pd.concat(batches, ignore_index=True) if batches else score_review_aspects([], vectorizer, lda_model, None)
+
+    throughput = len(texts) / max(time.perf_counter() - start, 1e-9)
+    print(f"Aspect sentiment: {len(texts):,} reviews, {int(aspects['n_sentences'].sum()):,} topic sentences "
+          f"at {throughput:,.0f} reviews/s with {n_process} worker(s).")
+    if throughput < ASPECT_THROUGHPUT_TARGET * n_process:
+        print(f"Below the target of {ASPECT_THROUGHPUT_TARGET} reviews/s per worker; "
+              "consider more workers or a larger batch size.")
+    return aspects
+
+
+# --- Published artifact ---
+def save_aspect_sentiment(aspects: pd.DataFrame, n_reviews: int, file_path: str) -> None:
+    """Writes the aspect table as a CSR-style .npz (via a temporary sibling file)."""
+    aspects = aspects.sort_values(['review', 'topic'], kind='stable')
+    indptr = np.zeros(n_reviews + 1, dtype=np.int64)
+    np.cumsum(np.bincount(aspects['review'].to_numpy(), minlength=n_reviews), out=indptr[1:])
+    directory = os.path.dirname(file_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.npz')
+    os.close(fd)
+    try:
+        np.savez(tmp_path, indptr=indptr, topic=aspects['topic'].to_numpy(np.int8),
+                 compound=aspects['compound'].to_numpy(np.float32), n_sentences=aspects['n_sentences'].to_numpy(np.int16))
+        set_default_permissions(tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_aspect_sentiment(file_path: str, n_reviews: int | None = None) -> dict | None:
+    """
+    Loads the aspect artifact.
+
+    Returns:
+        dict | None: Arrays 'indptr', 'topic', 'compound', 'n_sentences' and 'review'
+            (the row position of each entry), or None if the file is missing or
+            does not match `n_reviews`.
+    """
+    if not os.path.exists(file_path):
+        return None
+    with np.load(file_path) as stored:
+        aspects = {name: stored[name] for name in ('indptr', 'topic', 'compound', 'n_sentences')}
+    n_stored = len(aspects['indptr']) - 1
+    if n_reviews is not None and n_stored != n_reviews:
+        return None
+    aspects['review'] = np.repeat(np.arange(n_stored, dtype=np.int32), np.diff(aspects['indptr']))
+    return aspects
+
+
+def topic_aspect_scores(aspects: dict, topic: int, row_positions: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Returns the sentence-level sentiment about one topic.
+
+    Args:
+        aspects (dict): The arrays returned by `load_aspect_sentiment`.
+        topic (int): The 1-based topic id.
+        row_positions (np.ndarray | None): Restrict to these reviews (e.g. a segment).
+
+    Returns:
+        pd.DataFrame: Columns 'review', 'compound' and 'n_sentences' for every review
+            with at least one sentence about the topic.
+    """
+    mask = aspects['topic'] == topic
+    if row_positions is not None:
+        mask &= np.isin(aspects['review'], row_positions)
+    return pd.DataFrame({'review': aspects['review'][mask], 'compound': aspects['compound'][mask],
+                         'n_sentences': aspects['n_sentences'][mask]})
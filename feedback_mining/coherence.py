@@ -0,0 +1,151 @@
+# feedback_mining/coherence.py
+"""
+Topic coherence (UMass and NPMI) computed from a sparse binary document-term matrix.
+
+The co-document counts of every pair of top words, across all topics, come from
+one sparse product of the document x top-word presence matrix with itself, so
+the cost is dominated by a single pass over the matching documents rather than
+by the number of word pairs.
+
+    python -m feedback_mining.coherence data/reviews_final_for_streamlit.csv --top-n 10
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DEFAULT_TOP_N = 10
+COHERENCE_COLUMNS = ['Topic', 'UMass', 'NPMI']
+
+
+def binary_document_term_matrix(doc_term_matrix) -> sp.csr_matrix:
+    """Returns a float32 CSR matrix with 1.0 wherever a term occurs in a document."""
+    presence = sp.csr_matrix(doc_term_matrix, dtype=np.float32, copy=True)
+    presence.data[:] = 1.0
+    presence.eliminate_zeros()
+    return presence
+
+
+def top_word_indices(components: np.ndarray, top_n: int = DEFAULT_TOP_N) -> np.ndarray:
+    """Returns the (n_topics, top_n) vocabulary indices of each topic's heaviest words, heaviest first."""
+    components = np.asarray(components)
+    top_n = min(top_n, components.shape[1])
+    heaviest = np.argpartition(-components, top_n - 1, axis=1)[:, :top_n]
+    order = np.argsort(-np.take_along_axis(components, heaviest, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(heaviest, order, axis=1)
+
+
+def top_word_pair_counts(top_words: np.ndarray, presence: sp.csr_matrix) -> np.ndarray:
+    """
+    Counts co-occurring documents for every pair of each topic's top words.
+
+    Args:
+        top_words (np.ndarray): The (n_topics, top_n) indices from `top_word_indices`.
+        presence (sp.csr_matrix): The binary document-term matrix.
+
+    Returns:
+        np.ndarray: A (n_topics, top_n, top_n) float64 array; entry [t, i, j] is the
+            number of documents containing top words i and j of topic t (the
+            diagonal holds single-word document counts).
+    """
+    vocabulary, local_index = np.unique(top_words, return_inverse=True)
+    local_index = local_index.reshape(top_words.shape)
+    sub_matrix = presence[:, vocabulary].astype(np.float64) # Counts stay exact beyond float32's 2**24
+    co_doc_counts = (sub_matrix.T @ sub_matrix).toarray()
+    return co_doc_counts[local_index[:, :, None], local_index[:, None, :]]
+
+
+def _lower_pairs(top_n: int) -> np.ndarray:
+    """Returns a mask of the (m, l) word pairs with l < m."""
+    return np.tril(np.ones((top_n, top_n), dtype=bool), k=-1)
+
+
+def umass_from_pair_counts(pair_counts: np.ndarray) -> np.ndarray:
+    """
+    UMass coherence of each topic: the mean over word pairs l < m (heaviest first)
+    of log((D(w_m, w_l) + 1) / D(w_l)).
+    """
+    top_n = pair_counts.shape[1]
+    doc_counts = np.diagonal(pair_counts, axis1=1, axis2=2)
+    scores = np.log((pair_counts + 1.0) / np.maximum(doc_counts[:, None, :], 1.0))
+    mask = _lower_pairs(top_n)
+    return (scores * mask).sum(axis=(1, 2)) / max(mask.sum(), 1)
+
+
+def npmi_from_pair_counts(pair_counts: np.ndarray, n_documents: int) -> np.ndarray:
+    """
+    NPMI coherence of each topic: the mean over word pairs of
+    log(P(w_i, w_j) / (P(w_i) P(w_j))) / -log P(w_i, w_j), in [-1, 1].
+
+    Pairs that never co-occur score -1; pairs that always co-occur score 1.
+    """
+    top_n = pair_counts.shape[1]
+    probabilities = pair_counts / max(n_documents, 1)
+    word_probabilities = np.diagonal(probabilities, axis1=1, axis2=2)
+    expected = word_probabilities[:, :, None] * word_probabilities[:, None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_joint = np.log(probabilities)
+        npmi = (log_joint - np.log(expected)) / -log_joint
+    npmi = np.where(probabilities <= 0, -1.0, npmi)
+    npmi = np.where(probabilities >= 1, 1.0, npmi)
+    mask = _lower_pairs(top_n)
+    return (npmi * mask).sum(axis=(1, 2)) / max(mask.sum(), 1)
+
+
+def umass_coherence(components: np.ndarray, presence: sp.csr_matrix, top_n: int = DEFAULT_TOP_N) -> np.ndarray:
+    """
+    Computes the UMass coherence of every topic.
+
+    Args:
+        components (np.ndarray): The (n_topics, n_terms) topic-word weights.
+        presence (sp.csr_matrix): The binary document-term matrix.
+        top_n (int): Number of top words per topic.
+
+    Returns:
+        np.ndarray: The coherence of each topic (higher is more coherent; at most 0).
+    """
+    return umass_from_pair_counts(top_word_pair_counts(top_word_indices(components, top_n), presence))
+
+
+def topic_coherence(components: np.ndarray, presence: sp.csr_matrix, top_n: int = DEFAULT_TOP_N) -> pd.DataFrame:
+    """
+    Computes UMass and NPMI coherence of every topic from one set of pair counts.
+
+    Args:
+        components (np.ndarray): The (n_topics, n_terms) topic-word weights.
+        presence (sp.csr_matrix): The binary document-term matrix.
+        top_n (int): Number of top words per topic.
+
+    Returns:
+        pd.DataFrame: Columns 'Topic' (1-based), 'UMass' and 'NPMI', one row per topic.
+    """
+    pair_counts = top_word_pair_counts(top_word_indices(components, top_n), presence)
+    return pd.DataFrame({
+        'Topic': np.arange(1, pair_counts.shape[0] + 1),
+        'UMass': umass_from_pair_counts(pair_counts),
+        'NPMI': npmi_from_pair_counts(pair_counts, presence.shape[0]),
+    }, columns=COHERENCE_COLUMNS)
+
+
+if __name__ == '__main__':
+    from feedback_mining.pipeline import ARTIFACTS_DIR, published_artifact_paths
+
+    parser = argparse.ArgumentParser(description="Print the UMass and NPMI coherence of each topic of the published LDA model.")
+    parser.add_argument('data_file', help="The final review CSV (needs 'processed_text_joined').")
+    parser.add_argument('--artifacts-dir', default=ARTIFACTS_DIR)
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N)
+    args = parser.parse_args()
+
+    published = published_artifact_paths(args.artifacts_dir)
+    lda_model = joblib.load(published['lda_model'])
+    vectorizer = joblib.load(published['vectorizer'])
+    texts = pd.read_csv(args.data_file, usecols=['processed_text_joined'])['processed_text_joined'].fillna('')
+    presence = binary_document_term_matrix(vectorizer.transform(texts))
+    start = time.perf_counter()
+    coherence = topic_coherence(lda_model.components_, presence, args.top_n)
+    print(coherence.to_string(index=False, float_format='{:.3f}'.format))
+    print(f"Mean UMass {coherence['UMass'].mean():.3f}, mean NPMI {coherence['NPMI'].mean():.3f} "
+          f"({time.perf_counter() - start:.3f}s for {len(coherence)} topics x {args.top_n} words over {presence.shape[0]:,} documents)")
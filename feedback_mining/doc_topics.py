@@ -0,0 +1,166 @@
+# feedback_mining/doc_topics.py
+"""
+The persisted LDA document-topic matrix.
+
+Row i holds the topic probabilities of row i of 'reviews_final_for_streamlit.csv'
+(topic t is column t - 1). It is stored as a float32 .npy file and opened
+memory-mapped, so views can read full topic mixtures without rerunning
+`lda_model.transform` or holding a second copy of the matrix in memory.
+
+A sidecar file ('<matrix>.fingerprint') records a hash of the model's
+`components_` and the row count the matrix was computed for, so a model
+retrained with the same number of topics on the same rows does not reuse it.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from feedback_mining.artifacts import set_default_permissions
+
+DOC_TOPIC_FILENAME = 'doc_topic_matrix.npy'
+DOC_TOPIC_DTYPE = np.float32
+TRANSFORM_BATCH_SIZE = 10000 # Reviews per `lda_model.transform` call when rebuilding
+FINGERPRINT_SUFFIX = '.fingerprint'
+
+
+def doc_topic_fingerprint(lda_model, n_rows: int) -> str:
+    """Returns a hash of the model's topic-word weights and the number of reviews."""
+    digest = hashlib.sha256(np.ascontiguousarray(lda_model.components_, dtype=np.float64).tobytes())
+    digest.update(str(n_rows).encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_atomically(file_path: str, suffix: str, write_func) -> None:
+    """Writes a file via `write_func(tmp_path)` on a temporary sibling file and `os.replace`."""
+    directory = os.path.dirname(file_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=suffix)
+    os.close(fd)
+    try:
+        write_func(tmp_path)
+        set_default_permissions(tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_doc_topic_fingerprint(file_path: str, fingerprint: str) -> None:
+    """Writes the fingerprint sidecar of the matrix at `file_path`."""
+    def write(path):
+        with open(path, 'w') as f:
+            f.write(fingerprint)
+    _write_atomically(file_path + FINGERPRINT_SUFFIX, FINGERPRINT_SUFFIX, write)
+
+
+def save_doc_topic_matrix(doc_topic: np.ndarray, file_path: str, fingerprint: str | None = None) -> None:
+    """
+    Writes the matrix as float32 via a temporary sibling file, so readers never map a partial file.
+
+    Args:
+        doc_topic (np.ndarray): The (n_reviews, n_topics) matrix.
+        file_path (str): Destination .npy path.
+        fingerprint (str | None): The `doc_topic_fingerprint` of the model and rows, written next to the matrix.
+    """
+    _write_atomically(file_path, '.npy', lambda path: np.save(path, np.asarray(doc_topic, dtype=DOC_TOPIC_DTYPE)))
+    if fingerprint is not None:
+        write_doc_topic_fingerprint(file_path, fingerprint)
+
+
+def load_doc_topic_matrix(file_path: str, n_rows: int | None = None, n_topics: int | None = None,
+                          fingerprint: str | None = None) -> np.ndarray | None:
+    """
+    Opens the persisted matrix memory-mapped (read-only).
+
+    Args:
+        file_path (str): Path to the .npy file.
+        n_rows (int | None): Expected number of reviews; a mismatch means the file is stale.
+        n_topics (int | None): Expected number of topics; a mismatch means the file is stale.
+        fingerprint (str | None): Expected `doc_topic_fingerprint`; a missing or different sidecar means the file is stale.
+
+    Returns:
+        np.ndarray | None: The (n_rows, n_topics) matrix, or None if the file is
+            missing or does not match the expected shape or fingerprint.
+    """
+    if not os.path.exists(file_path):
+        return None
+    if fingerprint is not None:
+        try:
+            with open(file_path + FINGERPRINT_SUFFIX) as f:
+                if f.read().strip() != fingerprint:
+                    return None
+        except FileNotFoundError:
+            return None
+    doc_topic = np.load(file_path, mmap_mode='r')
+    if doc_topic.ndim != 2 or (n_rows is not None and doc_topic.shape[0] != n_rows) \
+            or (n_topics is not None and doc_topic.shape[1] != n_topics):
+        return None
+    return doc_topic
+
+
+def build_doc_topic_matrix(lda_model, vectorizer, texts, batch_size: int = TRANSFORM_BATCH_SIZE) -> np.ndarray:
+    """
+    Recomputes the matrix from the published model artifacts, in batches of reviews.
+
+    Args:
+        lda_model: The fitted LDA model.
+        vectorizer: The fitted TF-IDF vectorizer the model was trained on.
+        texts: The 'processed_text_joined' column, in dataset row order.
+        batch_size (int): Reviews transformed per call.
+
+    Returns:
+        np.ndarray: The float32 (n_reviews, n_topics) matrix.
+    """
+    texts = list(texts)
+    doc_topic = np.empty((len(texts), lda_model.n_components), dtype=DOC_TOPIC_DTYPE)
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        doc_topic[start:start + len(batch)] = lda_model.transform(vectorizer.transform(batch))
+    return doc_topic
+
+
+def ensure_doc_topic_matrix(file_path: str, lda_model, vectorizer, texts) -> np.ndarray:
+    """
+    Returns the persisted matrix, rebuilding and saving it first if it is missing or stale
+    (another shape, or a fingerprint of another model or row count).
+
+    If the file cannot be written (e.g. a read-only deployment), the rebuilt
+    in-memory matrix is returned instead.
+    """
+    texts = list(texts)
+    fingerprint = doc_topic_fingerprint(lda_model, len(texts))
+    doc_topic = load_doc_topic_matrix(file_path, n_rows=len(texts), n_topics=lda_model.n_components, fingerprint=fingerprint)
+    if doc_topic is not None:
+        return doc_topic
+    doc_topic = build_doc_topic_matrix(lda_model, vectorizer, texts)
+    try:
+        save_doc_topic_matrix(doc_topic, file_path, fingerprint)
+    except OSError:
+        return doc_topic
+    return load_doc_topic_matrix(file_path)
+
+
+def strongest_rows(doc_topic: np.ndarray, topic: int, k: int, row_positions: np.ndarray | None = None) -> np.ndarray:
+    """
+    Returns the positions of the k reviews most strongly assigned to a topic, strongest first.
+
+    Selection is an `argpartition` over one column, so only the k winners are sorted.
+
+    Args:
+        doc_topic (np.ndarray): The document-topic matrix.
+        topic (int): The 1-based topic id.
+        k (int): Number of reviews to return.
+        row_positions (np.ndarray | None): Restrict the candidates to these row positions.
+
+    Returns:
+        np.ndarray: Row positions into the full dataset.
+    """
+    column = doc_topic[:, topic - 1] if row_positions is None else doc_topic[row_positions, topic - 1]
+    k = min(k, column.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-column, k - 1)[:k]
+    top = top[np.argsort(-column[top], kind='stable')]
+    return top if row_positions is None else np.asarray(row_positions)[top]
@@ -0,0 +1,258 @@
+# feedback_mining/execution.py
+"""
+Shared, bounded execution of heavy model and analytics calls in the dashboard.
+
+Every session's script runs on its own thread, and each heavy call (an LDA
+transform, a coherence pass, a bootstrap) would otherwise start as many BLAS
+and OpenMP threads as there are CPUs, or as many joblib processes for models
+saved with `n_jobs=-1`. Under concurrent sessions these oversubscribe the CPUs
+and every request slows down together. `WorkerPool` runs such calls on a fixed
+number of worker threads with `threadpoolctl` limits so that workers × BLAS
+threads never exceed the available CPUs. Each session has at most
+`PER_SESSION_CALLS` calls in flight, so one session's burst of reruns queues
+behind itself instead of taking every worker. Threads (not processes) keep
+the cached models and frames shared; NumPy, SciPy and BLAS release the GIL.
+
+A load test compares direct calls (unbounded threads) with the pool:
+
+    python -m feedback_mining.execution --sessions 8 --requests 3
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+DEFAULT_MAX_WORKERS = 4
+PER_SESSION_CALLS = 1
+LATENCIES_KEPT = 500
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (its affinity mask where supported)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def pin_single_process(model):
+    """
+    Sets a model's `n_jobs` to 1 so its calls run in the calling thread.
+
+    Models fitted with `n_jobs=-1` would otherwise start a joblib worker per CPU
+    for every transform, on top of the pool's own workers.
+
+    Args:
+        model: A fitted estimator (models without `n_jobs` are returned unchanged).
+
+    Returns:
+        The same model.
+    """
+    if model is not None and hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    return model
+
+
+def _percentile_ms(values, q: float) -> float:
+    """Percentile of a sequence of seconds, in ms (NaN if empty)."""
+    return float(np.percentile(values, q) * 1000) if len(values) else float('nan')
+
+
+class WorkerPool:
+    """
+    Process-wide pool of worker threads with BLAS limits and per-session queuing.
+
+    Args:
+        max_workers (int | None): Worker threads; defaults to min(DEFAULT_MAX_WORKERS, CPUs).
+        blas_threads (int | None): BLAS/OpenMP threads per worker; defaults to CPUs // workers (at least 1).
+        per_session (int): Calls of one session that may be queued or running on the pool at once.
+    """
+
+    def __init__(self, max_workers: int | None = None, blas_threads: int | None = None,
+                 per_session: int = PER_SESSION_CALLS):
+        cpus = available_cpus()
+        self.max_workers = max_workers or min(DEFAULT_MAX_WORKERS, cpus)
+        self.blas_threads = blas_threads or max(1, cpus // self.max_workers)
+        self.per_session = per_session
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.queued = 0
+        self.waits = deque(maxlen=LATENCIES_KEPT) # Seconds from the call to its start on a worker
+        self.runs = deque(maxlen=LATENCIES_KEPT)
+        self._sessions = {} # session id -> [semaphore, calls in flight]
+        self._lock = threading.Lock()
+        # OpenMP limits are per thread, so each worker sets its own; BLAS limits are process-wide.
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='feedback-mining-worker',
+                                            initializer=threadpool_limits, initargs=(self.blas_threads,))
+
+    def _session_slot(self, session_id: str) -> threading.BoundedSemaphore:
+        """Returns the session's semaphore, counting one more call in flight."""
+        with self._lock:
+            slot = self._sessions.setdefault(session_id, [threading.BoundedSemaphore(self.per_session), 0])
+            slot[1] += 1
+            return slot[0]
+
+    def _release_session(self, session_id: str) -> None:
+        """Releases one call of the session and forgets the session once it has none in flight."""
+        with self._lock:
+            slot = self._sessions[session_id]
+            slot[0].release()
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._sessions[session_id]
+
+    def _execute(self, func, args, kwargs, called_at):
+        """Runs one call on a worker thread and records its wait and run times."""
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.waits.append(started - called_at)
+        succeeded = False
+        try:
+            result = func(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.runs.append(time.perf_counter() - started)
+                if succeeded: self.completed += 1
+                else: self.failed += 1
+
+    def run(self, func, *args, session_id: str | None = None, **kwargs):
+        """
+        Runs `func(*args, **kwargs)` on the pool and waits for its result.
+
+        Exceptions raised by `func` are re-raised in the caller.
+
+        Args:
+            func: The callable to run.
+            session_id (str | None): The calling session; its calls run one after another. None skips session queuing.
+
+        Returns:
+            The value returned by `func`.
+        """
+        called_at = time.perf_counter()
+        semaphore = self._session_slot(session_id) if session_id is not None else None
+        try:
+            if semaphore is not None: semaphore.acquire()
+            with self._lock:
+                self.queued += 1
+            return self._executor.submit(self._execute, func, args, kwargs, called_at).result()
+        finally:
+            if semaphore is not None: self._release_session(session_id)
+
+    def stats(self) -> dict:
+        """Current load and recent latencies of the pool."""
+        with self._lock:
+            waits, runs = list(self.waits), list(self.runs)
+            return {
+                'workers': self.max_workers, 'blas_threads': self.blas_threads,
+                'running': self.running, 'queued': self.queued, 'sessions': len(self._sessions),
+                'completed': self.completed, 'failed': self.failed,
+                'wait_p50_ms': _percentile_ms(waits, 50), 'wait_p95_ms': _percentile_ms(waits, 95),
+                'run_p50_ms': _percentile_ms(runs, 50), 'run_p95_ms': _percentile_ms(runs, 95),
+            }
+
+    def shutdown(self) -> None:
+        """Stops the worker threads once the queued calls have finished."""
+        self._executor.shutdown(wait=True)
+
+
+def _concurrent_latencies(call, n_sessions: int, n_requests: int) -> list:
+    """Latency in seconds of every call when `n_sessions` threads each make `n_requests` calls at once."""
+    latencies, lock = [], threading.Lock()
+    barrier = threading.Barrier(n_sessions)
+
+    def session(index):
+        barrier.wait()
+        for _ in range(n_requests):
+            started = time.perf_counter()
+            call(f"session-{index}")
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(n_sessions)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return latencies
+
+
+def load_test(lda_model, vectorizer, texts, n_sessions: int = 8, n_requests: int = 3,
+              max_workers: int | None = None, blas_threads: int | None = None) -> pd.DataFrame:
+    """
+    Latency of concurrent LDA transforms, called directly and through a `WorkerPool`.
+
+    The direct calls use the model as saved (its own `n_jobs`, unbounded BLAS threads).
+
+    Args:
+        lda_model: The fitted topic model.
+        vectorizer: The fitted TF-IDF vectorizer.
+        texts (Sequence[str]): Processed review texts transformed by every call.
+        n_sessions (int): Concurrent simulated sessions.
+        n_requests (int): Calls made by each session, one after another.
+        max_workers (int | None): Pool workers (see `WorkerPool`).
+        blas_threads (int | None): BLAS threads per pool worker.
+
+    Returns:
+        pd.DataFrame: One row per mode with total seconds and p50/p95/max latency in ms.
+    """
+    tfidf = vectorizer.transform(texts)
+    rows = []
+
+    started = time.perf_counter()
+    latencies = _concurrent_latencies(lambda session_id: lda_model.transform(tfidf), n_sessions, n_requests)
+    rows.append(('direct', time.perf_counter() - started, latencies))
+
+    pool = WorkerPool(max_workers=max_workers, blas_threads=blas_threads)
+    original_n_jobs = getattr(lda_model, 'n_jobs', None)
+    pin_single_process(lda_model)
+    try:
+        started = time.perf_counter()
+        latencies = _concurrent_latencies(lambda session_id: pool.run(lda_model.transform, tfidf, session_id=session_id),
+                                          n_sessions, n_requests)
+        rows.append((f"pool ({pool.max_workers} workers × {pool.blas_threads} BLAS threads)",
+                     time.perf_counter() - started, latencies))
+    finally:
+        pool.shutdown()
+        if original_n_jobs is not None: lda_model.n_jobs = original_n_jobs
+
+    return pd.DataFrame([{'mode': mode, 'total_s': total, 'p50_ms': _percentile_ms(lat, 50),
+                          'p95_ms': _percentile_ms(lat, 95), 'max_ms': max(lat) * 1000}
+                         for mode, total, lat in rows])
+
+
+def main(argv=None) -> None:
+    """CLI: load-tests concurrent LDA transforms of the published release, with and without the pool."""
+    import joblib
+    from feedback_mining.pipeline import ARTIFACTS_DIR, published_artifact_paths
+    from feedback_mining.schema import read_review_table
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--artifacts-dir', default=ARTIFACTS_DIR, help='Directory holding the published release')
+    parser.add_argument('--sessions', type=int, default=8, help='Concurrent simulated sessions')
+    parser.add_argument('--requests', type=int, default=3, help='Calls per session')
+    parser.add_argument('--rows', type=int, default=2000, help='Reviews transformed per call')
+    parser.add_argument('--workers', type=int, default=None, help='Pool workers (default: min(4, CPUs))')
+    parser.add_argument('--blas-threads', type=int, default=None, help='BLAS threads per worker (default: CPUs // workers)')
+    args = parser.parse_args(argv)
+
+    published = published_artifact_paths(args.artifacts_dir)
+    lda_model = joblib.load(published['lda_model'])
+    vectorizer = joblib.load(published['vectorizer'])
+    texts = read_review_table(published['data'])['processed_text_joined'].astype(str).head(args.rows)
+    print(f"{available_cpus()} CPUs; {args.sessions} sessions × {args.requests} calls of {len(texts)} reviews")
+    print(load_test(lda_model, vectorizer, texts, args.sessions, args.requests, args.workers, args.blas_threads)
+          .to_string(index=False, float_format='{:,.1f}'.format))
+
+
+if __name__ == '__main__':
+    main()
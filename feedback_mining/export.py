@@ -0,0 +1,168 @@
+# feedback_mining/export.py
+"""
+Batch-wise CSV and Parquet export of filtered reviews.
+
+The filtered rows are never materialized as one frame: `iter_export_chunks`
+takes `batch_rows` rows at a time from the cached dataset, serializes them and
+yields the encoded bytes, so memory stays bounded by one batch and the first
+chunk is ready after the first batch. CSV chunks are plain slices of one file
+(the header comes with the first); Parquet chunks are the bytes of one file
+written a row group per batch.
+
+    python -m feedback_mining.export data/reviews_final_for_streamlit.csv --sentiment Negative --topic 2
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = {'CSV': ('csv', 'text/csv'), 'Parquet': ('parquet', 'application/vnd.apache.parquet')}
+EXPORT_BATCH_ROWS = 20_000
+EXPORT_COLUMNS = ['Clothing ID', 'Age', 'Title', 'Review Text', 'Rating', 'Recommended IND',
+                  'Division Name', 'Department Name', 'Class Name',
+                  'compound', 'vader_sentiment_label', 'dominant_lda_topic']
+
+
+def export_columns(df: pd.DataFrame, columns=None) -> list:
+    """Returns the requested (default: `EXPORT_COLUMNS`) columns that the frame has."""
+    return [column for column in (columns or EXPORT_COLUMNS) if column in df.columns]
+
+
+def filter_review_rows(df: pd.DataFrame, topics=None, sentiments=None) -> np.ndarray:
+    """
+    Returns the positions of the rows matching the filters.
+
+    Args:
+        df (pd.DataFrame): The review frame.
+        topics: Dominant topics to keep; None keeps all.
+        sentiments: VADER labels to keep; None keeps all.
+
+    Returns:
+        np.ndarray: Row positions (for `df.iloc`), in frame order.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if topics is not None:
+        mask &= df['dominant_lda_topic'].isin(list(topics)).to_numpy()
+    if sentiments is not None:
+        mask &= df['vader_sentiment_label'].isin(list(sentiments)).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def _iter_batches(df: pd.DataFrame, positions: np.ndarray, columns: list, batch_rows: int):
+    """Yields the selected rows and columns, `batch_rows` rows at a time."""
+    column_positions = [df.columns.get_loc(column) for column in columns]
+    for start in range(0, len(positions), batch_rows):
+        yield df.iloc[positions[start:start + batch_rows], column_positions]
+
+
+def iter_csv_chunks(df: pd.DataFrame, positions: np.ndarray, columns: list, batch_rows: int = EXPORT_BATCH_ROWS):
+    """Yields a CSV file as UTF-8 bytes, one chunk per batch of rows."""
+    if len(positions) == 0:
+        yield (','.join(columns) + '\n').encode('utf-8')
+        return
+    for number, batch in enumerate(_iter_batches(df, positions, columns, batch_rows)):
+        yield batch.to_csv(index=False, header=(number == 0)).encode('utf-8')
+
+
+class _DrainedSink(io.RawIOBase):
+    """A write-only stream whose written bytes are taken out with `drain` (position keeps counting)."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def iter_parquet_chunks(df: pd.DataFrame, positions: np.ndarray, columns: list, batch_rows: int = EXPORT_BATCH_ROWS):
+    """Yields a Parquet file as bytes, one chunk per row group (one row group per batch)."""
+    sink, writer, schema = _DrainedSink(), None, None
+    try:
+        batches = _iter_batches(df, positions, columns, batch_rows) if len(positions) else [df.iloc[:0][columns]]
+        for batch in batches:
+            if writer is None:
+                schema = pa.Schema.from_pandas(batch, preserve_index=False)
+                writer = pq.ParquetWriter(sink, schema)
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain() # The footer
+
+
+def iter_export_chunks(df: pd.DataFrame, positions: np.ndarray, fmt: str = 'CSV', columns=None,
+                       batch_rows: int = EXPORT_BATCH_ROWS):
+    """
+    Yields the selected rows as a CSV or Parquet file, in encoded chunks.
+
+    Args:
+        df (pd.DataFrame): The review frame.
+        positions (np.ndarray): Row positions to export (see `filter_review_rows`).
+        fmt (str): A key of `EXPORT_FORMATS`.
+        columns (list): Columns to export; defaults to those of `EXPORT_COLUMNS` present.
+        batch_rows (int): Rows serialized at a time.
+
+    Yields:
+        bytes: Consecutive pieces of the file.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; expected one of {list(EXPORT_FORMATS)}.")
+    chunk_func = iter_csv_chunks if fmt == 'CSV' else iter_parquet_chunks
+    yield from chunk_func(df, np.asarray(positions), export_columns(df, columns), batch_rows)
+
+
+if __name__ == '__main__':
+    import resource
+
+    parser = argparse.ArgumentParser(description="Export filtered reviews in row batches and report time to first chunk, total time and memory.")
+    parser.add_argument('data_file', help="The final review CSV.")
+    parser.add_argument('--topic', type=int, action='append', help="Dominant topic to keep (repeatable).")
+    parser.add_argument('--sentiment', action='append', help="VADER label to keep (repeatable).")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='CSV')
+    parser.add_argument('--batch-rows', type=int, default=EXPORT_BATCH_ROWS)
+    parser.add_argument('--repeat', type=int, default=1, help="Tile the dataset this many times first (e.g. for a million-row export).")
+    parser.add_argument('--output', default=None, help="Destination file (default: discard the bytes).")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data_file)
+    if args.repeat > 1:
+        df = pd.concat([df] * args.repeat, ignore_index=True)
+    positions = filter_review_rows(df, args.topic, args.sentiment)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = open(args.output, 'wb') if args.output else None
+    start = time.perf_counter()
+    first_chunk_seconds, total_bytes = None, 0
+    for chunk in iter_export_chunks(df, positions, args.format, batch_rows=args.batch_rows):
+        if first_chunk_seconds is None:
+            first_chunk_seconds = time.perf_counter() - start
+        total_bytes += len(chunk)
+        if output is not None:
+            output.write(chunk)
+    total_seconds = time.perf_counter() - start
+    if output is not None:
+        output.close()
+
+    print(f"Rows:        {len(positions):,} of {len(df):,} ({args.format}, {args.batch_rows:,} rows per batch)")
+    print(f"First chunk: {first_chunk_seconds * 1e3:,.0f} ms")
+    print(f"Total:       {total_seconds:.2f}s, {total_bytes / 1e6:,.1f} MB")
+    print(f"Peak RSS:    {rss_before / 1e3:,.0f} MB after loading -> "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3:,.0f} MB after exporting")
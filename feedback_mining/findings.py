@@ -0,0 +1,188 @@
+# feedback_mining/findings.py
+"""
+Data-driven findings for the Summary and Recommendations pages.
+
+Every topic (by the reviews it dominates) is scored against the whole review
+set on three signals:
+
+* negative lift: the topic's share of Negative VADER labels over the overall share;
+* rating gap: the topic's mean star rating minus the overall mean;
+* co-occurrence strength: the strongest lift of the topic's links in the topic
+  network (pairs seen in at least `MIN_PAIR_REVIEWS` reviews).
+
+Issue topics rank by the mean percentile of the three (high negative lift, low
+rating gap, strong links), among topics with at least `MIN_TOPIC_REVIEWS`
+reviews whose negative lift exceeds 1. Strength topics are those rated above
+average, ranked by positive lift. All per-topic statistics are `np.bincount`
+sums over the dominant-topic column, so a findings pass over 1M reviews takes
+well under a second.
+
+    python -m feedback_mining.findings data/reviews_final_for_streamlit.csv --graph artifacts/topic_network.gexf
+"""
+import argparse
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+MIN_TOPIC_REVIEWS = 30
+MIN_PAIR_REVIEWS = 10
+NUM_ISSUE_TOPICS = 2
+NUM_STRENGTH_TOPICS = 1
+
+
+def _rate(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise ratio, NaN where the denominator is zero."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+def topic_link_strength(graph: nx.Graph | None, num_topics: int, min_pair_reviews: int = MIN_PAIR_REVIEWS) -> pd.DataFrame:
+    """
+    Returns each topic's strongest network link.
+
+    Args:
+        graph (nx.Graph | None): Topic network with 1-based topic nodes and edge 'weight' (reviews) and 'lift'.
+        num_topics (int): Number of topics.
+        min_pair_reviews (int): Links seen in fewer reviews are ignored.
+
+    Returns:
+        pd.DataFrame: Indexed by topic, columns 'partner' (0 if none), 'pair_reviews' and 'link_lift' (0.0 if none).
+    """
+    topics = np.arange(1, num_topics + 1)
+    lift = np.zeros((num_topics, num_topics))
+    counts = np.zeros((num_topics, num_topics))
+    if graph is not None and graph.number_of_edges() > 0:
+        edges = [(int(a), int(b), data.get('weight', 0), data.get('lift', 0.0)) for a, b, data in graph.edges(data=True)
+                 if 1 <= int(a) <= num_topics and 1 <= int(b) <= num_topics]
+        if edges:
+            rows, cols, weights, lifts = (np.asarray(values) for values in zip(*edges))
+            counts[rows - 1, cols - 1] = counts[cols - 1, rows - 1] = weights
+            lift[rows - 1, cols - 1] = lift[cols - 1, rows - 1] = lifts
+    lift[counts < min_pair_reviews] = 0.0
+    partner = lift.argmax(axis=1)
+    strongest = lift[np.arange(num_topics), partner]
+    return pd.DataFrame({'partner': np.where(strongest > 0, partner + 1, 0),
+                         'pair_reviews': np.where(strongest > 0, counts[np.arange(num_topics), partner], 0).astype(np.int64),
+                         'link_lift': strongest}, index=pd.Index(topics, name='topic'))
+
+
+def topic_findings(df: pd.DataFrame, num_topics: int, graph: nx.Graph | None = None) -> pd.DataFrame:
+    """
+    Computes the per-topic statistics and ranks behind the findings.
+
+    Args:
+        df (pd.DataFrame): Reviews with 'dominant_lda_topic' (1-based), 'vader_sentiment_label',
+            'compound' and 'Rating'.
+        num_topics (int): Number of topics.
+        graph (nx.Graph | None): The topic network of the same reviews (for co-occurrence strength).
+
+    Returns:
+        pd.DataFrame: One row per topic with 'reviews', 'share', 'mean_compound', 'negative_rate',
+            'negative_lift', 'positive_lift', 'mean_rating', 'rating_gap', the `topic_link_strength`
+            columns and 'issue_score' (NaN for topics that are not ranked).
+    """
+    topics = pd.to_numeric(df['dominant_lda_topic'], errors='coerce').fillna(0).to_numpy(np.int64)
+    topics = np.where((topics >= 1) & (topics <= num_topics), topics, 0) # Bin 0 collects unassigned rows
+    labels = df['vader_sentiment_label'].to_numpy()
+    negative, positive = (labels == 'Negative').astype(np.float64), (labels == 'Positive').astype(np.float64)
+    compound = pd.to_numeric(df['compound'], errors='coerce').to_numpy(np.float64)
+    rating = pd.to_numeric(df['Rating'], errors='coerce').to_numpy(np.float64)
+    has_compound, has_rating = ~np.isnan(compound), ~np.isnan(rating)
+
+    def per_topic(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(topics, weights, minlength=num_topics + 1)[1:]
+
+    reviews = per_topic(np.ones(len(topics)))
+    rated = per_topic(has_rating.astype(np.float64))
+    n_reviews, n_rated = len(topics), has_rating.sum()
+    overall_negative = negative.sum() / n_reviews if n_reviews else np.nan
+    overall_positive = positive.sum() / n_reviews if n_reviews else np.nan
+    overall_rating = rating[has_rating].mean() if n_rated else np.nan
+
+    table = pd.DataFrame({
+        'reviews': reviews.astype(np.int64),
+        'share': _rate(reviews, np.full(num_topics, float(n_reviews))),
+        'mean_compound': _rate(per_topic(np.where(has_compound, compound, 0.0)), per_topic(has_compound.astype(np.float64))),
+        'negative_rate': _rate(per_topic(negative), reviews),
+        'positive_rate': _rate(per_topic(positive), reviews),
+        'mean_rating': _rate(per_topic(np.where(has_rating, rating, 0.0)), rated),
+    }, index=pd.Index(np.arange(1, num_topics + 1), name='topic'))
+    table['negative_lift'] = table['negative_rate'] / overall_negative if overall_negative else np.nan
+    table['positive_lift'] = table['positive_rate'] / overall_positive if overall_positive else np.nan
+    table['rating_gap'] = table['mean_rating'] - overall_rating
+    table = table.join(topic_link_strength(graph, num_topics))
+
+    ranked = table['reviews'] >= MIN_TOPIC_REVIEWS
+    percentiles = pd.concat([table.loc[ranked, 'negative_lift'].rank(pct=True),
+                             (-table.loc[ranked, 'rating_gap']).rank(pct=True),
+                             table.loc[ranked, 'link_lift'].rank(pct=True)], axis=1)
+    table['issue_score'] = percentiles.mean(axis=1)
+    return table
+
+
+def summarize_findings(df: pd.DataFrame, num_topics: int, graph: nx.Graph | None = None) -> dict:
+    """
+    Computes the findings shown on the Summary and Recommendations pages.
+
+    Args:
+        df (pd.DataFrame): Reviews as for `topic_findings` (the current segment).
+        num_topics (int): Number of topics.
+        graph (nx.Graph | None): The topic network of the same reviews.
+
+    Returns:
+        dict: 'n_reviews', 'positive_share', 'negative_share', 'mean_rating', 'mean_compound',
+            'topics' (the `topic_findings` table), 'issue_topics' and 'strength_topics' (topic
+            numbers, best first), 'most_discussed' (the two largest topics) and 'strongest_pair'
+            ((topic_a, topic_b, reviews, lift) of the highest-lift link, or None).
+    """
+    table = topic_findings(df, num_topics, graph)
+    labels = df['vader_sentiment_label']
+    eligible = table['reviews'] >= MIN_TOPIC_REVIEWS
+    issues = table[eligible & (table['negative_lift'] > 1)].sort_values(['issue_score', 'negative_lift'], ascending=False)
+    strengths = table[eligible & (table['rating_gap'] > 0)].sort_values(['positive_lift', 'rating_gap'], ascending=False)
+    strongest_pair = None
+    if (table['link_lift'] > 0).any():
+        topic = int(table['link_lift'].idxmax())
+        partner = int(table.at[topic, 'partner'])
+        strongest_pair = (min(topic, partner), max(topic, partner), int(table.at[topic, 'pair_reviews']), float(table.at[topic, 'link_lift']))
+    return {
+        'n_reviews': len(df),
+        'positive_share': float((labels == 'Positive').mean()) if len(df) else np.nan,
+        'negative_share': float((labels == 'Negative').mean()) if len(df) else np.nan,
+        'mean_rating': float(pd.to_numeric(df['Rating'], errors='coerce').mean()),
+        'mean_compound': float(pd.to_numeric(df['compound'], errors='coerce').mean()),
+        'topics': table,
+        'issue_topics': [int(topic) for topic in issues.index[:NUM_ISSUE_TOPICS]],
+        'strength_topics': [int(topic) for topic in strengths.index[:NUM_STRENGTH_TOPICS]],
+        'most_discussed': [int(topic) for topic in table['reviews'].sort_values(ascending=False, kind='stable').index[:2]],
+        'strongest_pair': strongest_pair,
+    }
+
+
+if __name__ == '__main__':
+    from feedback_mining.schema import read_review_table
+
+    parser = argparse.ArgumentParser(description="Compute the Summary/Recommendations findings and report their timing.")
+    parser.add_argument('data_file', help="The final review CSV.")
+    parser.add_argument('--graph', default=None, help="The topic network (.gexf) for co-occurrence strength.")
+    parser.add_argument('--topics', type=int, default=None, help="Number of topics (default: the largest dominant topic).")
+    parser.add_argument('--repeat', type=int, default=1, help="Tile the reviews this many times first.")
+    args = parser.parse_args()
+
+    df = read_review_table(args.data_file)
+    if args.repeat > 1:
+        df = pd.concat([df] * args.repeat, ignore_index=True)
+    graph = nx.read_gexf(args.graph, node_type=int) if args.graph else None
+    num_topics = args.topics or int(pd.to_numeric(df['dominant_lda_topic'], errors='coerce').max())
+    start = time.perf_counter()
+    findings = summarize_findings(df, num_topics, graph)
+    seconds = time.perf_counter() - start
+
+    print(f"Reviews: {findings['n_reviews']:,}; findings in {seconds:.3f}s")
+    print(f"Positive {findings['positive_share']:.1%}, negative {findings['negative_share']:.1%}, "
+          f"mean rating {findings['mean_rating']:.2f}")
+    print(f"Issue topics: {findings['issue_topics']}; strength topics: {findings['strength_topics']}; "
+          f"strongest pair: {findings['strongest_pair']}")
+    print(findings['topics'].round(3).to_string())
@@ -0,0 +1,335 @@
+# feedback_mining/memory.py
+"""
+Memory accounting and budget enforcement for the dashboard process.
+
+`MemoryLedger` records every entry of the dashboard's cached loaders (wrapped
+with `track_cache_entries`) with its estimated size and last use, and each
+session's state. A sampler thread records the process RSS; when it exceeds
+the RSS budget, or the tracked cache entries exceed the cache budget, the least
+recently used entries are cleared one by one (`cached_func.clear(*args)`),
+never those used in the last `PROTECT_SECONDS` (i.e. by a running script).
+A loader's value that is the very object another entry returned (e.g. an
+unfiltered segment, which is the review table itself) is counted once, and a
+loader's entries are capped at its `max_entries`, as Streamlit's own least
+recently used eviction drops the rest without telling the ledger.
+
+Sizes are estimates of the Python heap held by an object: NumPy and SciPy
+buffers, pandas' deep memory usage, Arrow buffers and a recursive walk of
+containers and object attributes. Memory-mapped arrays count as zero, since
+their pages belong to the OS page cache and are dropped under pressure.
+"""
+import ctypes
+import functools
+import gc
+import inspect
+import resource
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+RSS_SAMPLE_SECONDS = 5.0
+RSS_SAMPLES_KEPT = 720 # One hour at the default interval
+PROTECT_SECONDS = 30.0 # Entries used this recently are never evicted
+SESSION_STALE_SECONDS = 3600.0
+DEFAULT_LIMIT_SHARE = 0.8 # Without an explicit RSS budget: this share of the cgroup memory limit
+CGROUP_LIMIT_FILES = ['/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes']
+
+
+def estimate_bytes(obj, _seen: set | None = None) -> int:
+    """
+    Estimates the memory held by an object and everything it references.
+
+    Args:
+        obj: Any object.
+
+    Returns:
+        int: Estimated bytes; shared objects are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        if isinstance(obj.base, np.ndarray): # A view: the buffer belongs to (and is counted with) its base
+            return estimate_bytes(obj.base, seen)
+        if obj.dtype == object:
+            return obj.nbytes + sum(estimate_bytes(item, seen) for item in obj.ravel())
+        return obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if sp.issparse(obj):
+        return sum(getattr(obj, name).nbytes for name in ('data', 'indices', 'indptr', 'row', 'col', 'offsets')
+                   if isinstance(getattr(obj, name, None), np.ndarray))
+    if hasattr(obj, 'nbytes') and type(obj).__module__.startswith('pyarrow'):
+        return int(obj.nbytes)
+    if hasattr(obj, 'to_plotly_json'): # Plotly figures and traces
+        return estimate_bytes(obj.to_plotly_json(), seen)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(estimate_bytes(key, seen) + estimate_bytes(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(estimate_bytes(item, seen) for item in obj)
+    if isinstance(obj, (type, type(estimate_bytes), type(sys), functools.partial)):
+        return 0 # Code and modules are shared by the whole process
+    if hasattr(obj, '__dict__'):
+        size += estimate_bytes(vars(obj), seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += estimate_bytes(getattr(obj, name), seen)
+    return size
+
+
+def process_memory() -> dict:
+    """Returns the current and peak RSS of this process in bytes (peak only, if /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return {'rss': int(fields['VmRSS'].split()[0]) * 1024, 'peak_rss': int(fields['VmHWM'].split()[0]) * 1024}
+    except (OSError, KeyError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss': None, 'peak_rss': peak if sys.platform == 'darwin' else peak * 1024}
+
+
+def memory_limit_bytes() -> int | None:
+    """Returns the cgroup (container) memory limit, or None if there is none."""
+    for path in CGROUP_LIMIT_FILES:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60: # cgroup v1 reports "no limit" as a huge number
+            return int(value)
+    return None
+
+
+def default_rss_budget() -> int | None:
+    """Returns `DEFAULT_LIMIT_SHARE` of the container memory limit, or None without a limit."""
+    limit = memory_limit_bytes()
+    return int(limit * DEFAULT_LIMIT_SHARE) if limit else None
+
+
+def release_freed_memory() -> None:
+    """Collects garbage and asks glibc to return freed heap pages to the OS, so RSS reflects evictions."""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _key_value(value):
+    """Returns a hashable stand-in for an argument value."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _weak_ref(value):
+    """Returns a weak reference to a value, or None for values that do not support one."""
+    try:
+        return weakref.ref(value)
+    except TypeError:
+        return None
+
+
+class MemoryLedger:
+    """
+    Process-wide record of cache entries, session states and RSS samples.
+
+    Args:
+        rss_budget (int | None): Evict when the process RSS exceeds this many bytes.
+        cache_budget (int | None): Evict when the tracked cache entries exceed this many bytes.
+    """
+
+    def __init__(self, rss_budget: int | None = None, cache_budget: int | None = None):
+        self.rss_budget = rss_budget
+        self.cache_budget = cache_budget
+        self.entries = {} # (loader, key) -> entry dict
+        self.sessions = {}
+        self.samples = deque(maxlen=RSS_SAMPLES_KEPT)
+        self.evictions = deque(maxlen=100)
+        self._lock = threading.RLock()
+        self._sampler = None
+
+    def record_use(self, loader: str, kind: str, key: tuple, clear_kwargs: dict, clear_func, value,
+                   max_entries: int | None = None) -> None:
+        """
+        Records a call of a cached loader; the value is measured the first time its entry is seen.
+
+        A value that is the same object as another tracked entry's is counted as zero bytes.
+
+        Args:
+            max_entries (int | None): The loader's cache size; its least recently used
+                entries beyond it are dropped, as Streamlit has evicted them.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get((loader, key))
+            if entry is None:
+                shared = any(other['ref'] is not None and other['ref']() is value for other in self.entries.values())
+                entry = self.entries[(loader, key)] = {
+                    'loader': loader, 'kind': kind, 'params': ', '.join(f"{name}={value!r}" for name, value in key),
+                    'bytes': 0 if shared else estimate_bytes(value), 'created': now, 'hits': 0,
+                    'clear': functools.partial(clear_func, **clear_kwargs), 'ref': _weak_ref(value),
+                }
+            entry['last_used'] = now
+            entry['hits'] += 1
+            if max_entries is not None:
+                loader_keys = sorted((k for k in self.entries if k[0] == loader), key=lambda k: self.entries[k]['last_used'])
+                for evicted_key in loader_keys[:max(0, len(loader_keys) - max_entries)]:
+                    del self.entries[evicted_key]
+
+    def forget(self, loader: str, key: tuple | None = None) -> None:
+        """Drops the entries of a loader (all of them, or one) after its cache was cleared."""
+        with self._lock:
+            for entry_key in [k for k in self.entries if k[0] == loader and (key is None or k[1] == key)]:
+                del self.entries[entry_key]
+
+    def record_session(self, session_id: str, state: dict) -> None:
+        """Records the size of each session-state value of one session."""
+        now = time.time()
+        sizes = {str(name): estimate_bytes(value) for name, value in state.items()}
+        with self._lock:
+            self.sessions[session_id] = {'bytes': sum(sizes.values()), 'keys': len(sizes),
+                                         'largest': max(sizes, key=sizes.get) if sizes else '', 'last_seen': now}
+            for stale in [sid for sid, info in self.sessions.items() if now - info['last_seen'] > SESSION_STALE_SECONDS]:
+                del self.sessions[stale]
+
+    def cache_bytes(self) -> int:
+        """Total estimated bytes of the tracked cache entries."""
+        with self._lock:
+            return sum(entry['bytes'] for entry in self.entries.values())
+
+    def sample(self) -> dict:
+        """Records one RSS sample and returns it."""
+        memory = process_memory()
+        with self._lock:
+            self.samples.append((time.time(), memory['rss']))
+        return memory
+
+    def enforce(self) -> list:
+        """
+        Evicts least recently used cache entries while a budget is exceeded.
+
+        Returns:
+            list: The evicted entries' (loader, params, bytes).
+        """
+        memory = self.sample()
+        overshoot = 0
+        if self.rss_budget and memory['rss'] is not None:
+            overshoot = max(overshoot, memory['rss'] - self.rss_budget)
+        if self.cache_budget:
+            overshoot = max(overshoot, self.cache_bytes() - self.cache_budget)
+        if overshoot <= 0:
+            return []
+
+        evicted, freed, now = [], 0, time.time()
+        with self._lock:
+            candidates = sorted((entry for entry in self.entries.values() if now - entry['last_used'] > PROTECT_SECONDS),
+                                key=lambda entry: entry['last_used'])
+        for entry in candidates:
+            if freed >= overshoot:
+                break
+            try:
+                entry['clear']()
+            except Exception: # The cached function may have been redefined by a script rerun
+                continue
+            with self._lock:
+                self.entries = {key: value for key, value in self.entries.items() if value is not entry}
+                self.evictions.append({'time': now, 'loader': entry['loader'], 'params': entry['params'], 'bytes': entry['bytes']})
+            evicted.append((entry['loader'], entry['params'], entry['bytes']))
+            freed += entry['bytes']
+        if evicted:
+            release_freed_memory()
+        return evicted
+
+    def start_sampler(self, interval: float = RSS_SAMPLE_SECONDS) -> None:
+        """Starts (once) a daemon thread that samples RSS and enforces the budgets every `interval` seconds."""
+        with self._lock:
+            if self._sampler is not None:
+                return
+            def run():
+                while True:
+                    self.enforce()
+                    time.sleep(interval)
+            self._sampler = threading.Thread(target=run, name='memory-ledger-sampler', daemon=True)
+            self._sampler.start()
+
+    def cache_table(self) -> pd.DataFrame:
+        """Returns the tracked cache entries, largest first."""
+        with self._lock:
+            rows = [{'Loader': entry['loader'], 'Cache': entry['kind'], 'Arguments': entry['params'],
+                     'MB': entry['bytes'] / 1e6, 'Hits': entry['hits'],
+                     'Idle (s)': time.time() - entry['last_used']} for entry in self.entries.values()]
+        table = pd.DataFrame(rows, columns=['Loader', 'Cache', 'Arguments', 'MB', 'Hits', 'Idle (s)'])
+        return table.sort_values('MB', ascending=False, ignore_index=True)
+
+    def session_table(self) -> pd.DataFrame:
+        """Returns the recorded sessions' state sizes, largest first."""
+        with self._lock:
+            rows = [{'Session': session_id[:8], 'MB': info['bytes'] / 1e6, 'Keys': info['keys'],
+                     'Largest key': info['largest'], 'Idle (s)': time.time() - info['last_seen']}
+                    for session_id, info in self.sessions.items()]
+        table = pd.DataFrame(rows, columns=['Session', 'MB', 'Keys', 'Largest key', 'Idle (s)'])
+        return table.sort_values('MB', ascending=False, ignore_index=True)
+
+    def rss_history(self) -> pd.DataFrame:
+        """Returns the RSS samples as a time-indexed series in MB."""
+        with self._lock:
+            samples = list(self.samples)
+        return pd.DataFrame({'RSS (MB)': [rss / 1e6 if rss is not None else None for _, rss in samples]},
+                            index=pd.to_datetime([timestamp for timestamp, _ in samples], unit='s'))
+
+
+def track_cache_entries(ledger: MemoryLedger, kind: str, max_entries: int | None = None):
+    """
+    Decorates a Streamlit cached function so that each call is recorded in the ledger.
+
+    The entry key is formed, as Streamlit's, from the arguments whose names do not
+    start with '_'; eviction clears exactly that entry. `.clear()` is forwarded.
+
+    Args:
+        ledger (MemoryLedger): The ledger to record calls in.
+        kind (str): 'cache_data' or 'cache_resource' (for reporting).
+        max_entries (int | None): The `max_entries` the function is cached with, if any.
+    """
+    def decorator(cached_func):
+        signature = inspect.signature(cached_func)
+        loader = cached_func.__name__
+
+        def entry_key(args, kwargs) -> tuple:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((name, _key_value(arg)) for name, arg in bound.arguments.items() if not name.startswith('_'))
+            # Unhashed arguments are not part of Streamlit's key; pass None so the ledger holds no reference to them
+            return key, {name: (None if name.startswith('_') else arg) for name, arg in bound.arguments.items()}
+
+        @functools.wraps(cached_func)
+        def wrapper(*args, **kwargs):
+            value = cached_func(*args, **kwargs)
+            key, clear_kwargs = entry_key(args, kwargs)
+            ledger.record_use(loader, kind, key, clear_kwargs, cached_func.clear, value, max_entries)
+            return value
+
+        def clear(*args, **kwargs):
+            cached_func.clear(*args, **kwargs)
+            ledger.forget(loader, entry_key(args, kwargs)[0] if args or kwargs else None)
+        wrapper.clear = clear
+        return wrapper
+    return decorator
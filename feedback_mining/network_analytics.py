@@ -0,0 +1,190 @@
+# feedback_mining/network_analytics.py
+"""
+Offline analytics of the topic co-occurrence network.
+
+`annotate_network` stores on the graph everything the Network page shows, so the
+page only reads attributes:
+
+* nodes: 'weighted_degree' (sum of co-occurrence counts), 'degree_centrality',
+  'betweenness' (shortest paths over 1 / count, so strong links are short),
+  'eigenvector' and 'pagerank' (both weighted by count) and 'community'
+  (weighted Louvain partition, 0 = largest community);
+* edges: 'lift', the co-occurrence count over the count expected if the two
+  topics appeared in reviews independently (n_i * n_j / n_reviews), and
+  'distance' (1 / count).
+
+Lift needs each node's 'presence' (reviews in which the topic reaches the
+threshold) and the graph's 'n_reviews', set by `build_topic_network`.
+Betweenness is exact up to `BETWEENNESS_EXACT_MAX_NODES` topics and estimated
+from `BETWEENNESS_SAMPLES` source topics beyond that; the other measures are
+sparse-matrix computations (ARPACK, SciPy PageRank, Louvain), so larger topic
+counts stay cheap.
+
+    python -m feedback_mining.network_analytics --topics 500 --reviews 100000
+"""
+import argparse
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+from scipy.sparse.csgraph import dijkstra
+
+NODE_METRICS = ['weighted_degree', 'degree_centrality', 'betweenness', 'eigenvector', 'pagerank']
+BETWEENNESS_EXACT_MAX_NODES = 500
+BETWEENNESS_SAMPLES = 200
+PAGERANK_ALPHA = 0.85
+
+
+def edge_lift(count: float, presence_a: float, presence_b: float, n_reviews: int) -> float:
+    """Returns observed over expected co-occurrence (1.0 = as often as chance)."""
+    expected = presence_a * presence_b / n_reviews if n_reviews else 0.0
+    return float(count / expected) if expected > 0 else 0.0
+
+
+def betweenness_centrality(graph: nx.Graph, samples: int | None = None, seed: int = 42) -> dict:
+    """
+    Normalized shortest-path betweenness over edge 'distance', as `nx.betweenness_centrality`.
+
+    Brandes' algorithm without per-node Python loops: all shortest-path lengths
+    come from one SciPy Dijkstra call and, with the nodes in order of distance
+    from a source, its path counts and dependencies are two triangular solves
+    over the shortest-path DAG.
+
+    Args:
+        graph (nx.Graph): Graph whose edges have a positive 'distance'.
+        samples (int | None): Estimate from this many random source nodes (None: all nodes, exact).
+        seed (int): Seed of the source sample.
+
+    Returns:
+        dict: Betweenness of each node.
+    """
+    nodes = list(graph)
+    n_nodes = len(nodes)
+    if n_nodes < 3:
+        return dict.fromkeys(nodes, 0.0)
+    lengths = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight='distance', format='csr')
+    sources = np.arange(n_nodes)
+    if samples is not None and samples < n_nodes:
+        sources = np.sort(np.random.default_rng(seed).choice(n_nodes, samples, replace=False))
+    distances = dijkstra(lengths, directed=False, indices=sources)
+    edge_lengths = lengths.toarray()
+    edge_lengths[edge_lengths == 0] = np.inf
+
+    betweenness = np.zeros(n_nodes)
+    for source_distances in distances:
+        reached = np.flatnonzero(np.isfinite(source_distances))
+        order = reached[np.argsort(source_distances[reached], kind='stable')] # The source first
+        ordered_distances = source_distances[order]
+        # on_path[w, v]: v is the last hop of a shortest path to w (strictly lower triangular in this order)
+        on_path = (np.abs(ordered_distances[None, :] + edge_lengths[np.ix_(order, order)] - ordered_distances[:, None])
+                   <= 1e-12 * ordered_distances[:, None]).astype(np.float64)
+        path_counts = solve_triangular(-on_path, np.eye(1, len(order)).ravel(), lower=True, unit_diagonal=True)
+        # dependency[v] = sum over successors w of path_counts[v] / path_counts[w] * (1 + dependency[w])
+        shares = on_path.T * path_counts[:, None] / path_counts[None, :]
+        dependency = solve_triangular(-shares, shares.sum(axis=1), lower=False, unit_diagonal=True)
+        betweenness[order[1:]] += dependency[1:]
+    scale = 1.0 / ((n_nodes - 1) * (n_nodes - 2)) * (n_nodes / len(sources))
+    return dict(zip(nodes, (betweenness * scale).tolist()))
+
+
+def _eigenvector_centrality(graph: nx.Graph) -> dict:
+    """Weighted eigenvector centrality; falls back to zeros where ARPACK cannot converge."""
+    try:
+        return nx.eigenvector_centrality_numpy(graph, weight='weight')
+    except (nx.NetworkXException, ArithmeticError, ValueError):
+        return dict.fromkeys(graph, 0.0)
+
+
+def _communities(graph: nx.Graph, seed: int) -> dict:
+    """Maps each node to its Louvain community, numbered by decreasing size."""
+    communities = nx.community.louvain_communities(graph, weight='weight', seed=seed)
+    communities = sorted(communities, key=lambda members: (-len(members), min(members)))
+    return {node: number for number, members in enumerate(communities) for node in members}
+
+
+def annotate_network(graph: nx.Graph, seed: int = 42) -> nx.Graph:
+    """
+    Computes the network measures and stores them as node and edge attributes (in place).
+
+    Args:
+        graph (nx.Graph): The topic network from `topic_network.build_topic_network`.
+        seed (int): Seed of the Louvain partition and of sampled betweenness.
+
+    Returns:
+        nx.Graph: The same graph.
+    """
+    n_nodes, n_reviews = graph.number_of_nodes(), graph.graph.get('n_reviews', 0)
+    for a, b, data in graph.edges(data=True):
+        data['distance'] = 1.0 / data['weight']
+        data['lift'] = edge_lift(data['weight'], graph.nodes[a].get('presence', 0), graph.nodes[b].get('presence', 0), n_reviews)
+
+    if graph.number_of_edges() == 0:
+        metrics = {name: dict.fromkeys(graph, 0.0) for name in NODE_METRICS}
+        communities = {node: number for number, node in enumerate(sorted(graph))}
+    else:
+        sample_size = None if n_nodes <= BETWEENNESS_EXACT_MAX_NODES else BETWEENNESS_SAMPLES
+        metrics = {
+            'weighted_degree': dict(graph.degree(weight='weight')),
+            'degree_centrality': nx.degree_centrality(graph) if n_nodes > 1 else dict.fromkeys(graph, 0.0),
+            'betweenness': betweenness_centrality(graph, sample_size, seed),
+            'eigenvector': _eigenvector_centrality(graph),
+            'pagerank': nx.pagerank(graph, alpha=PAGERANK_ALPHA, weight='weight'),
+        }
+        communities = _communities(graph, seed)
+    for node, data in graph.nodes(data=True):
+        for name, values in metrics.items():
+            data[name] = float(values[node])
+        data['community'] = int(communities[node])
+    return graph
+
+
+def has_network_analytics(graph: nx.Graph) -> bool:
+    """True if every node carries the measures of `annotate_network` (graphs saved before it do not)."""
+    return graph.number_of_nodes() > 0 and all(
+        all(name in data for name in NODE_METRICS + ['community']) for _, data in graph.nodes(data=True))
+
+
+def node_analytics_table(graph: nx.Graph) -> pd.DataFrame:
+    """Returns one row per topic with its measures, by decreasing PageRank."""
+    table = pd.DataFrame([{'topic': node, **{name: data.get(name) for name in ['presence'] + NODE_METRICS + ['community']}}
+                          for node, data in graph.nodes(data=True)])
+    return table.sort_values('pagerank', ascending=False, ignore_index=True) if not table.empty else table
+
+
+def edge_analytics_table(graph: nx.Graph) -> pd.DataFrame:
+    """Returns one row per topic pair with its count and lift, by decreasing lift."""
+    table = pd.DataFrame([{'topic_a': a, 'topic_b': b, 'count': data['weight'], 'lift': data.get('lift')}
+                          for a, b, data in graph.edges(data=True)], columns=['topic_a', 'topic_b', 'count', 'lift'])
+    return table.sort_values(['lift', 'count'], ascending=False, ignore_index=True)
+
+
+if __name__ == '__main__':
+    from feedback_mining.topic_network import build_topic_network, cooccurrence_counts, topic_presence
+
+    parser = argparse.ArgumentParser(description="Time the network analytics on a synthetic document-topic matrix.")
+    parser.add_argument('--topics', type=int, default=500)
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--threshold', type=float, default=None, help="Presence threshold (default: 2 / topics).")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    doc_topic = rng.dirichlet(np.full(args.topics, 0.05), size=args.reviews).astype(np.float32)
+    threshold = args.threshold or 2.0 / args.topics
+    start = time.perf_counter()
+    counts = cooccurrence_counts(doc_topic, threshold)
+    graph = build_topic_network(counts, doc_topic.argmax(axis=1) + 1, topic_presence(doc_topic, threshold).sum(axis=0))
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    annotate_network(graph, args.seed)
+    analytics_seconds = time.perf_counter() - start
+
+    print(f"Network:   {graph.number_of_nodes():,} topics, {graph.number_of_edges():,} edges "
+          f"(threshold {threshold:.4f}, {args.reviews:,} reviews); built in {build_seconds:.2f}s")
+    print(f"Analytics: {analytics_seconds:.2f}s (betweenness "
+          f"{'exact' if graph.number_of_nodes() <= BETWEENNESS_EXACT_MAX_NODES else f'from {BETWEENNESS_SAMPLES} sampled sources'}), "
+          f"{len(set(nx.get_node_attributes(graph, 'community').values()))} communities")
+    print(node_analytics_table(graph).head(5).to_string(index=False))
+    print(edge_analytics_table(graph).head(5).to_string(index=False))
@@ -0,0 +1,247 @@
+# feedback_mining/out_of_core.py
+"""
+Out-of-core build of the dashboard's dataset and model artifacts.
+
+`pipeline.py` holds the whole corpus and every intermediate column in memory.
+This module produces the same published release while holding only one chunk
+of reviews at a time, so corpora larger than RAM can be processed:
+
+1. Pass 1 reads the raw CSV in chunks. It drops duplicate rows and runs the
+   pipeline's cleaning, lemmatization and VADER scoring on each chunk. The
+   processed columns are appended to a spill CSV, and each chunk's term
+   document frequencies are merged into running totals (`sharded_tfidf`).
+2. The TF-IDF vectorizer is built from the merged totals. Its vocabulary and
+   IDF are exactly those of the in-memory build (two-pass TF-IDF).
+3. Pass 2 reads the spill file in chunks and updates an online (mini-batch)
+   LDA model with `partial_fit`, for `passes` epochs (with a denser document-topic
+   prior, see `ONLINE_DOC_TOPIC_PRIOR`).
+4. Pass 3 transforms each chunk. It writes its rows of the doc-topic matrix
+   into a memory-mapped .npy, adds the topic columns and appends them to the
+   final CSV. Co-occurrence, presence and dominant-topic totals are summed for
+   the topic network.
+
+The release holds the same files as the pipeline's except the aspect table,
+the word clouds and the keyword network, which need the whole TF-IDF matrix.
+The dashboard shows those sections as unavailable. Memory is bounded by the
+chunk size, the vocabulary and the model. The one exception is duplicate
+detection, which keeps an 8-byte hash per review. Topics come from online
+rather than batch variational Bayes, so they differ from the pipeline's
+default model.
+
+    python -m feedback_mining.out_of_core --chunk-size 10000
+    python -m feedback_mining.out_of_core --synthetic-repeat 10 --artifacts-dir /tmp/ooc   # 10x corpus, peak RSS report
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import networkx as nx
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from feedback_mining.artifacts import publish_release
+from feedback_mining.compact_model import LDA_COMPACT_FILENAME, build_compact_model, save_compact_model
+from feedback_mining.doc_topics import DOC_TOPIC_DTYPE, DOC_TOPIC_FILENAME, doc_topic_fingerprint, write_doc_topic_fingerprint
+from feedback_mining.memory import process_memory
+from feedback_mining.network_analytics import annotate_network
+from feedback_mining.pipeline import (
+    FEATURE_NAMES_FILENAME, FINAL_DATA_FILENAME, LDA_MODEL_FILENAME, NETWORK_GRAPH_FILENAME, TFIDF_VECTORIZER_FILENAME,
+    add_config_arguments, config_from_args,
+)
+from feedback_mining.sentiment import load_vader_analyzer, score_texts
+from feedback_mining.sharded_tfidf import merge_document_frequencies, shard_document_frequencies, vectorizer_from_frequencies
+from feedback_mining.text_processing import clean_text_basic, lemmatize_texts, load_spacy_model, load_stop_words
+from feedback_mining.topic_network import active_topics_per_review, cooccurrence_counts, topic_network_from_totals, topic_presence
+from feedback_mining.vocabulary import VOCABULARY_INDEX_FILENAME, VOCABULARY_TRIE_FILENAME, build_vocabulary_trie, save_vocabulary_index
+
+CHUNK_SIZE = 10_000
+ONLINE_PASSES = 1
+# Online updates on TF-IDF rows collapse onto one or two topics with the default 1 / n_topics prior
+# (17k of 20k reviews in one topic); a denser prior keeps them balanced (mean NPMI 0.07 vs. 0.05 for batch LDA)
+ONLINE_DOC_TOPIC_PRIOR = 0.5
+SYNTHETIC_ID_OFFSET = 100_000 # 'Clothing ID' offset per synthetic copy, so copies are distinct rows
+SPILL_FILENAME = 'processed_reviews.csv'
+
+
+def iter_review_chunks(raw_data_file: str, text_column: str, title_column: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Reads the raw reviews CSV in chunks, as `pipeline.stage_load` reads it whole.
+
+    Duplicate rows are dropped across chunks by a 64-bit hash of each row
+    (values are read as strings, so a row hashes the same in any chunk).
+
+    Yields:
+        pd.DataFrame: The next chunk of unique reviews, with normalized text columns.
+    """
+    seen = np.empty(0, dtype=np.uint64) # Sorted hashes of the rows kept so far
+    for chunk in pd.read_csv(raw_data_file, index_col=0, dtype=str, chunksize=chunk_size):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen)
+        seen = np.union1d(seen, hashes[keep])
+        reviews = chunk[keep].reset_index(drop=True)
+        if title_column in reviews.columns:
+            reviews[title_column] = reviews[title_column].fillna('').astype(str)
+        reviews[text_column] = reviews[text_column].astype(str)
+        if len(reviews):
+            yield reviews
+
+
+def process_review_chunk(reviews: pd.DataFrame, config: dict, spacy_model, stop_words: set[str], analyzer) -> pd.DataFrame:
+    """Adds the cleaning, lemmatization and VADER columns of the pipeline's stages to one chunk."""
+    cleaned = [clean_text_basic(text) for text in reviews[config['text_column']]]
+    tokens = list(lemmatize_texts(cleaned, spacy_model, stop_words, batch_size=config['spacy_batch_size'],
+                                  n_process=config['spacy_n_process']))
+    processed = pd.DataFrame({'cleaned_text_basic': cleaned, 'processed_tokens': [str(review_tokens) for review_tokens in tokens],
+                              'processed_text_joined': [' '.join(review_tokens) for review_tokens in tokens]})
+    sentiment = score_texts(processed['processed_text_joined'], analyzer)
+    return pd.concat([reviews, processed, sentiment], axis=1)
+
+
+def _append_csv(df: pd.DataFrame, file_path: str, first: bool) -> None:
+    df.to_csv(file_path, mode='w' if first else 'a', header=first, index=False)
+
+
+def _read_spill(file_path: str, chunk_size: int, usecols: list[str] | None = None):
+    """Reads the spill file back in chunks as exact strings, so rewriting a value leaves its text unchanged."""
+    return pd.read_csv(file_path, dtype=str, na_filter=False, usecols=usecols, chunksize=chunk_size)
+
+
+def build_out_of_core(config: dict, chunk_size: int = CHUNK_SIZE, passes: int = ONLINE_PASSES) -> dict:
+    """
+    Builds and publishes a release with bounded memory (see the module docstring).
+
+    Args:
+        config (dict): A pipeline config (`pipeline.DEFAULT_CONFIG` keys).
+        chunk_size (int): Reviews held in memory at a time.
+        passes (int): Epochs of online LDA updates over the corpus.
+
+    Returns:
+        dict: The published manifest.
+    """
+    os.makedirs(config['artifacts_dir'], exist_ok=True)
+    work_dir = tempfile.mkdtemp(dir=config['artifacts_dir'], prefix='.tmp-ooc-') # Same filesystem as the release
+    spill_path = os.path.join(work_dir, SPILL_FILENAME)
+    try:
+        # Pass 1: clean, lemmatize and score; spill the processed columns and merge document frequencies
+        start = time.perf_counter()
+        template = TfidfVectorizer(max_df=config['tfidf_max_df'], min_df=config['tfidf_min_df'], ngram_range=(1, 1))
+        spacy_model, stop_words = load_spacy_model(config['text_fallback']), load_stop_words(config['text_fallback'])
+        analyzer = load_vader_analyzer(config['vader_engine'])
+        frequencies, n_chunks = None, 0
+        for reviews in iter_review_chunks(config['raw_data_file'], config['text_column'], config['title_column'], chunk_size):
+            processed = process_review_chunk(reviews, config, spacy_model, stop_words, analyzer)
+            _append_csv(processed, spill_path, first=n_chunks == 0)
+            chunk_frequencies = shard_document_frequencies(processed['processed_text_joined'], template)
+            frequencies = chunk_frequencies if frequencies is None else merge_document_frequencies([frequencies, chunk_frequencies])
+            n_chunks += 1
+        if frequencies is None:
+            raise ValueError(f"No reviews found in '{config['raw_data_file']}'.")
+        n_reviews = frequencies['n_documents']
+        vectorizer = vectorizer_from_frequencies(frequencies, template)
+        del frequencies
+        print(f"[out-of-core] pass 1: {n_reviews:,} reviews in {n_chunks} chunks, vocabulary of "
+              f"{len(vectorizer.vocabulary_):,} terms ({time.perf_counter() - start:.1f}s)")
+
+        # Pass 2: mini-batch (online) LDA updates
+        start = time.perf_counter()
+        lda_model = LatentDirichletAllocation(n_components=config['num_topics'], learning_method='online',
+                                              doc_topic_prior=ONLINE_DOC_TOPIC_PRIOR, total_samples=n_reviews,
+                                              random_state=config['random_state'])
+        for _ in range(passes):
+            for chunk in _read_spill(spill_path, chunk_size, usecols=['processed_text_joined']):
+                lda_model.partial_fit(vectorizer.transform(chunk['processed_text_joined']))
+        print(f"[out-of-core] pass 2: {passes} online LDA pass(es) ({time.perf_counter() - start:.1f}s)")
+
+        # Pass 3: topic mixtures, final dataset and network totals
+        start = time.perf_counter()
+        threshold, n_topics = config['probability_threshold'], config['num_topics']
+        data_path, doc_topic_path = os.path.join(work_dir, FINAL_DATA_FILENAME), os.path.join(work_dir, DOC_TOPIC_FILENAME)
+        doc_topic_file = np.lib.format.open_memmap(doc_topic_path, mode='w+', dtype=DOC_TOPIC_DTYPE, shape=(n_reviews, n_topics))
+        counts = np.zeros((n_topics, n_topics), dtype=np.int64)
+        presence_counts = np.zeros(n_topics, dtype=np.int64)
+        prevalence = np.zeros(n_topics + 1, dtype=np.int64)
+        row = 0
+        for index, chunk in enumerate(_read_spill(spill_path, chunk_size)):
+            doc_topic = lda_model.transform(vectorizer.transform(chunk['processed_text_joined']))
+            doc_topic_file[row:row + len(chunk)] = doc_topic
+            row += len(chunk)
+            dominant = doc_topic.argmax(axis=1) + 1
+            counts += cooccurrence_counts(doc_topic, threshold)
+            presence_counts += topic_presence(doc_topic, threshold).sum(axis=0)
+            prevalence += np.bincount(dominant, minlength=n_topics + 1)
+            chunk['dominant_lda_topic'] = dominant
+            chunk['active_lda_topics_above_threshold'] = [str(topics) for topics in active_topics_per_review(doc_topic, threshold)]
+            _append_csv(chunk, data_path, first=index == 0)
+        doc_topic_file.flush()
+        del doc_topic_file
+        graph = annotate_network(topic_network_from_totals(counts, prevalence, n_reviews, presence_counts), seed=config['random_state'])
+        print(f"[out-of-core] pass 3: topic mixtures and final dataset ({time.perf_counter() - start:.1f}s)")
+
+        vocabulary_trie = build_vocabulary_trie(vectorizer)
+        manifest = publish_release(config['artifacts_dir'], {
+            'data': (FINAL_DATA_FILENAME, lambda path: os.replace(data_path, path)),
+            'vectorizer': (TFIDF_VECTORIZER_FILENAME, lambda path: joblib.dump(vectorizer, path)),
+            'feature_names': (FEATURE_NAMES_FILENAME, lambda path: joblib.dump(vectorizer.get_feature_names_out(), path)),
+            'lda_model': (LDA_MODEL_FILENAME, lambda path: joblib.dump(lda_model, path)),
+            'network': (NETWORK_GRAPH_FILENAME, lambda path: nx.write_gexf(graph, path)),
+            'doc_topic': (DOC_TOPIC_FILENAME, lambda path: (os.replace(doc_topic_path, path),
+                                                            write_doc_topic_fingerprint(path, doc_topic_fingerprint(lda_model, n_reviews)))),
+            'lda_compact': (LDA_COMPACT_FILENAME, lambda path: save_compact_model(
+                build_compact_model(lda_model, vectorizer, config['compact_min_mass']), path, config['compact_sparse'])),
+            'vocabulary_trie': (VOCABULARY_TRIE_FILENAME, vocabulary_trie.save),
+            'vocabulary_index': (VOCABULARY_INDEX_FILENAME, lambda path: save_vocabulary_index(vectorizer, vocabulary_trie, path)),
+        })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"Published release {manifest['version']} to '{os.path.join(config['artifacts_dir'], manifest['release_dir'])}'.")
+    return manifest
+
+
+def write_synthetic_corpus(raw_data_file: str, file_path: str, repeat: int, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Writes `repeat` copies of the raw reviews CSV, chunk by chunk, as a larger test corpus.
+
+    Copy c offsets 'Clothing ID' by c * `SYNTHETIC_ID_OFFSET`, so its rows are not dropped as duplicates.
+    """
+    n_rows = 0
+    for copy in range(repeat):
+        for chunk in pd.read_csv(raw_data_file, index_col=0, dtype=str, chunksize=chunk_size):
+            if copy:
+                ids = pd.to_numeric(chunk['Clothing ID'], errors='coerce') + copy * SYNTHETIC_ID_OFFSET
+                chunk['Clothing ID'] = ids.astype('Int64').astype(str)
+            chunk.index = pd.RangeIndex(n_rows, n_rows + len(chunk))
+            chunk.to_csv(file_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0)
+            n_rows += len(chunk)
+    print(f"Synthetic corpus: {n_rows:,} reviews ({repeat}x) written to '{file_path}'.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the dataset and artifacts chunk by chunk, with memory bounded by the chunk size.")
+    add_config_arguments(parser)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--passes', type=int, default=ONLINE_PASSES, help="Epochs of online LDA updates.")
+    parser.add_argument('--synthetic-repeat', type=int, default=None,
+                        help="Build from this many copies of the raw CSV (written to a temporary file first).")
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    synthetic_dir = None
+    if args.synthetic_repeat:
+        synthetic_dir = tempfile.mkdtemp(prefix='feedback-mining-synthetic-')
+        synthetic_file = os.path.join(synthetic_dir, 'reviews.csv')
+        write_synthetic_corpus(config['raw_data_file'], synthetic_file, args.synthetic_repeat, args.chunk_size)
+        config['raw_data_file'] = synthetic_file
+    baseline_rss = process_memory()['rss']
+    try:
+        build_out_of_core(config, args.chunk_size, args.passes)
+    finally:
+        if synthetic_dir:
+            shutil.rmtree(synthetic_dir, ignore_errors=True)
+    memory = process_memory()
+    print(f"Peak RSS {memory['peak_rss'] / 1e6:,.0f} MB (after imports: {(baseline_rss or 0) / 1e6:,.0f} MB) "
+          f"with chunks of {args.chunk_size:,} reviews.")
@@ -0,0 +1,594 @@
+# feedback_mining/pipeline.py
+"""
+Stage-cached build pipeline for the dashboard's data and model artifacts.
+
+Replaces running notebooks 01-03 by hand. Each stage reads the cached outputs of
+the stages it depends on and writes its own outputs to
+'<cache_dir>/<stage>/<key>/', where the key hashes the stage's code, the config
+values it uses and the keys of its inputs (the raw CSV's content for 'load').
+The code hashed includes the package modules the stage calls into.
+A stage is rerun only if no cached output exists for its current key.
+Independent stages run concurrently in a process pool (VADER scoring runs
+alongside TF-IDF and LDA fitting).
+
+    python -m feedback_mining.pipeline                   # build everything that is stale
+    python -m feedback_mining.pipeline --num-topics 8    # refits LDA; reuses load..tfidf and VADER
+    python -m feedback_mining.pipeline --until tfidf     # stop after a given stage
+    python -m feedback_mining.pipeline --force vader     # rerun a stage even if cached
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+import joblib
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from feedback_mining.artifacts import file_digest, publish_release, read_manifest, resolve_artifacts
+from feedback_mining.aspects import ASPECT_SENTIMENT_FILENAME, save_aspect_sentiment, score_aspects_parallel
+from feedback_mining.compact_model import COMPACT_MIN_MASS, LDA_COMPACT_FILENAME, build_compact_model, save_compact_model
+from feedback_mining.doc_topics import DOC_TOPIC_FILENAME, doc_topic_fingerprint, save_doc_topic_matrix
+from feedback_mining.network_analytics import annotate_network
+from feedback_mining.sentiment import VADER_ENGINES, load_vader_analyzer, score_texts
+from feedback_mining.sharded_tfidf import sharded_fit_transform
+from feedback_mining.term_network import TERM_MIN_COUNT, TERM_MIN_PMI, TERM_NETWORK_FILENAME, TERM_TOP_K, build_term_network, save_term_network
+from feedback_mining.text_processing import (
+    clean_text_basic, lemmatize_texts, load_spacy_model, load_stop_words, text_resources_signature,
+)
+from feedback_mining.topic_backends import TOPIC_BACKENDS, fit_topic_model, supports_compact_model, topic_backend_params
+from feedback_mining.topic_network import active_topics_per_review, build_topic_network, cooccurrence_counts, topic_presence
+from feedback_mining.vocabulary import VOCABULARY_INDEX_FILENAME, VOCABULARY_TRIE_FILENAME, build_vocabulary_trie, save_vocabulary_index
+from feedback_mining.wordclouds import WORDCLOUD_MAX_WORDS, render_topic_wordclouds, wordcloud_artifact_name, wordcloud_filename, write_png
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+ARTIFACTS_DIR = os.path.join(PROJECT_ROOT, 'artifacts')
+
+DEFAULT_CONFIG = {
+    'raw_data_file': os.path.join(DATA_DIR, 'Womens Clothing E-Commerce Reviews.csv'),
+    'artifacts_dir': ARTIFACTS_DIR,
+    'cache_dir': os.path.join(PROJECT_ROOT, '.pipeline_cache'),
+    'text_column': 'Review Text',
+    'title_column': 'Title',
+    'spacy_batch_size': 1000,
+    'spacy_n_process': 1,
+    'text_fallback': False, # Build without spaCy/NLTK stopwords (no lemmas, scikit-learn stopwords) instead of failing
+    'tfidf_max_df': 0.90,
+    'tfidf_min_df': 5,
+    'tfidf_n_process': 1, # Sharded map-reduce build across this many processes, only if > 1; same output
+    'num_topics': 7,
+    'topic_backend': 'sklearn_lda', # Or 'gensim_lda' / 'nmf' (feedback_mining/topic_backends.py)
+    'lda_learning_method': 'batch',
+    'lda_max_iter': 10,
+    'random_state': 42,
+    'probability_threshold': 0.20,
+    'aspect_min_probability': 0.30,
+    'aspect_batch_size': 2000,
+    'aspect_n_process': None, # Default: one worker per CPU
+    'wordcloud_max_words': WORDCLOUD_MAX_WORDS,
+    'term_min_count': TERM_MIN_COUNT,
+    'term_min_pmi': TERM_MIN_PMI,
+    'term_top_k': TERM_TOP_K,
+    'vader_engine': 'nltk', # Or 'vectorized' (feedback_mining/vader_vectorized.py)
+    'compact_min_mass': COMPACT_MIN_MASS,
+    'compact_sparse': False,
+}
+
+# Names of the files the 'export' stage publishes
+FINAL_DATA_FILENAME = 'reviews_final_for_streamlit.csv'
+TFIDF_VECTORIZER_FILENAME = 'tfidf_vectorizer.joblib'
+FEATURE_NAMES_FILENAME = 'tfidf_feature_names.joblib'
+LDA_MODEL_FILENAME = 'lda_model.joblib'
+NETWORK_GRAPH_FILENAME = 'topic_network.gexf'
+
+STAGE_COMPLETE_MARKER = '_complete.json'
+CACHE_FORMAT_VERSION = 1 # Bump when the on-disk layout of stage outputs changes
+
+
+# --- Stage output storage ---
+def _save_output(directory: str, name: str, obj) -> None:
+    """Writes one stage output in a format chosen by its type."""
+    if isinstance(obj, pd.DataFrame):
+        obj.to_parquet(os.path.join(directory, f'{name}.parquet'), index=False)
+    elif sp.issparse(obj):
+        sp.save_npz(os.path.join(directory, f'{name}.npz'), sp.csr_matrix(obj), compressed=False)
+    elif isinstance(obj, np.ndarray) and obj.dtype != object: # Object arrays cannot be memory-mapped
+        np.save(os.path.join(directory, f'{name}.npy'), obj)
+    else:
+        joblib.dump(obj, os.path.join(directory, f'{name}.joblib'))
+
+
+def _load_output(directory: str, name: str):
+    """Reads one stage output written by `_save_output`."""
+    for extension in ('.parquet', '.npz', '.npy', '.joblib'):
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            break
+    else:
+        raise FileNotFoundError(f"Stage output '{name}' not found in '{directory}'.")
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    if extension == '.npz':
+        return sp.load_npz(path)
+    if extension == '.npy':
+        return np.load(path, mmap_mode='r')
+    return joblib.load(path)
+
+
+# --- Stages ---
+def stage_load(inputs: dict, config: dict) -> dict:
+    """Loads the raw reviews CSV, drops duplicate rows and normalizes text columns (notebook 01)."""
+    reviews = pd.read_csv(config['raw_data_file'], index_col=0)
+    reviews = reviews.drop_duplicates(keep='first').reset_index(drop=True)
+    if config['title_column'] in reviews.columns:
+        reviews[config['title_column']] = reviews[config['title_column']].fillna('').astype(str)
+    reviews[config['text_column']] = reviews[config['text_column']].astype(str)
+    return {'reviews': reviews}
+
+
+def stage_clean(inputs: dict, config: dict) -> dict:
+    """Applies basic text cleaning to the review text (notebook 02)."""
+    texts = inputs['load']['reviews'][config['text_column']]
+    return {'cleaned': pd.DataFrame({'cleaned_text_basic': [clean_text_basic(text) for text in texts]})}
+
+
+def stage_lemmatize(inputs: dict, config: dict) -> dict:
+    """Lemmatizes the cleaned text and removes stopwords (notebook 02)."""
+    tokens = list(lemmatize_texts(
+        inputs['clean']['cleaned']['cleaned_text_basic'],
+        load_spacy_model(config['text_fallback']), load_stop_words(config['text_fallback']),
+        batch_size=config['spacy_batch_size'], n_process=config['spacy_n_process'],
+    ))
+    return {'processed': pd.DataFrame({
+        'processed_tokens': tokens,
+        'processed_text_joined': [' '.join(review_tokens) for review_tokens in tokens],
+    })}
+
+
+def stage_vader(inputs: dict, config: dict) -> dict:
+    """Scores 'processed_text_joined' with VADER and labels each review (notebook 03)."""
+    return {'sentiment': score_texts(inputs['lemmatize']['processed']['processed_text_joined'],
+                                     load_vader_analyzer(config['vader_engine']))}
+
+
+def stage_tfidf(inputs: dict, config: dict) -> dict:
+    """Fits the TF-IDF vectorizer on 'processed_text_joined' (notebook 03), in shards across processes if configured."""
+    template = TfidfVectorizer(max_df=config['tfidf_max_df'], min_df=config['tfidf_min_df'], ngram_range=(1, 1))
+    texts = inputs['lemmatize']['processed']['processed_text_joined'].fillna('')
+    if (config['tfidf_n_process'] or 1) > 1: # Opt-in: None or 1 builds in this process
+        vectorizer, tfidf_matrix = sharded_fit_transform(texts, template, config['tfidf_n_process'])
+    else:
+        # fit + transform rather than fit_transform: sorted rows, bit-identical to the sharded build
+        vectorizer = template.fit(texts)
+        tfidf_matrix = vectorizer.transform(texts)
+    return {'vectorizer': vectorizer, 'tfidf_matrix': tfidf_matrix,
+            'feature_names': vectorizer.get_feature_names_out()}
+
+
+def stage_lda(inputs: dict, config: dict) -> dict:
+    """Fits the topic model on the TF-IDF matrix and assigns each review its dominant topic (notebook 03)."""
+    lda_model, doc_topic = fit_topic_model(config['topic_backend'], inputs['tfidf']['tfidf_matrix'], config['num_topics'],
+                                           config['random_state'], **topic_backend_params(config))
+    return {'lda_model': lda_model, 'doc_topic': doc_topic,
+            'dominant_topic': (doc_topic.argmax(axis=1) + 1).astype(np.int64)}
+
+
+def stage_cooccurrence(inputs: dict, config: dict) -> dict:
+    """Builds the thresholded topic co-occurrence network (notebook 03)."""
+    doc_topic = np.asarray(inputs['lda']['doc_topic'])
+    threshold = config['probability_threshold']
+    counts = cooccurrence_counts(doc_topic, threshold)
+    presence_counts = topic_presence(doc_topic, threshold).sum(axis=0)
+    active_topics = pd.DataFrame({'active_lda_topics_above_threshold': active_topics_per_review(doc_topic, threshold)})
+    return {'graph': build_topic_network(counts, np.asarray(inputs['lda']['dominant_topic']), presence_counts),
+            'active_topics': active_topics}
+
+
+def stage_network_analytics(inputs: dict, config: dict) -> dict:
+    """Stores centralities, communities and edge lift on the topic network for the Network page."""
+    return {'graph': annotate_network(inputs['cooccurrence']['graph'].copy(), seed=config['random_state'])}
+
+
+def stage_aspects(inputs: dict, config: dict) -> dict:
+    """Scores each sentence with VADER and averages the scores per review and sentence topic."""
+    return {'aspects': score_aspects_parallel(
+        inputs['load']['reviews'][config['text_column']], inputs['tfidf']['vectorizer'], inputs['lda']['lda_model'],
+        min_probability=config['aspect_min_probability'], batch_size=config['aspect_batch_size'],
+        n_process=config['aspect_n_process'],
+    )}
+
+
+def stage_wordclouds(inputs: dict, config: dict) -> dict:
+    """Renders a word-cloud image per topic and per topic x sentiment label."""
+    return {'images': render_topic_wordclouds(
+        inputs['lda']['lda_model'], inputs['tfidf']['feature_names'], inputs['tfidf']['tfidf_matrix'],
+        inputs['lda']['dominant_topic'], inputs['vader']['sentiment']['vader_sentiment_label'],
+        max_words=config['wordcloud_max_words'], random_state=config['random_state'],
+    )}
+
+
+def stage_term_network(inputs: dict, config: dict) -> dict:
+    """Builds the PMI-pruned keyword co-occurrence network and its layout."""
+    return {'network': build_term_network(
+        inputs['tfidf']['tfidf_matrix'], inputs['tfidf']['feature_names'], min_count=config['term_min_count'],
+        min_pmi=config['term_min_pmi'], top_k=config['term_top_k'], seed=config['random_state'],
+    )}
+
+
+def stage_export(inputs: dict, config: dict) -> dict:
+    """Publishes the final dataset and model artifacts read by the Streamlit app as a new release."""
+    final_df = pd.concat([
+        inputs['load']['reviews'], inputs['clean']['cleaned'], inputs['lemmatize']['processed'],
+        inputs['vader']['sentiment'],
+        pd.DataFrame({'dominant_lda_topic': np.asarray(inputs['lda']['dominant_topic'])}),
+        inputs['cooccurrence']['active_topics'],
+    ], axis=1)
+    for col in ['processed_tokens', 'active_lda_topics_above_threshold']:
+        final_df[col] = [_list_repr(value) for value in final_df[col]]
+
+    vocabulary_trie = build_vocabulary_trie(inputs['tfidf']['vectorizer'])
+    wordcloud_writers = {
+        wordcloud_artifact_name(topic, sentiment): (wordcloud_filename(topic, sentiment), partial(write_png, png))
+        for topic, sentiment, png in inputs['wordclouds']['images'].itertuples(index=False)
+    }
+    compact_writer = {} # NMF has no Dirichlet priors to build the compact model from; the app then loads 'lda_model'
+    if supports_compact_model(inputs['lda']['lda_model']):
+        compact_writer['lda_compact'] = (LDA_COMPACT_FILENAME, lambda path: save_compact_model(
+            build_compact_model(inputs['lda']['lda_model'], inputs['tfidf']['vectorizer'], config['compact_min_mass']),
+            path, config['compact_sparse']))
+    manifest = publish_release(config['artifacts_dir'], {
+        'data': (FINAL_DATA_FILENAME, lambda path: final_df.to_csv(path, index=False)),
+        'vectorizer': (TFIDF_VECTORIZER_FILENAME, lambda path: joblib.dump(inputs['tfidf']['vectorizer'], path)),
+        'feature_names': (FEATURE_NAMES_FILENAME, lambda path: joblib.dump(inputs['tfidf']['feature_names'], path)),
+        'lda_model': (LDA_MODEL_FILENAME, lambda path: joblib.dump(inputs['lda']['lda_model'], path)),
+        'network': (NETWORK_GRAPH_FILENAME, lambda path: nx.write_gexf(inputs['network_analytics']['graph'], path)),
+        'term_network': (TERM_NETWORK_FILENAME, lambda path: save_term_network(inputs['term_network']['network'], path)),
+        'doc_topic': (DOC_TOPIC_FILENAME, lambda path: save_doc_topic_matrix(inputs['lda']['doc_topic'], path, doc_topic_fingerprint(
+            inputs['lda']['lda_model'], len(inputs['lda']['doc_topic'])))),
+        'aspects': (ASPECT_SENTIMENT_FILENAME, lambda path: save_aspect_sentiment(inputs['aspects']['aspects'], len(final_df), path)),
+        'vocabulary_trie': (VOCABULARY_TRIE_FILENAME, vocabulary_trie.save),
+        'vocabulary_index': (VOCABULARY_INDEX_FILENAME, lambda path: save_vocabulary_index(inputs['tfidf']['vectorizer'], vocabulary_trie, path)),
+        **wordcloud_writers,
+        **compact_writer,
+    })
+    print(f"Published release {manifest['version']} to '{os.path.join(config['artifacts_dir'], manifest['release_dir'])}'.")
+    return {'manifest': pd.DataFrame({
+        'artifact': list(manifest['files']), 'version': manifest['version'],
+        'sha256': [meta['sha256'] for meta in manifest['files'].values()],
+    })}
+
+
+def _list_repr(value) -> str:
+    """Formats a list-like cell (a list, or an array when read back from Parquet) the way notebook 03 saved it."""
+    return str(value.tolist() if hasattr(value, 'tolist') else list(value))
+
+
+def published_artifact_paths(artifacts_dir: str = ARTIFACTS_DIR) -> dict:
+    """
+    Returns the path of every published file of the current release.
+
+    Falls back to the fixed paths under 'artifacts/' (and 'data/' for the final
+    dataset) used before releases were versioned.
+    """
+    legacy_paths = {
+        'data': os.path.join(DATA_DIR, FINAL_DATA_FILENAME),
+        'vectorizer': os.path.join(artifacts_dir, TFIDF_VECTORIZER_FILENAME),
+        'feature_names': os.path.join(artifacts_dir, FEATURE_NAMES_FILENAME),
+        'lda_model': os.path.join(artifacts_dir, LDA_MODEL_FILENAME),
+        'network': os.path.join(artifacts_dir, NETWORK_GRAPH_FILENAME),
+        'term_network': os.path.join(artifacts_dir, TERM_NETWORK_FILENAME),
+        'doc_topic': os.path.join(artifacts_dir, DOC_TOPIC_FILENAME),
+        'aspects': os.path.join(artifacts_dir, ASPECT_SENTIMENT_FILENAME),
+        'lda_compact': os.path.join(artifacts_dir, LDA_COMPACT_FILENAME),
+        'vocabulary_trie': os.path.join(artifacts_dir, VOCABULARY_TRIE_FILENAME),
+        'vocabulary_index': os.path.join(artifacts_dir, VOCABULARY_INDEX_FILENAME),
+    }
+    return resolve_artifacts(artifacts_dir, legacy_paths)[1]
+
+
+# --- Stage graph: name -> function, upstream stages, config keys that affect its output ---
+PIPELINE_STAGES = {
+    'load': {"func": stage_load, "deps": (), "config": ('raw_data_file', 'text_column', 'title_column')},
+    'clean': {"func": stage_clean, "deps": ('load',), "config": ('text_column',)},
+    'lemmatize': {"func": stage_lemmatize, "deps": ('clean',), "config": ()},
+    'vader': {"func": stage_vader, "deps": ('lemmatize',), "config": ('vader_engine',)},
+    'tfidf': {"func": stage_tfidf, "deps": ('lemmatize',), "config": ('tfidf_max_df', 'tfidf_min_df')},
+    'lda': {"func": stage_lda, "deps": ('tfidf',), "config": ('num_topics', 'topic_backend', 'lda_learning_method', 'lda_max_iter', 'random_state')},
+    'cooccurrence': {"func": stage_cooccurrence, "deps": ('lda',), "config": ('probability_threshold',)},
+    'network_analytics': {"func": stage_network_analytics, "deps": ('cooccurrence',), "config": ('random_state',)},
+    'aspects': {"func": stage_aspects, "deps": ('load', 'tfidf', 'lda'), "config": ('text_column', 'aspect_min_probability')},
+    'wordclouds': {"func": stage_wordclouds, "deps": ('tfidf', 'lda', 'vader'), "config": ('wordcloud_max_words', 'random_state')},
+    'term_network': {"func": stage_term_network, "deps": ('tfidf',), "config": ('term_min_count', 'term_min_pmi', 'term_top_k', 'random_state')},
+    'export': {"func": stage_export, "deps": ('load', 'clean', 'lemmatize', 'vader', 'tfidf', 'lda', 'cooccurrence',
+                                              'network_analytics', 'aspects', 'wordclouds', 'term_network'),
+               "config": ('artifacts_dir', 'compact_min_mass', 'compact_sparse')},
+}
+
+
+# --- Cache keys ---
+def stage_order(stages: dict = PIPELINE_STAGES) -> list[str]:
+    """Returns the stage names in a dependency-respecting (topological) order."""
+    ordered, visiting = [], set()
+    def visit(name):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline stage cycle detected at '{name}'.")
+        visiting.add(name)
+        for dep in stages[name]["deps"]:
+            visit(dep)
+        ordered.append(name)
+    for name in stages:
+        visit(name)
+    return ordered
+
+
+def _referenced_names(code) -> set[str]:
+    """Returns the global names a code object (and the functions nested in it) refers to."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _referenced_names(const)
+    return names
+
+
+def _package_module_closure(module_names: set[str]) -> set[str]:
+    """
+    Adds every package module the given ones import, transitively (the pipeline module itself excluded).
+
+    Imports are found in the source text, so those inside functions count too.
+    """
+    import_pattern = re.compile(rf'^\s*(?:from|import)\s+({re.escape(__package__)}\.\w+)', re.MULTILINE)
+    closure, queue = set(), list(module_names)
+    while queue:
+        module_name = queue.pop()
+        if module_name in closure or module_name == f'{__package__}.pipeline':
+            continue
+        closure.add(module_name)
+        queue.extend(import_pattern.findall(inspect.getsource(importlib.import_module(module_name))))
+    return closure
+
+
+def stage_code_sources(func) -> dict:
+    """
+    Returns the source code a stage's output depends on.
+
+    That is the stage function, the pipeline functions and constants it uses
+    (transitively), and the full source of every package module it calls into,
+    plus the package modules those import. Editing e.g. `text_processing`
+    therefore invalidates 'clean' and everything downstream of it.
+
+    Args:
+        func: The stage function.
+
+    Returns:
+        dict: Mapping of function, constant or module name to its source (constants: their repr).
+    """
+    sources, modules = {func.__qualname__: inspect.getsource(func)}, set()
+    queue = [func]
+    while queue:
+        current = queue.pop()
+        for name in _referenced_names(current.__code__):
+            obj = current.__globals__.get(name)
+            referenced = obj.__name__ if inspect.ismodule(obj) else getattr(obj, '__module__', None)
+            if inspect.isfunction(obj) and referenced == func.__module__:
+                if obj.__qualname__ not in sources:
+                    sources[obj.__qualname__] = inspect.getsource(obj)
+                    queue.append(obj)
+            elif isinstance(referenced, str) and referenced.startswith(f'{__package__}.'):
+                modules.add(referenced)
+            elif isinstance(obj, (str, int, float, tuple)) and name.isupper():
+                sources[name] = repr(obj)
+    for module_name in sorted(_package_module_closure(modules)):
+        sources[module_name] = inspect.getsource(importlib.import_module(module_name))
+    return sources
+
+
+def compute_stage_keys(config: dict, stages: dict = PIPELINE_STAGES) -> dict:
+    """
+    Computes the cache key of every stage.
+
+    A key hashes the stage's source code (see `stage_code_sources`), the config
+    values it declares and the keys of its upstream stages, so any upstream
+    change propagates downstream.
+    The 'load' stage additionally hashes the raw CSV's content, and 'lemmatize'
+    the spaCy model and stopword list in use (see `text_resources_signature`).
+
+    Args:
+        config (dict): The pipeline configuration.
+        stages (dict): The stage graph.
+
+    Returns:
+        dict: Mapping of stage name to a hex cache key.
+    """
+    keys = {}
+    for name in stage_order(stages):
+        stage = stages[name]
+        payload = {
+            'format': CACHE_FORMAT_VERSION,
+            'stage': name,
+            'code': stage_code_sources(stage["func"]),
+            'config': {key: config[key] for key in stage["config"]},
+            'deps': {dep: keys[dep] for dep in stage["deps"]},
+        }
+        if name == 'load':
+            payload['raw_data_digest'] = file_digest(config['raw_data_file'])
+        if name == 'lemmatize': # Lemmas and stopwords depend on what is installed (and raise unless a fallback is allowed)
+            payload['text_resources'] = text_resources_signature(config['text_fallback'])
+        keys[name] = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return keys
+
+
+def stage_output_dir(config: dict, stage_name: str, stage_key: str) -> str:
+    """Returns the cache directory holding a stage's outputs for a given key."""
+    return os.path.join(config['cache_dir'], stage_name, stage_key)
+
+
+def is_stage_cached(config: dict, stage_name: str, stage_key: str) -> bool:
+    """Returns True if a complete output exists for the stage's key (for 'export': and its release is current)."""
+    if not os.path.exists(os.path.join(stage_output_dir(config, stage_name, stage_key), STAGE_COMPLETE_MARKER)):
+        return False
+    if stage_name == 'export':
+        manifest = read_manifest(config['artifacts_dir'])
+        published_version = load_stage_outputs(config, stage_name, stage_key)['manifest']['version'].iloc[0]
+        return manifest is not None and manifest['version'] == published_version \
+            and os.path.isdir(os.path.join(config['artifacts_dir'], manifest['release_dir']))
+    return True
+
+
+def load_stage_outputs(config: dict, stage_name: str, stage_key: str) -> dict:
+    """Loads every cached output of a stage, keyed by output name."""
+    directory = stage_output_dir(config, stage_name, stage_key)
+    with open(os.path.join(directory, STAGE_COMPLETE_MARKER)) as f:
+        output_names = json.load(f)['outputs']
+    return {name: _load_output(directory, name) for name in output_names}
+
+
+def store_stage_outputs(config: dict, stage_name: str, stage_key: str, outputs: dict, seconds: float = 0.0) -> None:
+    """
+    Caches a stage's outputs under its key, replacing the directory atomically.
+
+    Besides `_run_stage`, tools that produce a stage's outputs themselves (such
+    as the topic-count sweep) use this to hand their result to the pipeline.
+    """
+    final_dir = stage_output_dir(config, stage_name, stage_key)
+    os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(final_dir), prefix='.tmp-')
+    try:
+        for name, obj in outputs.items():
+            _save_output(tmp_dir, name, obj)
+        with open(os.path.join(tmp_dir, STAGE_COMPLETE_MARKER), 'w') as f:
+            json.dump({'outputs': list(outputs), 'seconds': round(seconds, 3)}, f)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _run_stage(stage_name: str, keys: dict, config: dict, stages: dict = PIPELINE_STAGES) -> float:
+    """Runs one stage from its cached inputs and caches its outputs. Returns the elapsed seconds."""
+    start = time.perf_counter()
+    stage = stages[stage_name]
+    inputs = {dep: load_stage_outputs(config, dep, keys[dep]) for dep in stage["deps"]}
+    outputs = stage["func"](inputs, config)
+    elapsed = time.perf_counter() - start
+    store_stage_outputs(config, stage_name, keys[stage_name], outputs, elapsed)
+    return elapsed
+
+
+def _required_stages(targets: list[str], stages: dict) -> set[str]:
+    """Returns the target stages plus everything upstream of them."""
+    required, queue = set(), list(targets)
+    while queue:
+        name = queue.pop()
+        if name not in required:
+            required.add(name)
+            queue.extend(stages[name]["deps"])
+    return required
+
+
+def downstream_stages(stage_name: str, stages: dict = PIPELINE_STAGES) -> tuple[str, ...]:
+    """Returns every stage that depends on `stage_name`, directly or transitively, in stage order."""
+    downstream = set()
+    for name in stage_order(stages):
+        if any(dep == stage_name or dep in downstream for dep in stages[name]["deps"]):
+            downstream.add(name)
+    return tuple(name for name in stage_order(stages) if name in downstream)
+
+
+def run_pipeline(config: dict | None = None, targets: list[str] | None = None, force: tuple = (),
+                 max_workers: int | None = None, stages: dict = PIPELINE_STAGES) -> dict:
+    """
+    Runs every stale stage needed for the targets, in parallel where the graph allows.
+
+    Args:
+        config (dict | None): Overrides merged into `DEFAULT_CONFIG`.
+        targets (list[str] | None): Stages to bring up to date (default: all stages).
+        force (tuple): Stage names to rerun even if a cached output exists.
+        max_workers (int | None): Maximum number of stages running at once.
+        stages (dict): The stage graph.
+
+    Returns:
+        dict: Mapping of stage name to its cache key, for every required stage.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    keys = compute_stage_keys(config, stages)
+    required = _required_stages(targets or list(stages), stages)
+    order = [name for name in stage_order(stages) if name in required]
+    pending = [name for name in order if name in force or not is_stage_cached(config, name, keys[name])]
+    done = set(order) - set(pending)
+    for name in order:
+        if name in done:
+            print(f"[pipeline] {name:<17} up to date ({keys[name]})")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while pending or running:
+            for name in [n for n in pending if all(dep in done for dep in stages[n]["deps"])]:
+                print(f"[pipeline] {name:<17} running...")
+                running[pool.submit(_run_stage, name, keys, config, stages)] = name
+                pending.remove(name)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                elapsed = future.result()
+                done.add(name)
+                print(f"[pipeline] {name:<17} done in {elapsed:.1f}s ({keys[name]})")
+    return {name: keys[name] for name in order}
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds command-line overrides for the common `DEFAULT_CONFIG` values to a parser."""
+    parser.add_argument('--raw-data-file', default=DEFAULT_CONFIG['raw_data_file'])
+    parser.add_argument('--artifacts-dir', default=DEFAULT_CONFIG['artifacts_dir'], help="Where releases of the dataset and model artifacts are published.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CONFIG['cache_dir'])
+    parser.add_argument('--num-topics', type=int, default=DEFAULT_CONFIG['num_topics'])
+    parser.add_argument('--topic-backend', choices=TOPIC_BACKENDS, default=DEFAULT_CONFIG['topic_backend'],
+                        help="Topic-model engine of the 'lda' stage (see feedback_mining/topic_backends.py).")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_CONFIG['probability_threshold'],
+                        help="Topic probability threshold for co-occurrence.")
+    parser.add_argument('--spacy-processes', type=int, default=DEFAULT_CONFIG['spacy_n_process'])
+    parser.add_argument('--allow-text-fallback', action='store_true',
+                        help="Build without the spaCy model / NLTK stopwords if missing (no lemmatization, scikit-learn stopwords).")
+    parser.add_argument('--tfidf-processes', type=int, default=DEFAULT_CONFIG['tfidf_n_process'],
+                        help="Worker processes for a sharded TF-IDF build; above 1 enables it (identical output for any count).")
+    parser.add_argument('--aspect-processes', type=int, default=DEFAULT_CONFIG['aspect_n_process'],
+                        help="Worker processes for sentence-level aspect sentiment (default: CPU count).")
+    parser.add_argument('--vader-engine', choices=VADER_ENGINES, default=DEFAULT_CONFIG['vader_engine'],
+                        help="VADER implementation for review sentiment ('vectorized' agrees with NLTK within 1e-3).")
+    parser.add_argument('--compact-min-mass', type=float, default=DEFAULT_CONFIG['compact_min_mass'],
+                        help="Vocabulary pruning threshold of the compact LDA model (share of a topic's mass beyond the prior).")
+    parser.add_argument('--compact-sparse', action='store_true', help="Store the compact LDA model's weights as a sparse matrix.")
+
+
+def config_from_args(args: argparse.Namespace) -> dict:
+    """Builds a pipeline config from arguments added by `add_config_arguments`."""
+    return {**DEFAULT_CONFIG, 'raw_data_file': args.raw_data_file,
+            'artifacts_dir': args.artifacts_dir, 'cache_dir': args.cache_dir,
+            'num_topics': args.num_topics, 'topic_backend': args.topic_backend, 'probability_threshold': args.threshold,
+            'spacy_n_process': args.spacy_processes, 'text_fallback': args.allow_text_fallback, 'tfidf_n_process': args.tfidf_processes,
+            'aspect_n_process': args.aspect_processes, 'vader_engine': args.vader_engine,
+            'compact_min_mass': args.compact_min_mass, 'compact_sparse': args.compact_sparse}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the dashboard's dataset and artifacts, rerunning only stale stages.")
+    add_config_arguments(parser)
+    parser.add_argument('--until', choices=list(PIPELINE_STAGES), help="Only run up to this stage.")
+    parser.add_argument('--force', nargs='*', default=[], choices=list(PIPELINE_STAGES), help="Stages to rerun regardless of cache.")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum number of stages run concurrently.")
+    args = parser.parse_args()
+    run_pipeline(config_from_args(args), targets=[args.until] if args.until else None,
+                 force=tuple(args.force), max_workers=args.workers)
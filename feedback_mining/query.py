@@ -0,0 +1,148 @@
+# feedback_mining/query.py
+"""
+Embedded analytical query layer over the Arrow form of the review table.
+
+Ad-hoc breakdowns (e.g. average compound by class and topic, share of negative
+reviews by age band) run as vectorized hash aggregations inside Apache Arrow's
+in-process compute engine rather than as pandas groupbys over the cached frame.
+The Arrow table keeps the categorical columns dictionary-encoded, so it is built
+once per dataset and shared by every session.
+
+The table can also be persisted as Parquet and queried from the command line:
+
+    python -m feedback_mining.query data/reviews_final_for_streamlit.csv --to-parquet data/reviews.parquet
+    python -m feedback_mining.query data/reviews.parquet --by "Class Name" Topic --metric "Avg Compound"
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from feedback_mining.schema import read_review_table
+from feedback_mining.segments import AGE_BAND_COLUMN, age_bands
+
+# Dimension name -> column in the Arrow table
+QUERY_DIMENSIONS = {
+    'Department Name': 'Department Name',
+    'Class Name': 'Class Name',
+    'Rating': 'Rating',
+    'Recommended IND': 'Recommended IND',
+    AGE_BAND_COLUMN: AGE_BAND_COLUMN,
+    'Sentiment': 'vader_sentiment_label',
+    'Topic': 'dominant_lda_topic',
+}
+
+# Metric name -> (column in the Arrow table, Arrow hash aggregation)
+QUERY_METRICS = {
+    'Reviews': ('dominant_lda_topic', 'count'),
+    'Avg Compound': ('compound', 'mean'),
+    'Avg Rating': ('Rating', 'mean'),
+    'Negative Share': ('is_negative', 'mean'),
+    'Positive Share': ('is_positive', 'mean'),
+    'Recommendation Rate': ('Recommended IND', 'mean'),
+}
+
+# Ready-made breakdowns offered on the Explore page: name -> (dimensions, metrics)
+PRESET_QUERIES = {
+    "Average compound by class and topic": (['Class Name', 'Topic'], ['Avg Compound', 'Reviews']),
+    "Share of negative reviews by age band": ([AGE_BAND_COLUMN], ['Negative Share', 'Reviews']),
+    "Rating and sentiment by department": (['Department Name'], ['Avg Rating', 'Avg Compound', 'Reviews']),
+    "Recommendation rate by topic": (['Topic'], ['Recommendation Rate', 'Reviews']),
+}
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts the review table into the columnar form used by the query layer.
+
+    Only dimension and metric columns are kept; free text stays in pandas.
+    Derived columns ('Age Band', 'is_negative', 'is_positive') are added so
+    that every metric is a plain aggregation.
+
+    Args:
+        df (pd.DataFrame): The review table in its runtime schema.
+
+    Returns:
+        pa.Table: The Arrow table, with categoricals dictionary-encoded.
+    """
+    kept_columns = [col for col in ['Department Name', 'Class Name', 'Rating', 'Recommended IND',
+                                    'vader_sentiment_label', 'dominant_lda_topic', 'compound'] if col in df.columns]
+    query_df = df[kept_columns].copy()
+    if 'Age' in df.columns:
+        query_df[AGE_BAND_COLUMN] = age_bands(df['Age'])
+    if 'vader_sentiment_label' in df.columns:
+        query_df['is_negative'] = (df['vader_sentiment_label'] == 'Negative').astype(np.float32)
+        query_df['is_positive'] = (df['vader_sentiment_label'] == 'Positive').astype(np.float32)
+    return pa.Table.from_pandas(query_df, preserve_index=False)
+
+
+def write_parquet(table: pa.Table, file_path: str) -> None:
+    """Persists the Arrow form of the review table as a Parquet file."""
+    pq.write_table(table, file_path, compression='zstd')
+
+
+def read_parquet(file_path: str) -> pa.Table:
+    """Reads a Parquet file written by `write_parquet`, memory-mapping it when possible."""
+    return pq.read_table(file_path, memory_map=True)
+
+
+def run_aggregate(table: pa.Table, dimensions: list[str], metrics: list[str],
+                  row_positions: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Runs a grouped aggregation inside the Arrow compute engine.
+
+    Args:
+        table (pa.Table): The table returned by `to_arrow_table` or `read_parquet`.
+        dimensions (list[str]): Names from `QUERY_DIMENSIONS` to group by. An empty
+                                list aggregates over all selected rows.
+        metrics (list[str]): Names from `QUERY_METRICS` to compute.
+        row_positions (np.ndarray | None): Optional row subset (e.g. the active
+                                           segment filter); None means all rows.
+
+    Returns:
+        pd.DataFrame: One row per group, with dimension columns first (sorted)
+                      followed by one column per metric.
+
+    Raises:
+        KeyError: If a dimension or metric name is unknown or its column is
+                  missing from the table.
+    """
+    if row_positions is not None:
+        table = table.take(pa.array(row_positions))
+    group_columns = [QUERY_DIMENSIONS[name] for name in dimensions]
+    aggregations = [QUERY_METRICS[name] for name in metrics]
+    missing = [col for col in group_columns + [col for col, _ in aggregations] if col not in table.column_names]
+    if missing:
+        raise KeyError(f"Columns not available in the review table: {missing}")
+
+    if group_columns:
+        result = table.group_by(group_columns).aggregate(aggregations)
+    else:
+        result = pa.table({f"{col}_{func}": [getattr(pc, func)(table[col]).as_py()] for col, func in aggregations})
+
+    # The result has one row per group, so ordering it (categoricals by their
+    # declared order, e.g. age bands) is cheap to do after leaving Arrow.
+    result_df = result.to_pandas()
+    renames = {col: name for name, col in zip(dimensions, group_columns)}
+    renames.update({f"{col}_{func}": name for name, (col, func) in zip(metrics, aggregations)})
+    result_df = result_df.rename(columns=renames)[list(dimensions) + list(metrics)]
+    return result_df.sort_values(list(dimensions)).reset_index(drop=True) if dimensions else result_df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Query the review table with the embedded Arrow engine.")
+    parser.add_argument('source', help="Final review CSV or a Parquet file written with --to-parquet.")
+    parser.add_argument('--to-parquet', metavar='PATH', help="Write the Arrow form of the table to PATH and exit.")
+    parser.add_argument('--by', nargs='*', default=[], choices=list(QUERY_DIMENSIONS), help="Dimensions to group by.")
+    parser.add_argument('--metric', nargs='+', default=['Reviews', 'Avg Compound'], choices=list(QUERY_METRICS))
+    args = parser.parse_args()
+
+    review_table = read_parquet(args.source) if args.source.endswith('.parquet') else to_arrow_table(read_review_table(args.source))
+    if args.to_parquet:
+        write_parquet(review_table, args.to_parquet)
+        print(f"Wrote {review_table.num_rows:,} rows to '{args.to_parquet}'.")
+    else:
+        print(run_aggregate(review_table, args.by, args.metric).to_string(index=False))
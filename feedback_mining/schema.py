@@ -0,0 +1,196 @@
+# feedback_mining/schema.py
+"""
+Declared runtime schema for the review table used by the Streamlit dashboard.
+
+The final CSV written by notebook 03 is read back with pandas' defaults, which
+stores low-cardinality labels as Python-object strings, small integers as int64
+and VADER scores as float64. The schema below declares compact dtypes for every
+column the views rely on, and lists columns that no view reads so they can be
+skipped entirely when the dataset is built.
+
+Running this module prints a bytes-per-review report and checks that the
+aggregates every view renders are unchanged:
+
+    python -m feedback_mining.schema data/reviews_final_for_streamlit.csv
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# --- Runtime dtypes, keyed by column name ---
+RUNTIME_SCHEMA = {
+    'Clothing ID': 'int16',
+    'Age': 'int8',
+    'Rating': 'int8',
+    'Recommended IND': 'int8',
+    'Positive Feedback Count': 'int16',
+    'Division Name': 'category',
+    'Department Name': 'category',
+    'Class Name': 'category',
+    'vader_sentiment_label': 'category',
+    'dominant_lda_topic': 'int8',
+    'neg': 'float32',
+    'neu': 'float32',
+    'pos': 'float32',
+    'compound': 'float32',
+}
+
+# Columns kept in the CSV for notebook inspection but never read by a view.
+DROP_ON_LOAD_COLUMNS = ('processed_tokens', 'cleaned_text_basic')
+
+# Float32 keeps ~7 significant digits; VADER scores are rounded to 4 decimals.
+FLOAT_TOLERANCE = 1e-6
+
+
+def _integer_dtype_for(series: pd.Series, declared: str) -> str | None:
+    """
+    Returns the dtype to cast an integer column to, or None if it should be left as is.
+
+    Columns containing NaN use pandas' nullable integer of the same width (e.g. 'Int8').
+    Values outside the declared width leave the column untouched instead of wrapping.
+    """
+    non_null = series.dropna()
+    if not non_null.empty:
+        if not np.all(np.mod(non_null, 1) == 0):
+            return None
+        limits = np.iinfo(declared)
+        if non_null.min() < limits.min or non_null.max() > limits.max:
+            return None
+    return declared.capitalize() if series.isna().any() else declared
+
+
+def apply_runtime_schema(df: pd.DataFrame, schema: dict = RUNTIME_SCHEMA,
+                         drop_columns: tuple = DROP_ON_LOAD_COLUMNS) -> pd.DataFrame:
+    """
+    Casts the review table to the declared runtime dtypes and drops unused columns.
+
+    Columns that are absent from the frame are ignored, so the same schema works
+    for partially built datasets.
+
+    Args:
+        df (pd.DataFrame): The review table as read from disk.
+        schema (dict): Mapping of column name to target dtype.
+        drop_columns (tuple): Columns to remove from the frame.
+
+    Returns:
+        pd.DataFrame: The compacted frame.
+    """
+    df = df.drop(columns=[col for col in drop_columns if col in df.columns])
+    for col, dtype in schema.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype.startswith('int'):
+            target = _integer_dtype_for(df[col], dtype)
+            if target is not None:
+                df[col] = df[col].astype(target)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_review_table(file_path: str, schema: dict = RUNTIME_SCHEMA,
+                      drop_columns: tuple = DROP_ON_LOAD_COLUMNS) -> pd.DataFrame:
+    """
+    Reads the final review CSV directly into the runtime schema.
+
+    Dropped columns are never parsed, and categorical/float columns are decoded
+    straight into their compact dtype by the CSV reader. Integer columns are
+    narrowed afterwards so missing values can fall back to nullable dtypes.
+
+    Args:
+        file_path (str): Path to 'reviews_final_for_streamlit.csv'.
+        schema (dict): Mapping of column name to target dtype.
+        drop_columns (tuple): Columns to skip while reading.
+
+    Returns:
+        pd.DataFrame: The review table in its runtime schema.
+    """
+    read_dtypes = {col: dtype for col, dtype in schema.items() if dtype == 'category' or dtype.startswith('float')}
+    df = pd.read_csv(file_path, usecols=lambda col: col not in drop_columns, dtype=read_dtypes)
+    return apply_runtime_schema(df, schema, drop_columns)
+
+
+def memory_report(df_before: pd.DataFrame, df_after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compares the per-column memory footprint of two versions of the review table.
+
+    Args:
+        df_before (pd.DataFrame): The frame as loaded with pandas' default dtypes.
+        df_after (pd.DataFrame): The frame after the runtime schema was applied.
+
+    Returns:
+        pd.DataFrame: One row per column with dtypes and bytes per review before/after,
+                      plus a 'TOTAL' row.
+    """
+    n_before, n_after = max(len(df_before), 1), max(len(df_after), 1)
+    bytes_before = df_before.memory_usage(deep=True, index=False)
+    bytes_after = df_after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype_before': df_before.dtypes.astype(str),
+        'dtype_after': df_after.dtypes.astype(str).reindex(df_before.columns).fillna('(dropped)'),
+        'bytes_per_review_before': bytes_before / n_before,
+        'bytes_per_review_after': bytes_after.reindex(df_before.columns).fillna(0) / n_after,
+    })
+    report.loc['TOTAL'] = ['', '', bytes_before.sum() / n_before, bytes_after.sum() / n_after]
+    report['reduction_pct'] = (1 - report['bytes_per_review_after'] / report['bytes_per_review_before']) * 100
+    return report
+
+
+def _view_aggregates(df: pd.DataFrame) -> dict:
+    """Computes the aggregates rendered by the dashboard views, in view-agnostic form."""
+    aggregates = {'n_reviews': len(df)}
+    if 'vader_sentiment_label' in df.columns:
+        counts = df['vader_sentiment_label'].value_counts()
+        aggregates['sentiment_counts'] = {str(k): int(v) for k, v in counts[counts > 0].items()}
+    if 'dominant_lda_topic' in df.columns:
+        aggregates['topic_counts'] = {int(k): int(v) for k, v in df['dominant_lda_topic'].value_counts().items()}
+        if 'vader_sentiment_label' in df.columns:
+            per_topic = df.groupby('dominant_lda_topic', observed=True)['vader_sentiment_label'].value_counts()
+            aggregates['topic_sentiment_counts'] = {(int(t), str(s)): int(v) for (t, s), v in per_topic[per_topic > 0].items()}
+    if 'Rating' in df.columns and 'compound' in df.columns:
+        medians = df.groupby('Rating', observed=True)['compound'].median()
+        aggregates['compound_median_by_rating'] = {int(k): float(v) for k, v in medians.items()}
+    return aggregates
+
+
+def compare_view_aggregates(df_before: pd.DataFrame, df_after: pd.DataFrame,
+                            tolerance: float = FLOAT_TOLERANCE) -> list[str]:
+    """
+    Checks that every aggregate the views display is unchanged by the runtime schema.
+
+    Args:
+        df_before (pd.DataFrame): The frame as loaded with pandas' default dtypes.
+        df_after (pd.DataFrame): The frame after the runtime schema was applied.
+        tolerance (float): Absolute tolerance for float aggregates.
+
+    Returns:
+        list[str]: Human-readable descriptions of mismatches; empty if all views match.
+    """
+    before, after = _view_aggregates(df_before), _view_aggregates(df_after)
+    mismatches = []
+    for name, expected in before.items():
+        actual = after.get(name)
+        if isinstance(expected, dict) and isinstance(actual, dict) and expected.keys() == actual.keys():
+            diffs = [key for key in expected if not np.isclose(expected[key], actual[key], rtol=0, atol=tolerance)]
+            if diffs:
+                mismatches.append(f"{name}: values differ for {diffs[:5]}")
+        elif expected != actual:
+            mismatches.append(f"{name}: {expected!r} != {actual!r}")
+    return mismatches
+
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'data/reviews_final_for_streamlit.csv'
+    df_default = pd.read_csv(csv_path)
+    df_compact = read_review_table(csv_path)
+    pd.set_option('display.width', 160)
+    print(f"Runtime schema report for '{csv_path}' ({len(df_default):,} reviews)\n")
+    print(memory_report(df_default, df_compact).round(1).to_string())
+    problems = compare_view_aggregates(df_default, df_compact)
+    if problems:
+        print("\nView aggregate mismatches:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("\nAll view aggregates match the default-dtype frame.")
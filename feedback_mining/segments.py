@@ -0,0 +1,93 @@
+# feedback_mining/segments.py
+"""
+Precomputed bitmap indexes for slicing the review table by customer segment.
+
+One packed bitmap (1 bit per review) is built per filter value when the dataset
+is loaded. A selection ORs the bitmaps of the values chosen within a filter and
+ANDs the results across filters, so a rerun only touches n_reviews / 8 bytes per
+chosen value instead of comparing every row of the frame again.
+"""
+import numpy as np
+import pandas as pd
+
+AGE_BAND_COLUMN = 'Age Band'
+AGE_BAND_EDGES = [0, 25, 35, 45, 55, 65, np.inf]
+AGE_BAND_LABELS = ['Under 25', '25-34', '35-44', '45-54', '55-64', '65+']
+
+# Filter name -> source column in the review table
+SEGMENT_FILTERS = {
+    'Department Name': 'Department Name',
+    'Class Name': 'Class Name',
+    'Rating': 'Rating',
+    'Recommended IND': 'Recommended IND',
+    AGE_BAND_COLUMN: 'Age',
+}
+
+
+def age_bands(age: pd.Series) -> pd.Series:
+    """
+    Buckets customer ages into the bands used by the segment filters.
+
+    Args:
+        age (pd.Series): The 'Age' column of the review table.
+
+    Returns:
+        pd.Series: An ordered categorical of band labels (NaN where age is missing).
+    """
+    return pd.cut(age, bins=AGE_BAND_EDGES, labels=AGE_BAND_LABELS, right=False)
+
+
+def build_bitmap_index(df: pd.DataFrame, filters: dict = SEGMENT_FILTERS) -> dict:
+    """
+    Builds one packed bitmap per value of every segment filter.
+
+    Args:
+        df (pd.DataFrame): The review table in its runtime schema.
+        filters (dict): Mapping of filter name to source column. Filters whose
+                        column is missing from the frame are skipped.
+
+    Returns:
+        dict: {'n_rows': int, 'bitmaps': {filter_name: {value: np.ndarray[uint8]}}}.
+              Values are ordered as they should be offered in the filter bar.
+    """
+    bitmaps = {}
+    for filter_name, column in filters.items():
+        if column not in df.columns:
+            continue
+        values = age_bands(df[column]) if filter_name == AGE_BAND_COLUMN else df[column]
+        codes, uniques = pd.factorize(values, sort=True)
+        bitmaps[filter_name] = {
+            uniques[i].item() if hasattr(uniques[i], 'item') else uniques[i]: np.packbits(codes == i)
+            for i in range(len(uniques))
+        }
+    return {'n_rows': len(df), 'bitmaps': bitmaps}
+
+
+def select_rows(index: dict, selections: dict) -> np.ndarray | None:
+    """
+    Resolves filter selections to the row positions of matching reviews.
+
+    Values chosen within one filter are OR-ed; filters are AND-ed together.
+    Filters with no chosen values do not constrain the selection.
+
+    Args:
+        index (dict): The index returned by `build_bitmap_index`.
+        selections (dict): Mapping of filter name to a list of chosen values.
+
+    Returns:
+        np.ndarray | None: Sorted row positions (for use with `DataFrame.iloc`),
+                           or None if no filter is active.
+    """
+    combined = None
+    for filter_name, chosen_values in selections.items():
+        if not chosen_values:
+            continue
+        value_bitmaps = index['bitmaps'].get(filter_name, {})
+        chosen_bitmaps = [value_bitmaps[value] for value in chosen_values if value in value_bitmaps]
+        if not chosen_bitmaps:
+            return np.empty(0, dtype=np.int64)
+        filter_mask = np.bitwise_or.reduce(chosen_bitmaps) if len(chosen_bitmaps) > 1 else chosen_bitmaps[0]
+        combined = filter_mask if combined is None else np.bitwise_and(combined, filter_mask)
+    if combined is None:
+        return None
+    return np.flatnonzero(np.unpackbits(combined, count=index['n_rows']))
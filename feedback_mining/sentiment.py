@@ -0,0 +1,78 @@
+# feedback_mining/sentiment.py
+"""
+VADER sentiment scoring and labelling, as applied in notebook 03.
+"""
+import numpy as np
+import pandas as pd
+
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+SENTIMENT_LABELS = ['Positive', 'Neutral', 'Negative']
+VADER_SCORE_COLUMNS = ['neg', 'neu', 'pos', 'compound']
+EMPTY_TEXT_SCORES = {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0}
+VADER_ENGINES = ('nltk', 'vectorized')
+
+
+def load_vader_analyzer(engine: str = 'nltk'):
+    """
+    Returns a VADER analyzer, downloading the lexicon on first use.
+
+    Args:
+        engine (str): 'nltk' for NLTK's `SentimentIntensityAnalyzer`, or 'vectorized'
+            for the NumPy batch scorer in `vader_vectorized.py`.
+    """
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        analyzer = SentimentIntensityAnalyzer()
+    except LookupError:
+        import nltk
+        nltk.download('vader_lexicon', quiet=True)
+        analyzer = SentimentIntensityAnalyzer()
+    if engine == 'vectorized':
+        from feedback_mining.vader_vectorized import VectorizedVaderAnalyzer
+        return VectorizedVaderAnalyzer(analyzer)
+    return analyzer
+
+
+def classify_sentiment(compound) -> np.ndarray:
+    """
+    Maps VADER compound scores to 'Positive' (>= 0.05), 'Negative' (<= -0.05) or 'Neutral'.
+
+    Args:
+        compound: A scalar or array-like of compound scores.
+
+    Returns:
+        np.ndarray: The sentiment label of each score.
+    """
+    compound = np.asarray(compound)
+    return np.select([compound >= POSITIVE_THRESHOLD, compound <= NEGATIVE_THRESHOLD],
+                     ['Positive', 'Negative'], default='Neutral')
+
+
+def score_texts(texts, analyzer=None) -> pd.DataFrame:
+    """
+    Scores texts with VADER and labels each one.
+
+    Empty or non-string texts get neutral scores, as in notebook 03.
+
+    Args:
+        texts: An iterable of texts (the pipeline scores 'processed_text_joined').
+        analyzer: An analyzer from `load_vader_analyzer` (either engine); created if None.
+
+    Returns:
+        pd.DataFrame: Columns 'neg', 'neu', 'pos', 'compound' and 'vader_sentiment_label'.
+    """
+    analyzer = load_vader_analyzer() if analyzer is None else analyzer
+    if hasattr(analyzer, 'polarity_scores_batch'):
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        scores_df = analyzer.polarity_scores_batch(texts)
+        empty = np.array([not text.strip() for text in texts], dtype=bool)
+        scores_df.loc[empty, VADER_SCORE_COLUMNS] = [EMPTY_TEXT_SCORES[column] for column in VADER_SCORE_COLUMNS]
+    else:
+        scores = [
+            analyzer.polarity_scores(text) if isinstance(text, str) and text.strip() else EMPTY_TEXT_SCORES
+            for text in texts
+        ]
+        scores_df = pd.DataFrame.from_records(scores, columns=VADER_SCORE_COLUMNS)
+    scores_df['vader_sentiment_label'] = classify_sentiment(scores_df['compound'])
+    return scores_df
@@ -0,0 +1,238 @@
+# feedback_mining/sharded_tfidf.py
+"""
+Map-reduce build of the TF-IDF vectorizer over shards of the corpus.
+
+1. Map: each worker tokenizes one shard (a contiguous block of reviews) with the
+   vectorizer's own analyzer and counts each term's document frequency.
+2. Reduce: the shard counts are summed per term, `min_df`/`max_df` are applied
+   to the merged counts exactly as `CountVectorizer._limit_features` does, and
+   the sorted vocabulary and smoothed IDF give a fitted `TfidfVectorizer`.
+3. Transform: the workers vectorize their shards with the merged vectorizer and
+   the row blocks are stacked in shard order.
+
+Document frequencies are additive over shards and TF-IDF rows depend only on
+their own review, the vocabulary and the IDF. The result is identical to
+fitting the vectorizer on the whole corpus in one process and transforming it:
+the same vocabulary, the same IDF values, and the same matrix bit for bit.
+(`fit_transform` keeps each row's terms in first-seen order rather than sorted,
+so its L2 norms are summed in another order and can differ in the last bit;
+the pipeline's single-process path therefore also fits, then transforms.)
+
+The steps also run as separate commands that exchange small files, so shards can
+be processed on different machines:
+
+    python -m feedback_mining.sharded_tfidf count data.csv --shard 0 --num-shards 4 --output df_0.npz
+    python -m feedback_mining.sharded_tfidf merge df_*.npz --output tfidf_vectorizer.joblib
+    python -m feedback_mining.sharded_tfidf transform data.csv --shard 0 --num-shards 4 \\
+        --vectorizer tfidf_vectorizer.joblib --output tfidf_0.npz
+    python -m feedback_mining.sharded_tfidf compare data.csv --processes 4   # check against one process
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Integral
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+DEFAULT_TEXT_COLUMN = 'processed_text_joined'
+_ANALYZER_PARAMS = ('input', 'encoding', 'decode_error', 'strip_accents', 'lowercase', 'preprocessor', 'tokenizer',
+                    'stop_words', 'token_pattern', 'ngram_range', 'analyzer') # Shared by CountVectorizer and TfidfVectorizer
+
+_worker_state = {} # Per-process: the vectorizer used by `_transform_shard`
+
+
+def shard_bounds(n_documents: int, num_shards: int) -> list[tuple[int, int]]:
+    """Returns the (start, stop) rows of `num_shards` contiguous, near-equal shards."""
+    edges = np.linspace(0, n_documents, max(1, num_shards) + 1).astype(np.int64)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:])]
+
+
+# --- Map ---
+def shard_document_frequencies(texts, template: TfidfVectorizer) -> dict:
+    """
+    Counts the document frequency of every term in one shard.
+
+    Args:
+        texts: The shard's documents.
+        template (TfidfVectorizer): An unfitted vectorizer; its tokenization settings are used.
+
+    Returns:
+        dict: 'terms' (sorted str array), 'document_frequency' (int64 array) and 'n_documents'.
+    """
+    params = {name: value for name, value in template.get_params().items() if name in _ANALYZER_PARAMS}
+    counter = CountVectorizer(binary=True, dtype=np.int64, **params)
+    texts = list(texts)
+    try:
+        presence = counter.fit_transform(texts)
+    except ValueError: # Empty shard or only empty documents
+        return {'terms': np.array([], dtype=str), 'document_frequency': np.zeros(0, dtype=np.int64), 'n_documents': len(texts)}
+    return {'terms': counter.get_feature_names_out().astype(str),
+            'document_frequency': np.asarray(presence.sum(axis=0), dtype=np.int64).ravel(), 'n_documents': len(texts)}
+
+
+# --- Reduce ---
+def merge_document_frequencies(shards: list[dict]) -> dict:
+    """Sums the document frequencies of several shards (output of `shard_document_frequencies`) per term."""
+    terms, inverse = np.unique(np.concatenate([shard['terms'] for shard in shards]), return_inverse=True)
+    document_frequency = np.zeros(len(terms), dtype=np.int64)
+    np.add.at(document_frequency, inverse, np.concatenate([shard['document_frequency'] for shard in shards]))
+    return {'terms': terms, 'document_frequency': document_frequency,
+            'n_documents': sum(shard['n_documents'] for shard in shards)}
+
+
+def vectorizer_from_frequencies(frequencies: dict, template: TfidfVectorizer) -> TfidfVectorizer:
+    """
+    Builds the fitted vectorizer that `template.fit` would produce on the whole corpus.
+
+    Args:
+        frequencies (dict): Merged counts from `merge_document_frequencies`.
+        template (TfidfVectorizer): An unfitted vectorizer with the wanted settings (`max_features` is not supported).
+
+    Returns:
+        TfidfVectorizer: A fitted copy of `template` with the pruned vocabulary and its IDF.
+    """
+    if template.max_features is not None:
+        raise ValueError("max_features needs term frequencies and is not supported by the sharded build.")
+    n_documents, document_frequency = frequencies['n_documents'], frequencies['document_frequency']
+    # Same thresholds and comparisons as CountVectorizer.fit_transform / _limit_features
+    max_doc_count = template.max_df if isinstance(template.max_df, Integral) else template.max_df * n_documents
+    min_doc_count = template.min_df if isinstance(template.min_df, Integral) else template.min_df * n_documents
+    if max_doc_count < min_doc_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    keep = (document_frequency <= max_doc_count) & (document_frequency >= min_doc_count)
+    if not keep.any():
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+    vectorizer = TfidfVectorizer(**template.get_params())
+    vectorizer.vocabulary_ = {term: index for index, term in enumerate(frequencies['terms'][keep].tolist())}
+    vectorizer.fixed_vocabulary_ = False
+    if vectorizer.use_idf:
+        # Same operations as TfidfTransformer.fit, so the values match bit for bit
+        df = document_frequency[keep].astype(vectorizer.dtype if vectorizer.dtype in (np.float64, np.float32) else np.float64)
+        df += float(vectorizer.smooth_idf)
+        idf = np.full_like(df, fill_value=n_documents + int(vectorizer.smooth_idf))
+        idf /= df
+        np.log(idf, out=idf)
+        idf += 1.0
+        vectorizer.idf_ = idf
+    return vectorizer
+
+
+# --- Transform ---
+def _init_worker(vectorizer: TfidfVectorizer) -> None:
+    _worker_state['vectorizer'] = vectorizer
+
+
+def _transform_shard(texts: list[str]) -> sp.csr_matrix:
+    return _worker_state['vectorizer'].transform(texts)
+
+
+def sharded_fit_transform(texts, template: TfidfVectorizer, n_process: int | None = None,
+                          num_shards: int | None = None) -> tuple[TfidfVectorizer, sp.csr_matrix]:
+    """
+    Fits `template` and transforms the corpus shard by shard across a process pool.
+
+    Args:
+        texts: All documents, in row order.
+        template (TfidfVectorizer): An unfitted vectorizer with the wanted settings.
+        n_process (int | None): Number of worker processes (default: CPU count).
+        num_shards (int | None): Number of shards (default: one per worker).
+
+    Returns:
+        tuple: (fitted vectorizer, TF-IDF matrix), identical to `template.fit(texts)` and its `transform(texts)`.
+    """
+    texts = list(texts)
+    n_process = n_process or os.cpu_count() or 1
+    shards = [texts[start:stop] for start, stop in shard_bounds(len(texts), num_shards or n_process)]
+    with ProcessPoolExecutor(max_workers=n_process) as pool:
+        frequencies = merge_document_frequencies(list(pool.map(shard_document_frequencies, shards, [template] * len(shards))))
+    vectorizer = vectorizer_from_frequencies(frequencies, template)
+    with ProcessPoolExecutor(max_workers=n_process, initializer=_init_worker, initargs=(vectorizer,)) as pool:
+        blocks = list(pool.map(_transform_shard, shards))
+    return vectorizer, sp.vstack(blocks, format='csr')
+
+
+# --- Shard files (for runs across machines) ---
+def save_shard_frequencies(frequencies: dict, file_path: str) -> None:
+    np.savez(file_path, terms=frequencies['terms'], document_frequency=frequencies['document_frequency'],
+             n_documents=np.int64(frequencies['n_documents']))
+
+
+def load_shard_frequencies(file_path: str) -> dict:
+    with np.load(file_path) as data:
+        return {'terms': data['terms'], 'document_frequency': data['document_frequency'],
+                'n_documents': int(data['n_documents'])}
+
+
+def _read_shard(data_file: str, column: str, shard: int, num_shards: int) -> list[str]:
+    """Reads one shard of a review table's text column (empty strings for missing values)."""
+    texts = pd.read_csv(data_file, usecols=[column])[column].fillna('').astype(str)
+    start, stop = shard_bounds(len(texts), num_shards)[shard]
+    return texts.iloc[start:stop].tolist()
+
+
+def _default_template(max_df: float, min_df: int) -> TfidfVectorizer:
+    """The pipeline's vectorizer settings (see `pipeline.stage_tfidf`)."""
+    return TfidfVectorizer(max_df=max_df, min_df=min_df, ngram_range=(1, 1))
+
+
+def _same_matrix(left: sp.csr_matrix, right: sp.csr_matrix) -> bool:
+    return (left.shape == right.shape and np.array_equal(left.indptr, right.indptr)
+            and np.array_equal(left.indices, right.indices) and np.array_equal(left.data, right.data))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the TF-IDF vectorizer and matrix shard by shard.")
+    parser.add_argument('--max-df', type=float, default=0.90)
+    parser.add_argument('--min-df', type=int, default=5)
+    parser.add_argument('--column', default=DEFAULT_TEXT_COLUMN, help="Text column of the review table.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    count_parser = commands.add_parser('count', help="Map: document frequencies of one shard.")
+    transform_parser = commands.add_parser('transform', help="TF-IDF rows of one shard with a merged vectorizer.")
+    for command_parser in (count_parser, transform_parser):
+        command_parser.add_argument('data_file')
+        command_parser.add_argument('--shard', type=int, required=True)
+        command_parser.add_argument('--num-shards', type=int, required=True)
+        command_parser.add_argument('--output', required=True)
+    transform_parser.add_argument('--vectorizer', required=True)
+    merge_parser = commands.add_parser('merge', help="Reduce: merge shard counts into a fitted vectorizer.")
+    merge_parser.add_argument('shard_files', nargs='+')
+    merge_parser.add_argument('--output', required=True)
+    compare_parser = commands.add_parser('compare', help="Run locally and check against the single-process vectorizer.")
+    compare_parser.add_argument('data_file')
+    compare_parser.add_argument('--processes', type=int, default=None)
+    compare_parser.add_argument('--num-shards', type=int, default=None)
+    args = parser.parse_args()
+    template = _default_template(args.max_df, args.min_df)
+
+    if args.command == 'count':
+        frequencies = shard_document_frequencies(_read_shard(args.data_file, args.column, args.shard, args.num_shards), template)
+        save_shard_frequencies(frequencies, args.output)
+        print(f"Shard {args.shard}/{args.num_shards}: {frequencies['n_documents']:,} reviews, {len(frequencies['terms']):,} terms.")
+    elif args.command == 'merge':
+        vectorizer = vectorizer_from_frequencies(
+            merge_document_frequencies([load_shard_frequencies(path) for path in args.shard_files]), template)
+        joblib.dump(vectorizer, args.output)
+        print(f"Merged {len(args.shard_files)} shards: vocabulary of {len(vectorizer.vocabulary_):,} terms written to '{args.output}'.")
+    elif args.command == 'transform':
+        matrix = joblib.load(args.vectorizer).transform(_read_shard(args.data_file, args.column, args.shard, args.num_shards))
+        sp.save_npz(args.output, matrix)
+        print(f"Shard {args.shard}/{args.num_shards}: {matrix.shape[0]:,} x {matrix.shape[1]:,} TF-IDF rows written to '{args.output}'.")
+    else:
+        texts = pd.read_csv(args.data_file, usecols=[args.column])[args.column].fillna('').astype(str).tolist()
+        start = time.perf_counter()
+        single = _default_template(args.max_df, args.min_df).fit(texts)
+        single_matrix = single.transform(texts)
+        single_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorizer, matrix = sharded_fit_transform(texts, template, args.processes, args.num_shards)
+        sharded_seconds = time.perf_counter() - start
+        identical = (vectorizer.vocabulary_ == single.vocabulary_ and np.array_equal(vectorizer.idf_, single.idf_)
+                     and _same_matrix(matrix, single_matrix))
+        print(f"{len(texts):,} reviews, {len(vectorizer.vocabulary_):,} terms: single process {single_seconds:.2f}s, "
+              f"sharded {sharded_seconds:.2f}s. Identical: {identical}.")
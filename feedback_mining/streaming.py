@@ -0,0 +1,350 @@
+# feedback_mining/streaming.py
+"""
+Streaming ingestion of new reviews with incrementally maintained aggregates.
+
+New reviews are read either from a JSONL append-log (one JSON object per line,
+tracked by byte offset) or from a drop directory of .jsonl/.csv files (tracked
+by file name and byte offset or rows consumed). Each micro-batch is cleaned, lemmatized,
+vectorized with the published TF-IDF vectorizer, assigned topics with the
+published LDA model and scored with VADER, exactly like the pipeline. The
+running aggregates are then updated:
+
+* reviews per dominant topic,
+* per-topic mean and variance of the compound score (Welford/Chan batch merge),
+* topic co-occurrence counts at the network threshold,
+* sentiment label counts.
+
+The aggregates and source positions are written together, atomically, to one
+small JSON file after every batch, so a restart resumes exactly where it
+stopped and the dashboard reads the totals without touching the review history.
+
+    python -m feedback_mining.streaming --jsonl data/incoming/reviews.jsonl
+    python -m feedback_mining.streaming --drop-dir data/incoming --once
+"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feedback_mining.artifacts import set_default_permissions
+from feedback_mining.compact_model import load_compact_model
+from feedback_mining.pipeline import ARTIFACTS_DIR, DATA_DIR, published_artifact_paths
+from feedback_mining.sentiment import SENTIMENT_LABELS, load_vader_analyzer, score_texts
+from feedback_mining.text_processing import clean_text_basic, lemmatize_texts, load_spacy_model, load_stop_words
+from feedback_mining.topic_network import PROBABILITY_THRESHOLD, cooccurrence_counts
+
+STREAM_STATE_FILENAME = 'stream_aggregates.json'
+DEFAULT_STATE_PATH = os.path.join(DATA_DIR, STREAM_STATE_FILENAME)
+MICRO_BATCH_SIZE = 256
+POLL_INTERVAL_SECONDS = 2.0
+DROP_FILE_PATTERNS = ('*.jsonl', '*.csv')
+TEXT_COLUMN = 'Review Text'
+
+
+# --- Aggregates ---
+def empty_aggregates(n_topics: int) -> dict:
+    """Returns zeroed running aggregates for a model with `n_topics` topics."""
+    return {
+        'n_reviews': 0,
+        'topic_count': np.zeros(n_topics, dtype=np.int64),
+        'compound_mean': np.zeros(n_topics, dtype=np.float64),
+        'compound_m2': np.zeros(n_topics, dtype=np.float64), # Sum of squared deviations from the mean
+        'cooccurrence': np.zeros((n_topics, n_topics), dtype=np.int64),
+        'sentiment_counts': {label: 0 for label in SENTIMENT_LABELS},
+        'updated_at': None,
+    }
+
+
+def update_aggregates(aggregates: dict, doc_topic: np.ndarray, compound: np.ndarray, sentiment_labels,
+                      threshold: float = PROBABILITY_THRESHOLD) -> dict:
+    """
+    Folds one scored micro-batch into the running aggregates (in place).
+
+    Per-topic batch statistics are computed with `np.bincount` and merged with
+    the running ones using Chan et al.'s pairwise form of Welford's update, so
+    the result equals the statistics over all reviews seen so far.
+
+    Args:
+        aggregates (dict): The running aggregates (see `empty_aggregates`).
+        doc_topic (np.ndarray): The batch's (n, n_topics) LDA topic probabilities.
+        compound (np.ndarray): The batch's VADER compound scores.
+        sentiment_labels: The batch's sentiment labels.
+        threshold (float): Topic probability threshold for co-occurrence.
+
+    Returns:
+        dict: The updated aggregates.
+    """
+    n_topics = aggregates['topic_count'].shape[0]
+    compound = np.asarray(compound, dtype=np.float64)
+    dominant = np.asarray(doc_topic).argmax(axis=1)
+    batch_count = np.bincount(dominant, minlength=n_topics)
+    batch_mean = np.bincount(dominant, weights=compound, minlength=n_topics) / np.maximum(batch_count, 1)
+    batch_m2 = np.bincount(dominant, weights=(compound - batch_mean[dominant]) ** 2, minlength=n_topics)
+
+    count = aggregates['topic_count']
+    total = count + batch_count
+    delta = batch_mean - aggregates['compound_mean']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(total > 0, batch_count / np.maximum(total, 1), 0.0)
+        aggregates['compound_mean'] = aggregates['compound_mean'] + delta * weight
+        aggregates['compound_m2'] = aggregates['compound_m2'] + batch_m2 + delta ** 2 * count * weight
+    aggregates['topic_count'] = total
+    aggregates['cooccurrence'] = aggregates['cooccurrence'] + cooccurrence_counts(doc_topic, threshold)
+    for label, label_count in pd.Series(sentiment_labels).value_counts().items():
+        aggregates['sentiment_counts'][label] = aggregates['sentiment_counts'].get(label, 0) + int(label_count)
+    aggregates['n_reviews'] += len(compound)
+    aggregates['updated_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    return aggregates
+
+
+def topic_aggregate_table(aggregates: dict) -> pd.DataFrame:
+    """Returns one row per topic: 'Topic' (1-based), 'Reviews', 'Mean Compound' and 'Std Compound' (sample)."""
+    count = aggregates['topic_count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.where(count > 1, aggregates['compound_m2'] / (count - 1), np.nan))
+    return pd.DataFrame({
+        'Topic': np.arange(1, len(count) + 1),
+        'Reviews': count,
+        'Mean Compound': np.where(count > 0, aggregates['compound_mean'], np.nan),
+        'Std Compound': std,
+    })
+
+
+# --- State file ---
+def _state_to_json(state: dict) -> dict:
+    """Converts the arrays in a state dict to lists."""
+    aggregates = {key: (value.tolist() if isinstance(value, np.ndarray) else value)
+                  for key, value in state['aggregates'].items()}
+    return {**state, 'aggregates': aggregates}
+
+
+def save_stream_state(state: dict, file_path: str) -> None:
+    """Writes the state (aggregates plus source positions) via a temporary sibling file."""
+    directory = os.path.dirname(file_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(_state_to_json(state), f)
+        set_default_permissions(tmp_path)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_stream_state(file_path: str) -> dict | None:
+    """Reads a state file written by `save_stream_state`, or returns None if there is none."""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path) as f:
+        state = json.load(f)
+    aggregates = state['aggregates']
+    aggregates['topic_count'] = np.asarray(aggregates['topic_count'], dtype=np.int64)
+    aggregates['compound_mean'] = np.asarray(aggregates['compound_mean'], dtype=np.float64)
+    aggregates['compound_m2'] = np.asarray(aggregates['compound_m2'], dtype=np.float64)
+    aggregates['cooccurrence'] = np.asarray(aggregates['cooccurrence'], dtype=np.int64)
+    state.setdefault('drop_file_offsets', {}) # State files written before .jsonl drop files were tracked by offset
+    return state
+
+
+def new_stream_state(n_topics: int) -> dict:
+    """Returns a state with empty aggregates and no source positions."""
+    return {'n_topics': n_topics, 'aggregates': empty_aggregates(n_topics),
+            'jsonl_offsets': {}, 'drop_file_offsets': {}, 'drop_file_rows': {}, 'completed_drop_files': []}
+
+
+# --- Sources ---
+def read_jsonl_records(file_path: str, offset: int, max_records: int, complete: bool = False) -> tuple[list[dict], int]:
+    """
+    Reads up to `max_records` complete lines of a JSONL log from a byte offset.
+
+    A final line without a newline is still being written and is left for the
+    next read, unless the file is `complete` (a dropped file). Lines that are
+    not valid JSON objects are skipped.
+
+    Returns:
+        tuple: The records and the byte offset after the last consumed line.
+    """
+    records = []
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        while len(records) < max_records:
+            line = f.readline()
+            if not line or (not complete and not line.endswith(b'\n')):
+                break
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping malformed line at byte {offset - len(line)} of '{file_path}'.")
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+    return records, offset
+
+
+def iter_drop_file_batches(file_path: str, position: int, batch_size: int):
+    """
+    Yields the remaining records of a dropped .jsonl or .csv file in batches, from a saved position.
+
+    A .jsonl file is read from a byte offset. A .csv file is read by one chunked
+    reader, which skips the `position` rows already consumed once, on opening.
+
+    Yields:
+        tuple: The records and the position after them (a byte offset for .jsonl, a row count for .csv).
+    """
+    if file_path.endswith('.csv'):
+        with pd.read_csv(file_path, skiprows=range(1, position + 1), chunksize=batch_size) as reader:
+            for chunk in reader:
+                position += len(chunk)
+                yield chunk.to_dict('records'), position
+        return
+    while True:
+        records, new_position = read_jsonl_records(file_path, position, batch_size, complete=True)
+        if new_position == position:
+            return
+        position = new_position
+        yield records, position
+
+
+def pending_drop_files(directory: str, state: dict) -> list[str]:
+    """Returns the drop directory's unfinished .jsonl/.csv files, oldest first (hidden/temporary files are ignored)."""
+    completed = set(state['completed_drop_files'])
+    paths = [path for pattern in DROP_FILE_PATTERNS for path in glob.glob(os.path.join(directory, pattern))]
+    return sorted((path for path in paths if os.path.basename(path) not in completed),
+                  key=lambda path: (os.path.getmtime(path), path))
+
+
+# --- Scoring ---
+def load_scoring_models(artifacts_dir: str = ARTIFACTS_DIR, use_compact: bool = False) -> dict:
+    """
+    Loads the current release's vectorizer and LDA model plus the VADER analyzer and text-processing resources.
+
+    Args:
+        artifacts_dir (str): Directory holding the published release.
+        use_compact (bool): Use the release's compact model (pruned vocabulary) when published. Its dominant
+            topics differ from the full model's for a few percent of reviews, so streamed aggregates would
+            no longer match the batch dataset's topic assignments.
+    """
+    published = published_artifact_paths(artifacts_dir)
+    if use_compact and os.path.exists(published['lda_compact']):
+        vectorizer, lda_model = load_compact_model(published['lda_compact'])
+    else:
+        vectorizer, lda_model = joblib.load(published['vectorizer']), joblib.load(published['lda_model'])
+    return {
+        'vectorizer': vectorizer,
+        'lda_model': lda_model,
+        'analyzer': load_vader_analyzer(),
+        'spacy_model': load_spacy_model(),
+        'stop_words': load_stop_words(),
+    }
+
+
+def score_records(records: list[dict], models: dict, text_column: str = TEXT_COLUMN) -> dict:
+    """
+    Scores a micro-batch of review records the way the pipeline scores the corpus.
+
+    Returns:
+        dict: 'doc_topic' (n, n_topics), 'compound' (n,) and 'sentiment_labels' (n,).
+    """
+    texts = [record.get(text_column) for record in records]
+    cleaned = [clean_text_basic(text if isinstance(text, str) else '') for text in texts]
+    processed = [' '.join(tokens) for tokens in lemmatize_texts(cleaned, models['spacy_model'], models['stop_words'])]
+    doc_topic = models['lda_model'].transform(models['vectorizer'].transform(processed))
+    sentiment = score_texts(processed, models['analyzer'])
+    return {'doc_topic': doc_topic, 'compound': sentiment['compound'].to_numpy(),
+            'sentiment_labels': sentiment['vader_sentiment_label'].to_numpy()}
+
+
+def _apply_batch(state: dict, records: list[dict], models: dict, threshold: float) -> None:
+    """Scores a batch and folds it into the state's aggregates."""
+    if records:
+        scored = score_records(records, models)
+        update_aggregates(state['aggregates'], scored['doc_topic'], scored['compound'], scored['sentiment_labels'], threshold)
+
+
+def ingest_available(state: dict, models: dict, state_path: str, jsonl_path: str | None = None,
+                     drop_dir: str | None = None, batch_size: int = MICRO_BATCH_SIZE,
+                     threshold: float = PROBABILITY_THRESHOLD) -> int:
+    """
+    Ingests everything currently available from the sources, one micro-batch at a time.
+
+    The state (aggregates and source positions) is saved after every batch.
+
+    Returns:
+        int: Number of reviews ingested.
+    """
+    ingested = 0
+    if jsonl_path is not None and os.path.exists(jsonl_path):
+        while True:
+            offset = state['jsonl_offsets'].get(jsonl_path, 0)
+            records, new_offset = read_jsonl_records(jsonl_path, offset, batch_size)
+            if new_offset == offset:
+                break
+            _apply_batch(state, records, models, threshold)
+            state['jsonl_offsets'][jsonl_path] = new_offset
+            save_stream_state(state, state_path)
+            ingested += len(records)
+    if drop_dir is not None and os.path.isdir(drop_dir):
+        for file_path in pending_drop_files(drop_dir, state):
+            name = os.path.basename(file_path)
+            positions = state['drop_file_offsets'] if file_path.endswith('.jsonl') else state['drop_file_rows']
+            for records, position in iter_drop_file_batches(file_path, positions.get(name, 0), batch_size):
+                _apply_batch(state, records, models, threshold)
+                positions[name] = position
+                save_stream_state(state, state_path)
+                ingested += len(records)
+            state['completed_drop_files'].append(name)
+            positions.pop(name, None)
+            save_stream_state(state, state_path)
+    return ingested
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score new reviews in micro-batches and maintain running dashboard aggregates.")
+    parser.add_argument('--jsonl', default=None, help="JSONL append-log of new reviews (one object per line with 'Review Text').")
+    parser.add_argument('--drop-dir', default=None, help="Directory where .jsonl/.csv files of new reviews are dropped.")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="Aggregates/state file read by the dashboard.")
+    parser.add_argument('--artifacts-dir', default=ARTIFACTS_DIR)
+    parser.add_argument('--batch-size', type=int, default=MICRO_BATCH_SIZE)
+    parser.add_argument('--threshold', type=float, default=PROBABILITY_THRESHOLD, help="Topic probability threshold for co-occurrence.")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL_SECONDS)
+    parser.add_argument('--compact-model', action='store_true',
+                        help="Score with the release's compact LDA model (faster to load; topics may differ from the batch dataset's).")
+    parser.add_argument('--once', action='store_true', help="Ingest what is available now and exit.")
+    parser.add_argument('--reset', action='store_true', help="Discard existing aggregates and source positions.")
+    args = parser.parse_args()
+    if args.jsonl is None and args.drop_dir is None:
+        parser.error("Give --jsonl and/or --drop-dir.")
+
+    models = load_scoring_models(args.artifacts_dir, use_compact=args.compact_model)
+    n_topics = models['lda_model'].n_components
+    state = None if args.reset else load_stream_state(args.state)
+    if state is not None and state['n_topics'] != n_topics:
+        parser.error(f"'{args.state}' holds aggregates for {state['n_topics']} topics but the model has {n_topics}; rerun with --reset.")
+    state = state or new_stream_state(n_topics)
+    save_stream_state(state, args.state)
+
+    print(f"Ingesting into '{args.state}' ({state['aggregates']['n_reviews']:,} reviews so far). Ctrl+C to stop.")
+    try:
+        while True:
+            start = time.perf_counter()
+            ingested = ingest_available(state, models, args.state, args.jsonl, args.drop_dir, args.batch_size, args.threshold)
+            if ingested:
+                print(f"Ingested {ingested:,} reviews in {time.perf_counter() - start:.2f}s "
+                      f"({state['aggregates']['n_reviews']:,} total).")
+            if args.once:
+                break
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
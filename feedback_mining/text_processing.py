@@ -0,0 +1,162 @@
+# feedback_mining/text_processing.py
+"""
+Text cleaning and lemmatization used to build 'processed_text_joined'.
+
+These are the functions from notebook 02 (NLP Preprocessing), lifted out so the
+pipeline, the ingestion tools and the notebooks all share one implementation.
+
+Without the spaCy model or the NLTK stopword corpus, lemmatization is skipped
+and scikit-learn's stopword list is used. This changes the vocabulary, so the
+release builders only fall back when allowed (`--allow-text-fallback`), and
+`text_resources_signature` identifies what was used in the pipeline's keys.
+"""
+import hashlib
+import re
+
+SPACY_MODEL_NAME = 'en_core_web_sm'
+SPACY_DISABLED_PIPES = ['parser', 'ner'] # Lemmas only need the tagger/attribute ruler
+
+_HTML_TAG_RE = re.compile(r'<.*?>')
+_SQUARE_BRACKETS_RE = re.compile(r'\[.*?\]')
+_URL_RE = re.compile(r'https://\S+|www\.\S+')
+_DIGITS_RE = re.compile(r'\d+')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def clean_text_basic(text) -> str:
+    """
+    Basic text cleaning: lowercase, strip HTML, bracketed text, URLs, digits and punctuation.
+
+    Args:
+        text: The raw review text (non-strings are converted with `str`).
+
+    Returns:
+        str: The cleaned text with single spaces between words.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.lower()
+    text = _HTML_TAG_RE.sub('', text)
+    text = _SQUARE_BRACKETS_RE.sub('', text)
+    text = _URL_RE.sub('', text)
+    text = _DIGITS_RE.sub('', text)
+    text = _PUNCTUATION_RE.sub('', text)
+    text = text.strip()
+    return _WHITESPACE_RE.sub(' ', text)
+
+
+_STOPWORDS_MISSING = "NLTK stopwords not found (run nltk.download('stopwords'))"
+_SPACY_MISSING = f"spaCy '{SPACY_MODEL_NAME}' model not found (pip install spacy && python -m spacy download {SPACY_MODEL_NAME})"
+_FALLBACK_HINT = "or pass --allow-text-fallback to build without it (the vocabulary will differ)"
+
+
+def _nltk_stop_words() -> set[str] | None:
+    """Returns the NLTK English stopword list, or None if the corpus has not been downloaded."""
+    try:
+        from nltk.corpus import stopwords
+        return set(stopwords.words('english'))
+    except LookupError:
+        return None
+
+
+def _spacy_model_version() -> str | None:
+    """Returns the installed spaCy and model versions, without loading the model, or None if either is missing."""
+    try:
+        import spacy
+        from spacy.util import get_package_version
+    except ImportError:
+        return None
+    model_version = get_package_version(SPACY_MODEL_NAME)
+    return None if model_version is None else f"spacy {spacy.__version__}, {SPACY_MODEL_NAME} {model_version}"
+
+
+def load_stop_words(allow_fallback: bool = True) -> set[str]:
+    """
+    Returns the NLTK English stopword list, falling back to scikit-learn's list
+    if the NLTK corpus has not been downloaded.
+
+    Args:
+        allow_fallback (bool): If False, a missing corpus raises a RuntimeError instead.
+    """
+    stop_words = _nltk_stop_words()
+    if stop_words is not None:
+        return stop_words
+    if not allow_fallback:
+        raise RuntimeError(f"{_STOPWORDS_MISSING}; install it {_FALLBACK_HINT}.")
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    print(f"{_STOPWORDS_MISSING}. Using scikit-learn's English stopword list.")
+    return set(ENGLISH_STOP_WORDS)
+
+
+def load_spacy_model(allow_fallback: bool = True):
+    """
+    Loads the spaCy model used for lemmatization, or returns None if it is unavailable.
+
+    Args:
+        allow_fallback (bool): If False, a missing model raises a RuntimeError instead.
+    """
+    try:
+        import spacy
+        return spacy.load(SPACY_MODEL_NAME, disable=SPACY_DISABLED_PIPES)
+    except (ImportError, OSError):
+        if not allow_fallback:
+            raise RuntimeError(f"{_SPACY_MISSING}; install it {_FALLBACK_HINT}.")
+        print(f"{_SPACY_MISSING}. Lemmatization will be skipped (stopword removal only).")
+        return None
+
+
+def text_resources_signature(allow_fallback: bool = True) -> dict:
+    """
+    Identifies the lemmatizer and stopword list `load_spacy_model`/`load_stop_words` resolve to.
+
+    Args:
+        allow_fallback (bool): If False, a missing spaCy model or NLTK corpus raises a RuntimeError.
+
+    Returns:
+        dict: 'lemmatizer' (spaCy and model versions, or 'none') and 'stop_words'
+            (the list's source and a hash of its words).
+    """
+    lemmatizer = _spacy_model_version()
+    if lemmatizer is None and not allow_fallback:
+        raise RuntimeError(f"{_SPACY_MISSING}; install it {_FALLBACK_HINT}.")
+    stop_words, source = _nltk_stop_words(), 'nltk'
+    if stop_words is None:
+        if not allow_fallback:
+            raise RuntimeError(f"{_STOPWORDS_MISSING}; install it {_FALLBACK_HINT}.")
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        stop_words, source = set(ENGLISH_STOP_WORDS), 'sklearn'
+    digest = hashlib.sha256(' '.join(sorted(stop_words)).encode()).hexdigest()[:12]
+    return {'lemmatizer': lemmatizer or 'none', 'stop_words': f"{source} {digest}"}
+
+
+def lemmatize_texts(texts, spacy_model=None, stop_words: set[str] | None = None,
+                    batch_size: int = 1000, n_process: int = 1):
+    """
+    Lemmatizes cleaned texts and removes stopwords, yielding one token list per text.
+
+    Tokens are kept if they are alphabetic, not a spaCy or NLTK stopword and
+    longer than one character. Without a spaCy model, texts are split on
+    whitespace and filtered the same way (no lemmatization).
+
+    Args:
+        texts: An iterable of cleaned texts (see `clean_text_basic`).
+        spacy_model: A loaded spaCy pipeline, or None.
+        stop_words (set[str] | None): Stopwords to remove; defaults to `load_stop_words()`.
+        batch_size (int): Number of texts per spaCy batch.
+        n_process (int): Number of spaCy worker processes.
+
+    Yields:
+        list[str]: The processed tokens of each text, in input order.
+    """
+    stop_words = load_stop_words() if stop_words is None else stop_words
+    if spacy_model is None:
+        for text in texts:
+            yield [word for word in text.split() if word.isalpha() and word not in stop_words and len(word) > 1]
+        return
+    for doc in spacy_model.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield [
+            token.lemma_.lower() for token in doc
+            if token.is_alpha and not token.is_stop
+            and token.lemma_.lower() not in stop_words and len(token.lemma_) > 1
+        ]
@@ -0,0 +1,259 @@
+# feedback_mining/topic_backends.py
+"""
+Interchangeable topic-model engines behind the pipeline's 'lda' stage.
+
+Every backend fits on the TF-IDF matrix and returns a model with the interface
+the app and the other stages already use: `n_components`, a (topics,
+vocabulary) `components_` matrix and a `transform` whose rows are topic
+mixtures summing to 1. The stage's dominant topics and doc-topic matrix are
+therefore built the same way whatever the engine:
+
+* 'sklearn_lda': scikit-learn `LatentDirichletAllocation` (the original engine).
+* 'gensim_lda': gensim `LdaMulticore` (online variational Bayes in worker
+  processes). The fitted topic-word variational parameters and symmetric priors
+  are loaded into a `LatentDirichletAllocation`, as `compact_model` does, so the
+  published model is a plain scikit-learn model and inference is unchanged.
+* 'nmf': scikit-learn `NMF` on the TF-IDF matrix. Its document weights are
+  normalized into mixtures by `NormalizedNMF.transform`. NMF has no Dirichlet
+  priors, so no compact model or perplexity is available for it.
+
+`benchmark_topic_backends` fits every engine on the same matrix and compares fit
+time, transform latency, memory and coherence.
+
+    python -m feedback_mining.topic_backends --backends sklearn_lda gensim_lda nmf
+"""
+import argparse
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.special import psi
+from sklearn.decomposition import NMF, LatentDirichletAllocation
+
+from feedback_mining.coherence import binary_document_term_matrix, topic_coherence
+from feedback_mining.memory import estimate_bytes, process_memory
+
+TOPIC_BACKENDS = ('sklearn_lda', 'gensim_lda', 'nmf')
+GENSIM_PASSES = 5
+GENSIM_CHUNKSIZE = 2000
+NMF_MAX_ITER = 400
+BENCHMARK_TRANSFORM_ROWS = 1000
+RSS_SAMPLE_SECONDS = 0.05
+
+
+class NormalizedNMF(NMF):
+    """`NMF` whose document weights are returned as topic mixtures (rows summing to 1; uniform for empty rows)."""
+
+    @staticmethod
+    def _normalize(weights: np.ndarray) -> np.ndarray:
+        totals = weights.sum(axis=1, keepdims=True)
+        return np.where(totals > 0, weights / np.where(totals > 0, totals, 1), 1.0 / weights.shape[1])
+
+    def fit_transform(self, X, y=None, W=None, H=None):
+        return self._normalize(super().fit_transform(X, y, W=W, H=H))
+
+    def transform(self, X):
+        return self._normalize(super().transform(X))
+
+
+def gensim_to_sklearn_lda(topic_word: np.ndarray, doc_topic_prior: float, topic_word_prior: float,
+                          n_jobs: int | None = None) -> LatentDirichletAllocation:
+    """
+    Builds a fitted `LatentDirichletAllocation` from variational topic-word parameters.
+
+    Args:
+        topic_word (np.ndarray): The (topics, vocabulary) variational parameters (gensim's lambda).
+        doc_topic_prior (float): Symmetric document-topic prior (alpha).
+        topic_word_prior (float): Symmetric topic-word prior (eta).
+        n_jobs (int | None): Jobs of the model's `transform`.
+
+    Returns:
+        LatentDirichletAllocation: A model whose `transform` runs the same E-step on these parameters.
+    """
+    components = np.asarray(topic_word, dtype=np.float64)
+    lda_model = LatentDirichletAllocation(n_components=components.shape[0], doc_topic_prior=doc_topic_prior,
+                                          topic_word_prior=topic_word_prior, n_jobs=n_jobs)
+    lda_model.components_ = components
+    lda_model.exp_dirichlet_component_ = np.exp(psi(components) - psi(components.sum(axis=1))[:, None])
+    lda_model.doc_topic_prior_ = doc_topic_prior
+    lda_model.topic_word_prior_ = topic_word_prior
+    lda_model.n_features_in_ = components.shape[1]
+    lda_model.n_batch_iter_ = lda_model.n_iter_ = 0
+    return lda_model
+
+
+def _fit_sklearn_lda(tfidf_matrix, n_components: int, random_state: int, n_jobs: int | None, params: dict):
+    lda_model = LatentDirichletAllocation(n_components=n_components, random_state=random_state, n_jobs=n_jobs, **params)
+    return lda_model, lda_model.fit_transform(tfidf_matrix)
+
+
+def _fit_gensim_lda(tfidf_matrix, n_components: int, random_state: int, n_jobs: int | None, params: dict):
+    from gensim.matutils import Sparse2Corpus
+    from gensim.models import LdaMulticore
+
+    tfidf_matrix = sp.csr_matrix(tfidf_matrix)
+    workers = params.pop('workers', None) or max(1, (os.cpu_count() or 2) - 1) # gensim's default: one core for the dispatcher
+    gensim_model = LdaMulticore(
+        corpus=Sparse2Corpus(tfidf_matrix, documents_columns=False), num_topics=n_components,
+        id2word={term: str(term) for term in range(tfidf_matrix.shape[1])}, workers=workers,
+        passes=params.pop('passes', GENSIM_PASSES), chunksize=params.pop('chunksize', GENSIM_CHUNKSIZE),
+        random_state=random_state, **params,
+    )
+    # 'symmetric' priors are 1 / n_components for every topic and term
+    lda_model = gensim_to_sklearn_lda(gensim_model.state.get_lambda(), float(gensim_model.alpha[0]),
+                                      float(np.mean(gensim_model.eta)), n_jobs)
+    return lda_model, lda_model.transform(tfidf_matrix)
+
+
+def _fit_nmf(tfidf_matrix, n_components: int, random_state: int, n_jobs: int | None, params: dict):
+    nmf_model = NormalizedNMF(n_components=n_components, init=params.pop('init', 'nndsvda'), random_state=random_state,
+                              max_iter=params.pop('max_iter', NMF_MAX_ITER), **params)
+    return nmf_model, nmf_model.fit_transform(tfidf_matrix)
+
+
+_BACKEND_FITTERS = {'sklearn_lda': _fit_sklearn_lda, 'gensim_lda': _fit_gensim_lda, 'nmf': _fit_nmf}
+
+
+def fit_topic_model(backend: str, tfidf_matrix, n_components: int, random_state: int = 42,
+                    n_jobs: int | None = -1, **params) -> tuple[object, np.ndarray]:
+    """
+    Fits a topic model with the chosen engine.
+
+    Args:
+        backend (str): One of `TOPIC_BACKENDS`.
+        tfidf_matrix: The (reviews, vocabulary) TF-IDF matrix.
+        n_components (int): Number of topics.
+        random_state (int): Seed of the fit.
+        n_jobs (int | None): Parallel jobs of scikit-learn inference.
+        **params: Engine options (e.g. 'learning_method'/'max_iter' for 'sklearn_lda',
+            'passes'/'workers' for 'gensim_lda', 'max_iter' for 'nmf').
+
+    Returns:
+        tuple: (model, doc_topic) where `doc_topic` is the (reviews, n_components) float64 matrix of topic mixtures.
+    """
+    if backend not in _BACKEND_FITTERS:
+        raise ValueError(f"Unknown topic backend '{backend}'. Choose from {TOPIC_BACKENDS}.")
+    model, doc_topic = _BACKEND_FITTERS[backend](tfidf_matrix, n_components, random_state, n_jobs, dict(params))
+    return model, np.asarray(doc_topic, dtype=np.float64)
+
+
+def topic_backend_params(config: dict) -> dict:
+    """Returns the pipeline config's options for its 'topic_backend' (the LDA settings apply to scikit-learn's LDA only)."""
+    if config['topic_backend'] == 'sklearn_lda':
+        return {'learning_method': config['lda_learning_method'], 'max_iter': config['lda_max_iter']}
+    return {}
+
+
+def supports_compact_model(model) -> bool:
+    """True if the model carries the Dirichlet priors `compact_model` needs (both LDA backends)."""
+    return isinstance(model, LatentDirichletAllocation)
+
+
+def _process_tree_rss() -> int:
+    """Returns the RSS of this process plus its child processes (e.g. gensim's workers), from /proc."""
+    rss = process_memory()['rss'] or 0
+    for children_file in glob.glob('/proc/self/task/*/children'):
+        try:
+            with open(children_file) as f:
+                pids = f.read().split()
+        except OSError:
+            continue
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/status') as f:
+                    rss += next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+            except (OSError, StopIteration, ValueError):
+                pass
+    return rss
+
+
+def _peak_rss_growth(func):
+    """Calls `func` and returns (its result, the peak growth of the process tree's sampled RSS in bytes)."""
+    baseline = peak = _process_tree_rss()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(RSS_SAMPLE_SECONDS):
+            peak = max(peak, _process_tree_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = func()
+    finally:
+        done.set()
+        sampler.join()
+    return result, max(peak, _process_tree_rss()) - baseline
+
+
+def benchmark_topic_backends(tfidf_matrix, backends: list[str], n_components: int, random_state: int = 42,
+                             transform_rows: int = BENCHMARK_TRANSFORM_ROWS, backend_params: dict | None = None) -> pd.DataFrame:
+    """
+    Fits each engine on the same TF-IDF matrix and measures it.
+
+    Args:
+        tfidf_matrix: The (reviews, vocabulary) TF-IDF matrix.
+        backends (list[str]): Engines to compare.
+        n_components (int): Number of topics.
+        random_state (int): Seed of every fit.
+        transform_rows (int): Reviews in the timed transform batch.
+        backend_params (dict | None): Per-backend options for `fit_topic_model`.
+
+    Returns:
+        pd.DataFrame: One row per backend: 'fit_seconds', 'transform_ms' (batch of `transform_rows`),
+            'single_review_ms', 'fit_peak_mb' (peak RSS growth during the fit, sampled every
+            `RSS_SAMPLE_SECONDS` over this process and its children, so gensim's workers count),
+            'model_mb', 'umass' and 'npmi' (mean coherence).
+    """
+    tfidf_matrix = sp.csr_matrix(tfidf_matrix)
+    presence = binary_document_term_matrix(tfidf_matrix)
+    batch, single = tfidf_matrix[:transform_rows], tfidf_matrix[:1]
+    rows = []
+    for backend in backends:
+        start = time.perf_counter()
+        (model, _), fit_peak = _peak_rss_growth(lambda: fit_topic_model(
+            backend, tfidf_matrix, n_components, random_state, **(backend_params or {}).get(backend, {})))
+        fit_seconds = time.perf_counter() - start
+        model.transform(single) # Warm-up (thread pools, lazily built attributes)
+        start = time.perf_counter()
+        model.transform(batch)
+        transform_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(20):
+            model.transform(single)
+        single_seconds = (time.perf_counter() - start) / 20
+        coherence = topic_coherence(model.components_, presence)
+        rows.append({'backend': backend, 'fit_seconds': fit_seconds, 'transform_ms': transform_seconds * 1e3,
+                     'single_review_ms': single_seconds * 1e3, 'fit_peak_mb': fit_peak / 1e6,
+                     'model_mb': estimate_bytes(model) / 1e6,
+                     'umass': float(coherence['UMass'].mean()), 'npmi': float(coherence['NPMI'].mean())})
+        print(f"[benchmark] {backend:<11} fit {fit_seconds:.1f}s, NPMI {rows[-1]['npmi']:.3f}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    from feedback_mining.pipeline import add_config_arguments, config_from_args, load_stage_outputs, run_pipeline
+
+    parser = argparse.ArgumentParser(description="Compare the topic-model engines on the pipeline's cached TF-IDF matrix.")
+    add_config_arguments(parser)
+    parser.add_argument('--backends', nargs='+', choices=TOPIC_BACKENDS, default=list(TOPIC_BACKENDS))
+    parser.add_argument('--transform-rows', type=int, default=BENCHMARK_TRANSFORM_ROWS)
+    parser.add_argument('--output', default=None, help="Also write the report to this CSV.")
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    keys = run_pipeline(config, targets=['tfidf'])
+    tfidf_matrix = load_stage_outputs(config, 'tfidf', keys['tfidf'])['tfidf_matrix']
+    report = benchmark_topic_backends(
+        tfidf_matrix, args.backends, config['num_topics'], config['random_state'], args.transform_rows,
+        {backend: topic_backend_params({**config, 'topic_backend': backend}) for backend in args.backends})
+    print(f"{tfidf_matrix.shape[0]:,} reviews x {tfidf_matrix.shape[1]:,} terms, {config['num_topics']} topics:")
+    print(report.round(3).to_string(index=False))
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"Report written to '{args.output}'.")
@@ -0,0 +1,118 @@
+# feedback_mining/topic_network.py
+"""
+Topic co-occurrence counting and network construction.
+
+Notebook 03 looped over every review and every topic pair in Python. Here a
+review "contains" a topic when its LDA probability reaches the threshold, and
+all pair counts come from one product of the binary review x topic matrix with
+itself.
+"""
+import networkx as nx
+import numpy as np
+
+from feedback_mining.network_analytics import annotate_network
+
+PROBABILITY_THRESHOLD = 0.20
+NODE_SIZE_MULTIPLIER = 20 # Visual scaling of node 'size' (dominant-topic prevalence), as in notebook 03
+
+
+def topic_presence(doc_topic: np.ndarray, threshold: float = PROBABILITY_THRESHOLD) -> np.ndarray:
+    """Returns the boolean review x topic matrix of topics at or above the probability threshold."""
+    return doc_topic >= threshold
+
+
+def cooccurrence_counts(doc_topic: np.ndarray, threshold: float = PROBABILITY_THRESHOLD) -> np.ndarray:
+    """
+    Counts, for every pair of topics, the reviews in which both reach the threshold.
+
+    Args:
+        doc_topic (np.ndarray): The (n_reviews, n_topics) LDA document-topic matrix.
+        threshold (float): Minimum topic probability for a topic to count as present.
+
+    Returns:
+        np.ndarray: A symmetric (n_topics, n_topics) int64 matrix with a zero diagonal.
+    """
+    presence = topic_presence(doc_topic, threshold).astype(np.float64) # BLAS product; exact for counts < 2**53
+    counts = np.rint(presence.T @ presence).astype(np.int64)
+    np.fill_diagonal(counts, 0)
+    return counts
+
+
+def active_topics_per_review(doc_topic: np.ndarray, threshold: float = PROBABILITY_THRESHOLD) -> list[list[int]]:
+    """Returns the 1-based topics at or above the threshold for each review."""
+    presence = topic_presence(doc_topic, threshold)
+    _, topics = np.nonzero(presence)
+    split_points = np.cumsum(presence.sum(axis=1))[:-1]
+    return [group.tolist() for group in np.split(topics + 1, split_points)]
+
+
+def build_topic_network(counts: np.ndarray, dominant_topics: np.ndarray, presence_counts: np.ndarray | None = None) -> nx.Graph:
+    """
+    Builds the topic co-occurrence graph saved as 'topic_network.gexf'.
+
+    Nodes are 1-based topic ids with a 'size' attribute proportional to how many
+    reviews have the topic as dominant; edges carry the co-occurrence count as 'weight'.
+    With `presence_counts`, nodes also get 'presence' (reviews in which the topic
+    reaches the threshold) and the graph its 'n_reviews', as needed for edge lift
+    (see `network_analytics.annotate_network`).
+
+    Args:
+        counts (np.ndarray): The matrix returned by `cooccurrence_counts`.
+        dominant_topics (np.ndarray): The 1-based dominant topic of each review.
+        presence_counts (np.ndarray | None): Reviews per topic at or above the threshold.
+
+    Returns:
+        nx.Graph: The topic network.
+    """
+    prevalence = np.bincount(dominant_topics, minlength=counts.shape[0] + 1)
+    return topic_network_from_totals(counts, prevalence, len(dominant_topics), presence_counts)
+
+
+def topic_network_from_totals(counts: np.ndarray, prevalence: np.ndarray, n_reviews: int,
+                              presence_counts: np.ndarray | None = None) -> nx.Graph:
+    """
+    Builds the same graph as `build_topic_network` from per-topic totals instead of per-review topics.
+
+    Used when the reviews are processed in chunks (see `out_of_core`): every input is a sum over reviews.
+
+    Args:
+        counts (np.ndarray): The matrix returned by `cooccurrence_counts`.
+        prevalence (np.ndarray): Reviews per dominant topic, indexed by the 1-based topic (index 0 unused).
+        n_reviews (int): Number of reviews.
+        presence_counts (np.ndarray | None): Reviews per topic at or above the threshold.
+
+    Returns:
+        nx.Graph: The topic network.
+    """
+    n_topics = counts.shape[0]
+    graph = nx.Graph(n_reviews=int(n_reviews))
+    for topic in range(1, n_topics + 1):
+        graph.add_node(topic, size=int(max(prevalence[topic], 1) * NODE_SIZE_MULTIPLIER))
+        if presence_counts is not None:
+            graph.nodes[topic]['presence'] = int(presence_counts[topic - 1])
+    rows, cols = np.nonzero(np.triu(counts, k=1))
+    graph.add_weighted_edges_from((int(i) + 1, int(j) + 1, int(counts[i, j])) for i, j in zip(rows, cols))
+    return graph
+
+
+def topic_network_at_threshold(doc_topic: np.ndarray, threshold: float = PROBABILITY_THRESHOLD,
+                               row_positions: np.ndarray | None = None) -> nx.Graph:
+    """
+    Rebuilds the topic network for any threshold from the document-topic matrix.
+
+    Used by the Network page's threshold slider: one comparison and one
+    (n_topics x n_topics) product, so the cost is linear in the number of reviews.
+    The graph carries the measures of `network_analytics.annotate_network`.
+
+    Args:
+        doc_topic (np.ndarray): The (n_reviews, n_topics) matrix (may be memory-mapped).
+        threshold (float): Minimum topic probability for a topic to count as present.
+        row_positions (np.ndarray | None): Restrict the network to these reviews (e.g. a segment).
+
+    Returns:
+        nx.Graph: The annotated network, as built by `build_topic_network`.
+    """
+    doc_topic = np.asarray(doc_topic if row_positions is None else doc_topic[row_positions])
+    presence_counts = topic_presence(doc_topic, threshold).sum(axis=0)
+    graph = build_topic_network(cooccurrence_counts(doc_topic, threshold), doc_topic.argmax(axis=1) + 1, presence_counts)
+    return annotate_network(graph)
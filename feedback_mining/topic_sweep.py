@@ -0,0 +1,210 @@
+# feedback_mining/topic_sweep.py
+"""
+Parallel sweep over the LDA topic count.
+
+Fits one model per candidate topic count in a process pool, with the
+configured topic backend, and reports perplexity (NaN for NMF), mean UMass
+and NPMI coherence and fit time for each. The TF-IDF matrix comes
+from the pipeline's cached 'tfidf' stage and is placed in shared memory once;
+workers attach to it instead of receiving a pickled copy per task.
+
+The chosen model is handed to the pipeline as the 'lda' stage output for that
+topic count, so the co-occurrence network, final dataset and 'lda_model.joblib'
+are all rebuilt from it and stay consistent.
+
+    python -m feedback_mining.topic_sweep --min-topics 4 --max-topics 12
+    python -m feedback_mining.topic_sweep --min-topics 4 --max-topics 12 --criterion perplexity
+    python -m feedback_mining.topic_sweep --min-topics 6 --max-topics 9 --select 8   # publish the 8-topic model
+    python -m feedback_mining.topic_sweep --min-topics 4 --max-topics 12 --no-publish
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from feedback_mining.coherence import binary_document_term_matrix, topic_coherence
+from feedback_mining.pipeline import (
+    add_config_arguments, compute_stage_keys, config_from_args, downstream_stages, load_stage_outputs, run_pipeline,
+    store_stage_outputs,
+)
+from feedback_mining.topic_backends import fit_topic_model, topic_backend_params
+
+SWEEP_REPORT_FILENAME = 'topic_sweep_report.csv'
+SELECTION_CRITERIA = ('npmi', 'umass', 'perplexity')
+_CSR_ARRAYS = ('data', 'indices', 'indptr')
+
+_worker_state = {} # Per-process: the attached shared-memory blocks and the matrices built on them
+
+
+# --- Shared-memory CSR matrix ---
+def share_csr_matrix(matrix) -> tuple[list[shared_memory.SharedMemory], dict]:
+    """
+    Copies a CSR matrix's arrays into shared-memory blocks.
+
+    Args:
+        matrix: A SciPy sparse matrix (converted to CSR).
+
+    Returns:
+        tuple: The created blocks (the caller must close and unlink them) and a
+            picklable spec for `attach_csr_matrix`.
+    """
+    matrix = sp.csr_matrix(matrix)
+    blocks, spec = [], {'shape': matrix.shape, 'arrays': {}}
+    for name in _CSR_ARRAYS:
+        array = getattr(matrix, name)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        spec['arrays'][name] = (block.name, array.dtype.str, array.shape[0])
+    return blocks, spec
+
+
+def attach_csr_matrix(spec: dict) -> tuple[sp.csr_matrix, list[shared_memory.SharedMemory]]:
+    """
+    Builds a CSR matrix directly on the shared-memory blocks described by `spec` (no copy).
+
+    Returns:
+        tuple: The matrix and the attached blocks, which must stay referenced while it is used.
+    """
+    blocks, arrays = [], {}
+    for name, (block_name, dtype, length) in spec['arrays'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+    matrix = sp.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=spec['shape'], copy=False)
+    return matrix, blocks
+
+
+def _init_worker(spec: dict) -> None:
+    """Process-pool initializer: attaches the shared TF-IDF matrix once per worker."""
+    matrix, blocks = attach_csr_matrix(spec)
+    _worker_state.update(matrix=matrix, blocks=blocks, presence=binary_document_term_matrix(matrix))
+
+
+# --- Sweep ---
+def _fit_topic_count(num_topics: int, lda_params: dict) -> dict:
+    """Fits and scores one topic model on the worker's shared TF-IDF matrix."""
+    matrix = _worker_state['matrix']
+    params = dict(lda_params)
+    backend = params.pop('backend', 'sklearn_lda')
+    if backend == 'gensim_lda':
+        params.setdefault('workers', 1)
+    start = time.perf_counter()
+    # One thread per fit: the pool already runs one fit per core
+    lda_model, doc_topic = fit_topic_model(backend, matrix, num_topics, n_jobs=1, **params)
+    fit_seconds = time.perf_counter() - start
+    coherence = topic_coherence(lda_model.components_, _worker_state['presence'])
+    return {
+        'num_topics': num_topics,
+        'perplexity': float(lda_model.perplexity(matrix)) if hasattr(lda_model, 'perplexity') else np.nan,
+        'umass': float(coherence['UMass'].mean()),
+        'npmi': float(coherence['NPMI'].mean()),
+        'fit_seconds': fit_seconds,
+        'lda_model': lda_model,
+        'doc_topic': doc_topic,
+    }
+
+
+def sweep_topic_counts(tfidf_matrix, topic_counts: list[int], lda_params: dict,
+                       max_workers: int | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Fits one LDA model per topic count in parallel.
+
+    Args:
+        tfidf_matrix: The document-term matrix the models are fitted on.
+        topic_counts (list[int]): The candidate numbers of topics.
+        lda_params (dict): 'backend' (a `TOPIC_BACKENDS` name, default 'sklearn_lda'), 'random_state'
+            and the backend's options (e.g. 'learning_method', 'max_iter').
+        max_workers (int | None): Size of the process pool (default: CPU count).
+
+    Returns:
+        tuple: A report DataFrame (one row per topic count, sorted by it) and a
+            dict mapping each topic count to its fitted 'lda_model' and 'doc_topic'.
+    """
+    blocks, spec = share_csr_matrix(tfidf_matrix)
+    rows, fits = [], {}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(spec,)) as pool:
+            futures = [pool.submit(_fit_topic_count, num_topics, lda_params) for num_topics in topic_counts]
+            for future in as_completed(futures):
+                result = future.result()
+                fits[result['num_topics']] = {'lda_model': result.pop('lda_model'), 'doc_topic': result.pop('doc_topic')}
+                rows.append(result)
+                print(f"[sweep] {result['num_topics']:>3} topics: perplexity {result['perplexity']:.1f}, "
+                      f"UMass {result['umass']:.3f}, NPMI {result['npmi']:.3f}, fit {result['fit_seconds']:.1f}s")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    report = pd.DataFrame(rows, columns=['num_topics', 'perplexity', 'umass', 'npmi', 'fit_seconds'])
+    return report.sort_values('num_topics', ignore_index=True), fits
+
+
+def choose_topic_count(report: pd.DataFrame, criterion: str = 'npmi') -> int:
+    """Returns the topic count with the highest mean coherence ('npmi' or 'umass') or the lowest perplexity."""
+    if criterion not in SELECTION_CRITERIA:
+        raise ValueError(f"Unknown criterion '{criterion}'. Choose from {SELECTION_CRITERIA}.")
+    best_row = report['perplexity'].idxmin() if criterion == 'perplexity' else report[criterion].idxmax()
+    return int(report.loc[best_row, 'num_topics'])
+
+
+def publish_topic_model(config: dict, num_topics: int, fit: dict, max_workers: int | None = None) -> dict:
+    """
+    Makes a sweep model the active one.
+
+    The model is cached as the pipeline's 'lda' output for `num_topics`, then the
+    pipeline reruns the downstream stages, republishing the dataset and artifacts.
+    Every stage downstream of 'lda' is forced, because an earlier run may have
+    cached it for the same key from a different model.
+
+    Returns:
+        dict: The stage keys returned by `run_pipeline`.
+    """
+    config = {**config, 'num_topics': num_topics}
+    doc_topic = fit['doc_topic']
+    store_stage_outputs(config, 'lda', compute_stage_keys(config)['lda'], {
+        'lda_model': fit['lda_model'], 'doc_topic': doc_topic,
+        'dominant_topic': (doc_topic.argmax(axis=1) + 1).astype(np.int64),
+    })
+    return run_pipeline(config, force=downstream_stages('lda'), max_workers=max_workers)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fit LDA for a range of topic counts in parallel and publish the best model.")
+    add_config_arguments(parser)
+    parser.add_argument('--min-topics', type=int, default=4)
+    parser.add_argument('--max-topics', type=int, default=12)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--criterion', choices=SELECTION_CRITERIA, default='npmi', help="How the published model is chosen.")
+    parser.add_argument('--select', type=int, default=None, help="Publish this topic count instead of the best by --criterion.")
+    parser.add_argument('--no-publish', action='store_true', help="Only report; leave the active model unchanged.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of models fitted at once.")
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    topic_counts = list(range(args.min_topics, args.max_topics + 1, args.step))
+    if args.select is not None and args.select not in topic_counts:
+        parser.error(f"--select {args.select} is not in the swept range {topic_counts}.")
+
+    keys = run_pipeline(config, targets=['tfidf'])
+    tfidf_matrix = load_stage_outputs(config, 'tfidf', keys['tfidf'])['tfidf_matrix']
+    if args.criterion == 'perplexity' and config['topic_backend'] == 'nmf':
+        parser.error("NMF has no perplexity; use --criterion npmi or umass.")
+    lda_params = {'backend': config['topic_backend'], 'random_state': config['random_state'], **topic_backend_params(config)}
+    report, fits = sweep_topic_counts(tfidf_matrix, topic_counts, lda_params, max_workers=args.workers)
+
+    report_path = os.path.join(config['artifacts_dir'], SWEEP_REPORT_FILENAME)
+    os.makedirs(config['artifacts_dir'], exist_ok=True)
+    report.to_csv(report_path, index=False)
+    print(report.to_string(index=False))
+    print(f"Report written to '{report_path}'.")
+
+    if not args.no_publish:
+        chosen = args.select if args.select is not None else choose_topic_count(report, args.criterion)
+        print(f"Publishing the {chosen}-topic model as the active LDA artifact.")
+        publish_topic_model(config, chosen, fits[chosen])
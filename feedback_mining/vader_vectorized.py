@@ -0,0 +1,353 @@
+# feedback_mining/vader_vectorized.py
+"""
+A NumPy implementation of NLTK's VADER scorer over token-id arrays.
+
+`SentimentIntensityAnalyzer.polarity_scores` walks each review's tokens in
+Python. Here the only per-token Python work is splitting the text and one dict
+lookup that maps each raw token to a token id; every property VADER needs
+(lexicon valence, booster value, negation, ALL CAPS, the special words of its
+rules) is looked up once per distinct token and gathered into arrays. A batch
+of reviews is then scored on flat token arrays: the rules that look back one to
+three tokens become shifted comparisons, and per-review sums are `bincount`
+segment reductions.
+
+The rules follow `nltk.sentiment.vader` (3.9), including:
+
+* tokenization: whitespace split, tokens of one character dropped, one leading
+  or trailing punctuation mark from VADER's list stripped;
+* ALL-CAPS emphasis (when only some tokens are capitalized);
+* boosters/dampeners up to three tokens back (scaled by 1, 0.95, 0.9);
+* negation ("not", "n't", "never so ...", "least") and the special idioms;
+* the "but" rule (x0.5 before the first "but", x1.5 after);
+* "!" and "?" emphasis, and NLTK's use of a token's first position in the
+  review for repeated tokens.
+
+Tolerance: per review, 'compound' agrees with NLTK to within 1e-4 and 'neg',
+'neu' and 'pos' to within 1e-3. Sums are accumulated in the same order as NLTK,
+so differences come only from the final rounding (`np.round` rounds the
+scaled binary value half to even, Python's `round` rounds the exact decimal
+value), which can move a value by one unit in its last decimal place.
+
+    python -m feedback_mining.vader_vectorized data/reviews_final_for_streamlit.csv --repeat 50
+"""
+import argparse
+import string
+import time
+
+import numpy as np
+import pandas as pd
+
+from feedback_mining.sentiment import VADER_SCORE_COLUMNS, load_vader_analyzer
+
+COMPOUND_TOLERANCE = 1e-4
+PROPORTION_TOLERANCE = 1e-3
+VECTORIZED_BATCH_SIZE = 100000 # Reviews per array pass; bounds the size of the flat token arrays
+ALPHA = 15 # VADER's normalization constant for the compound score
+
+# Token flags (bit mask per token id)
+_IN_LEXICON, _BOOSTER, _NEGATED, _UPPER = 1, 2, 4, 8
+_LEAST, _AT_OR_VERY, _BUT, _KIND, _OF = 16, 32, 64, 128, 256 # Compared lower-cased, as NLTK does
+_NEVER, _SO_OR_THIS = 512, 1024 # Compared case-sensitively, as NLTK does
+
+
+class VectorizedVaderAnalyzer:
+    """
+    Scores batches of texts with VADER's rules on token-id arrays.
+
+    Attributes:
+        token_ids (dict): Raw whitespace token -> token id (-1 for dropped tokens).
+    """
+
+    def __init__(self, analyzer=None):
+        analyzer = load_vader_analyzer() if analyzer is None else analyzer
+        self.lexicon = analyzer.lexicon
+        self.constants = analyzer.constants
+        self.punctuation = set(string.punctuation) # What `SentiText` strips before matching words
+        self.token_ids = {}
+        self._canonical_ids = {}
+        self._valence, self._booster, self._flags = [], [], []
+        self._arrays = None
+
+    # --- Token table ---
+    def _canonical_token(self, raw_token: str) -> str | None:
+        """Returns the token NLTK's `SentiText` keeps for a whitespace token, or None if it is dropped."""
+        if len(raw_token) <= 1:
+            return None
+        for mark in self.constants.PUNC_LIST:
+            for word in (raw_token[len(mark):] if raw_token.startswith(mark) else None,
+                         raw_token[:-len(mark)] if raw_token.endswith(mark) else None):
+                if word is not None and len(word) > 1 and not any(char in self.punctuation for char in word):
+                    return word
+        return raw_token
+
+    def _token_id(self, raw_token: str) -> int:
+        """Adds a raw token (and its canonical form) to the token table."""
+        canonical = self._canonical_token(raw_token)
+        if canonical is None:
+            token_id = -1
+        elif canonical in self._canonical_ids:
+            token_id = self._canonical_ids[canonical]
+        else:
+            token_id = self._canonical_ids[canonical] = len(self._flags)
+            lower = canonical.lower()
+            flags = _IN_LEXICON * (lower in self.lexicon) | _BOOSTER * (lower in self.constants.BOOSTER_DICT) \
+                | _NEGATED * (lower in self.constants.NEGATE or "n't" in lower) | _UPPER * canonical.isupper() \
+                | _LEAST * (lower == 'least') | _AT_OR_VERY * (lower in ('at', 'very')) | _BUT * (lower == 'but') \
+                | _KIND * (lower == 'kind') | _OF * (lower == 'of') \
+                | _NEVER * (canonical == 'never') | _SO_OR_THIS * (canonical in ('so', 'this'))
+            self._flags.append(flags)
+            self._valence.append(self.lexicon.get(lower, 0.0))
+            self._booster.append(self.constants.BOOSTER_DICT.get(lower, 0.0))
+            self._arrays = None
+        self.token_ids[raw_token] = token_id
+        return token_id
+
+    def _token_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the (valence, booster, flags) arrays indexed by token id."""
+        if self._arrays is None:
+            self._arrays = (np.asarray(self._valence, dtype=np.float64), np.asarray(self._booster, dtype=np.float64),
+                            np.asarray(self._flags, dtype=np.int64))
+        return self._arrays
+
+    def tokenize(self, texts) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Maps texts to one flat token-id array.
+
+        Returns:
+            tuple: (token_ids, indptr); review r's tokens are token_ids[indptr[r]:indptr[r + 1]].
+        """
+        token_ids, get_id, add_id = [], self.token_ids.get, self._token_id
+        indptr = [0]
+        for text in texts:
+            for raw_token in text.split():
+                token_id = get_id(raw_token)
+                if token_id is None:
+                    token_id = add_id(raw_token)
+                if token_id >= 0:
+                    token_ids.append(token_id)
+            indptr.append(len(token_ids))
+        return np.asarray(token_ids, dtype=np.int64), np.asarray(indptr, dtype=np.int64)
+
+    def _sequence_ids(self, phrase: str) -> list[int] | None:
+        """Returns the token ids of a multi-word phrase, or None if one of its words was never seen."""
+        ids = [self._canonical_ids.get(word) for word in phrase.split(' ')]
+        return None if any(token_id is None for token_id in ids) else ids
+
+    # --- Scoring ---
+    def polarity_scores_batch(self, texts) -> pd.DataFrame:
+        """
+        Scores texts like `SentimentIntensityAnalyzer.polarity_scores`.
+
+        Args:
+            texts: An iterable of strings.
+
+        Returns:
+            pd.DataFrame: Columns 'neg', 'neu', 'pos' and 'compound', one row per text.
+        """
+        texts = list(texts)
+        batches = [self._score_batch(texts[start:start + VECTORIZED_BATCH_SIZE])
+                   for start in range(0, len(texts), VECTORIZED_BATCH_SIZE)]
+        if not batches:
+            return pd.DataFrame({column: [] for column in VADER_SCORE_COLUMNS}, dtype=np.float64)
+        return pd.concat(batches, ignore_index=True)
+
+    def _score_batch(self, texts: list) -> pd.DataFrame:
+        """Scores one batch on flat token arrays."""
+        constants = self.constants
+        ids, indptr = self.tokenize(texts)
+        valence_table, booster_table, flag_table = self._token_arrays()
+        n_texts, n_tokens = len(texts), len(ids)
+        lengths = np.diff(indptr)
+        review = np.repeat(np.arange(n_texts), lengths)
+        position = np.arange(n_tokens) - indptr[review]
+        remaining = lengths[review] - position - 1 # Tokens after this one in its review
+
+        def back(values, k, fill=0):
+            """values[i - k] within the same review, else `fill`."""
+            shifted = np.full_like(values, fill)
+            if k < len(values):
+                shifted[k:] = values[:len(values) - k]
+            shifted[position < k] = fill
+            return shifted
+
+        def ahead(values, k, fill=0):
+            """values[i + k] within the same review, else `fill`."""
+            shifted = np.full_like(values, fill)
+            if k < len(values):
+                shifted[:len(values) - k] = values[k:]
+            shifted[remaining < k] = fill
+            return shifted
+
+        flags = flag_table[ids]
+        has = lambda flag_values, flag: (flag_values & flag) != 0
+        upper_count = np.bincount(review, weights=has(flags, _UPPER), minlength=n_texts)
+        cap_diff = ((lengths - upper_count > 0) & (lengths - upper_count < lengths))[review]
+        in_lexicon = has(flags, _IN_LEXICON)
+
+        # Lexicon valence with ALL-CAPS emphasis
+        valence = np.where(in_lexicon, valence_table[ids], 0.0)
+        valence += np.where(in_lexicon & has(flags, _UPPER) & cap_diff,
+                            np.where(valence > 0, constants.C_INCR, -constants.C_INCR), 0.0)
+
+        # Boosters, negation and idioms up to three tokens back
+        previous_flags = [None] + [back(flags, k) for k in (1, 2, 3)]
+        for k, dampening in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            prior = previous_flags[k]
+            applies = in_lexicon & (position >= k) & ~has(prior, _IN_LEXICON)
+            scalar = np.where(valence < 0, -1.0, 1.0) * booster_table[back(ids, k)]
+            scalar += np.where(has(prior, _BOOSTER) & has(prior, _UPPER) & cap_diff,
+                               np.where(valence > 0, constants.C_INCR, -constants.C_INCR), 0.0)
+            valence = np.where(applies, valence + scalar * dampening, valence)
+
+            negated = has(prior, _NEGATED)
+            if k == 1:
+                factor = np.where(negated, constants.N_SCALAR, 1.0)
+            elif k == 2:
+                never_so = has(previous_flags[2], _NEVER) & has(previous_flags[1], _SO_OR_THIS)
+                factor = np.where(never_so, 1.5, np.where(negated, constants.N_SCALAR, 1.0))
+            else:
+                emphasis = (has(previous_flags[3], _NEVER) & has(previous_flags[2], _SO_OR_THIS)) \
+                    | has(previous_flags[1], _SO_OR_THIS)
+                factor = np.where(emphasis, 1.25, np.where(negated, constants.N_SCALAR, 1.0))
+            valence = np.where(applies, valence * factor, valence)
+            if k == 3:
+                valence = np.where(applies, self._idioms(ids, valence, back, ahead), valence)
+
+        # "least" negation
+        least_before = has(previous_flags[1], _LEAST) & ~has(previous_flags[1], _IN_LEXICON)
+        least_negates = ((position > 1) & ~has(previous_flags[2], _AT_OR_VERY)) | (position == 1)
+        valence = np.where(in_lexicon & least_before & least_negates, valence * constants.N_SCALAR, valence)
+
+        # Boosters and "kind of" carry no valence themselves
+        kind_of = has(flags, _KIND) & has(ahead(flags, 1), _OF) & (remaining > 0)
+        valence = np.where(has(flags, _BOOSTER) | kind_of, 0.0, valence)
+
+        # NLTK scores a repeated token in the context of its first position in the review
+        _, first_index, inverse = np.unique(review * (len(flag_table) + 1) + ids, return_index=True, return_inverse=True)
+        valence = valence[first_index[inverse]]
+
+        # "but": halve the tokens before the first "but", boost those after it
+        is_but = has(flags, _BUT)
+        if is_but.any():
+            no_but = np.iinfo(np.int64).max
+            first_but = np.full(n_texts, no_but)
+            np.minimum.at(first_but, review[is_but], position[is_but])
+            but_position = first_but[review]
+            valence = valence * np.where(but_position == no_but, 1.0,
+                                         np.where(position < but_position, 0.5, np.where(position > but_position, 1.5, 1.0)))
+
+        return self._aggregate(texts, review, valence, lengths)
+
+    def _idioms(self, ids, valence, back, ahead) -> np.ndarray:
+        """Applies VADER's special-case idioms and booster bigrams (the `_idioms_check` step)."""
+        constants = self.constants
+        valence = valence.copy()
+        matched = np.zeros(len(ids), dtype=bool)
+        # (offsets relative to the current token) in NLTK's order; the first match wins
+        for offsets in ((-1, 0), (-2, -1, 0), (-2, -1), (-3, -2, -1), (-3, -2)):
+            for idiom, idiom_valence in constants.SPECIAL_CASE_IDIOMS.items():
+                idiom_ids = self._sequence_ids(idiom)
+                if idiom_ids is None or len(idiom_ids) != len(offsets):
+                    continue
+                hit = ~matched & np.logical_and.reduce(
+                    [back(ids, -offset, -1) == token_id for offset, token_id in zip(offsets, idiom_ids)])
+                valence[hit] = idiom_valence
+                matched |= hit
+        for offsets in ((0, 1), (0, 1, 2)): # Idioms starting at the current token override
+            for idiom, idiom_valence in constants.SPECIAL_CASE_IDIOMS.items():
+                idiom_ids = self._sequence_ids(idiom)
+                if idiom_ids is None or len(idiom_ids) != len(offsets):
+                    continue
+                hit = np.logical_and.reduce([(ids if offset == 0 else ahead(ids, offset, -1)) == token_id
+                                             for offset, token_id in zip(offsets, idiom_ids)])
+                valence[hit] = idiom_valence
+        bigram_booster = np.zeros(len(ids), dtype=bool)
+        for phrase in constants.BOOSTER_DICT:
+            phrase_ids = self._sequence_ids(phrase) if ' ' in phrase else None
+            if phrase_ids is None or len(phrase_ids) != 2:
+                continue
+            for first_offset in (3, 2): # "threetwo" and "twoone"
+                bigram_booster |= (back(ids, first_offset, -1) == phrase_ids[0]) & (back(ids, first_offset - 1, -1) == phrase_ids[1])
+        return np.where(bigram_booster, valence + constants.B_DECR, valence)
+
+    def _aggregate(self, texts: list, review: np.ndarray, valence: np.ndarray, lengths: np.ndarray) -> pd.DataFrame:
+        """Turns token valences into per-review 'neg', 'neu', 'pos' and 'compound' (`score_valence`)."""
+        n_texts = len(texts)
+        sum_s = np.bincount(review, weights=valence, minlength=n_texts)
+        pos_sum = np.bincount(review, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n_texts)
+        neg_sum = np.bincount(review, weights=np.where(valence < 0, valence - 1, 0.0), minlength=n_texts)
+        neu_count = np.bincount(review, weights=valence == 0, minlength=n_texts)
+
+        exclamations = np.fromiter((text.count('!') for text in texts), dtype=np.float64, count=n_texts)
+        questions = np.fromiter((text.count('?') for text in texts), dtype=np.float64, count=n_texts)
+        amplifier = np.minimum(exclamations, 4) * 0.292 \
+            + np.where(questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0)
+
+        sum_s = sum_s + np.sign(sum_s) * amplifier
+        compound = sum_s / np.sqrt(sum_s * sum_s + ALPHA)
+        more_positive, more_negative = pos_sum > np.abs(neg_sum), pos_sum < np.abs(neg_sum)
+        pos_sum = np.where(more_positive, pos_sum + amplifier, pos_sum)
+        neg_sum = np.where(more_negative, neg_sum - amplifier, neg_sum)
+        total = pos_sum + np.abs(neg_sum) + neu_count
+        scored = lengths > 0
+        safe_total = np.where(scored, total, 1.0)
+        return pd.DataFrame({
+            'neg': np.where(scored, np.round(np.abs(neg_sum / safe_total), 3), 0.0),
+            'neu': np.where(scored, np.round(np.abs(neu_count / safe_total), 3), 0.0),
+            'pos': np.where(scored, np.round(np.abs(pos_sum / safe_total), 3), 0.0),
+            'compound': np.where(scored, np.round(compound, 4), 0.0),
+        }, columns=VADER_SCORE_COLUMNS)
+
+
+def compare_with_nltk(texts, analyzer=None) -> dict:
+    """
+    Scores texts with both engines and reports the largest differences.
+
+    Returns:
+        dict: The maximum absolute difference per score column, the number of texts
+            outside the documented tolerance, and both engines' seconds.
+    """
+    texts = list(texts)
+    nltk_analyzer = load_vader_analyzer() if analyzer is None else analyzer
+    start = time.perf_counter()
+    expected = pd.DataFrame.from_records([nltk_analyzer.polarity_scores(text) for text in texts], columns=VADER_SCORE_COLUMNS)
+    nltk_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = VectorizedVaderAnalyzer(nltk_analyzer).polarity_scores_batch(texts)
+    vectorized_seconds = time.perf_counter() - start
+    difference = (expected - actual).abs()
+    outside = (difference['compound'] > COMPOUND_TOLERANCE + 1e-12) \
+        | (difference[['neg', 'neu', 'pos']] > PROPORTION_TOLERANCE + 1e-12).any(axis=1)
+    return {'max_difference': difference.max().to_dict(), 'n_outside_tolerance': int(outside.sum()),
+            'nltk_seconds': nltk_seconds, 'vectorized_seconds': vectorized_seconds}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the vectorized VADER engine against NLTK and benchmark it on a repeated corpus.")
+    parser.add_argument('data_file', help="A review CSV.")
+    parser.add_argument('--column', default='Review Text', help="Text column to score.")
+    parser.add_argument('--repeat', type=int, default=50, help="Copies of the corpus in the benchmark (50 x 20k = 1M reviews).")
+    parser.add_argument('--nltk-sample', type=int, default=20000, help="Reviews scored by NLTK to estimate its throughput.")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data_file, usecols=[args.column])[args.column].fillna('').astype(str).tolist()
+    agreement = compare_with_nltk(texts)
+    print(f"Agreement on {len(texts):,} reviews: max |difference| "
+          + ', '.join(f"{column} {value:.4f}" for column, value in agreement['max_difference'].items())
+          + f"; {agreement['n_outside_tolerance']} outside tolerance "
+          f"(compound {COMPOUND_TOLERANCE}, proportions {PROPORTION_TOLERANCE}).")
+
+    corpus = texts * args.repeat
+    analyzer = load_vader_analyzer()
+    sample = corpus[:args.nltk_sample]
+    start = time.perf_counter()
+    for text in sample:
+        analyzer.polarity_scores(text)
+    nltk_rate = len(sample) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    VectorizedVaderAnalyzer(analyzer).polarity_scores_batch(corpus)
+    vectorized_seconds = time.perf_counter() - start
+    print(f"Benchmark on {len(corpus):,} reviews: vectorized {vectorized_seconds:.1f}s "
+          f"({len(corpus) / vectorized_seconds:,.0f} reviews/s); NLTK {nltk_rate:,.0f} reviews/s "
+          f"(~{len(corpus) / nltk_rate:,.0f}s estimated from {len(sample):,} reviews); "
+          f"speed-up {len(corpus) / vectorized_seconds / nltk_rate:.1f}x.")
@@ -0,0 +1,174 @@
+# feedback_mining/vocabulary.py
+"""
+A memory-mapped, trie-backed form of the published TF-IDF vectorizer.
+
+The pickled `TfidfVectorizer` keeps its vocabulary as a Python dict (one string
+and one int object per term, plus hash table), and 'tfidf_feature_names.joblib'
+holds the same strings again as an object array. Here the terms live in a
+`marisa_trie.Trie` file that is opened memory-mapped, so processes share its
+pages, and the column order and IDF weights are small NumPy arrays.
+
+`TrieTfidfVectorizer.transform` tokenizes like the original vectorizer and
+returns the same TF-IDF matrix; the object also indexes like the
+feature-name array (`vocabulary[column]` is the term of a column).
+
+    python -m feedback_mining.vocabulary data/reviews_final_for_streamlit.csv
+"""
+import argparse
+import json
+import os
+import time
+
+import joblib
+import marisa_trie
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+VOCABULARY_TRIE_FILENAME = 'tfidf_vocabulary.marisa'
+VOCABULARY_INDEX_FILENAME = 'tfidf_vocabulary_index.npz'
+
+
+def build_vocabulary_trie(vectorizer) -> marisa_trie.Trie:
+    """Returns a trie of the fitted vectorizer's terms (trie key ids differ from column indices)."""
+    return marisa_trie.Trie(vectorizer.vocabulary_.keys())
+
+
+def save_vocabulary_index(vectorizer, trie: marisa_trie.Trie, file_path: str) -> None:
+    """
+    Writes the arrays that map trie key ids to the vectorizer's columns.
+
+    Args:
+        vectorizer: The fitted TF-IDF vectorizer.
+        trie (marisa_trie.Trie): The trie from `build_vocabulary_trie`.
+        file_path (str): Destination .npz path.
+    """
+    key_columns = np.empty(len(trie), dtype=np.int32)
+    for term, key_id in trie.iteritems():
+        key_columns[key_id] = vectorizer.vocabulary_[term]
+    column_keys = np.empty_like(key_columns)
+    column_keys[key_columns] = np.arange(len(key_columns), dtype=np.int32)
+    params = {name: value for name, value in vectorizer.get_params().items()
+              if name not in ('vocabulary', 'dtype', 'tokenizer', 'preprocessor', 'analyzer')}
+    params['dtype'] = np.dtype(vectorizer.dtype).name
+    np.savez(file_path, key_columns=key_columns, column_keys=column_keys, idf=vectorizer.idf_,
+             params=np.array(json.dumps(params, default=sorted))) # Sets (e.g. stop words) are stored as lists
+
+
+class TrieTfidfVectorizer:
+    """
+    Drop-in replacement for the fitted `TfidfVectorizer` at inference time.
+
+    Supports `transform`, `get_feature_names_out` and sequence access to the
+    feature names (`len(vocabulary)`, `vocabulary[column]`).
+    """
+
+    def __init__(self, trie: marisa_trie.Trie, key_columns: np.ndarray, column_keys: np.ndarray,
+                 idf: np.ndarray, params: dict):
+        self.trie = trie
+        self.key_columns = key_columns
+        self.column_keys = column_keys
+        self.idf_ = idf
+        self.params = {**params, 'ngram_range': tuple(params['ngram_range'])}
+        self.dtype = np.dtype(params['dtype'])
+        self._analyzer = TfidfVectorizer(**{**self.params, 'dtype': self.dtype}).build_analyzer()
+
+    def __len__(self) -> int:
+        return len(self.column_keys)
+
+    def __getitem__(self, column: int) -> str:
+        return self.trie.restore_key(int(self.column_keys[column]))
+
+    def get_feature_names_out(self) -> np.ndarray:
+        """Returns all terms in column order (materializes them)."""
+        return np.array([self[column] for column in range(len(self))], dtype=object)
+
+    def transform(self, raw_documents) -> sp.csr_matrix:
+        """
+        Returns the TF-IDF matrix of the documents, identical to `TfidfVectorizer.transform`.
+
+        Args:
+            raw_documents: An iterable of strings.
+
+        Returns:
+            sp.csr_matrix: The (n_documents, n_terms) matrix with sorted indices.
+        """
+        lookup, analyze = self.trie.get, self._analyzer
+        key_ids, indptr = [], [0]
+        for document in raw_documents:
+            key_ids.extend(key_id for key_id in map(lookup, analyze(document)) if key_id is not None)
+            indptr.append(len(key_ids))
+        n_documents, n_terms = len(indptr) - 1, len(self)
+        columns = self.key_columns[np.asarray(key_ids, dtype=np.int64)].astype(np.int64)
+        rows = np.repeat(np.arange(n_documents, dtype=np.int64), np.diff(indptr))
+        cells, counts = np.unique(rows * n_terms + columns, return_counts=True) # Sorted by row, then column
+
+        X = sp.csr_matrix((counts.astype(self.dtype), (cells % n_terms).astype(np.int32),
+                           np.searchsorted(cells // n_terms, np.arange(n_documents + 1))),
+                          shape=(n_documents, n_terms))
+        if self.params['sublinear_tf']:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.params['use_idf']:
+            X.data *= self.idf_[X.indices]
+        if self.params['norm'] is not None:
+            X = normalize(X, norm=self.params['norm'], copy=False)
+        return X
+
+
+def load_trie_vectorizer(trie_path: str, index_path: str) -> TrieTfidfVectorizer:
+    """Opens the trie memory-mapped and loads the column index and IDF arrays."""
+    trie = marisa_trie.Trie()
+    trie.mmap(trie_path)
+    with np.load(index_path) as index:
+        return TrieTfidfVectorizer(trie, index['key_columns'], index['column_keys'], index['idf'],
+                                   json.loads(str(index['params'])))
+
+
+if __name__ == '__main__':
+    import resource
+    import tracemalloc
+
+    from feedback_mining.pipeline import ARTIFACTS_DIR, published_artifact_paths
+
+    parser = argparse.ArgumentParser(description="Compare the trie-backed vectorizer with the pickled one: load time, memory and output.")
+    parser.add_argument('data_file', help="The final review CSV (needs 'processed_text_joined').")
+    parser.add_argument('--artifacts-dir', default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+
+    published = published_artifact_paths(args.artifacts_dir)
+    texts = pd.read_csv(args.data_file, usecols=['processed_text_joined'])['processed_text_joined'].fillna('').tolist()
+
+    def measure(load_func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = load_func()
+        seconds = time.perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return loaded, seconds, allocated
+
+    (vectorizer, feature_names), pickle_seconds, pickle_bytes = measure(
+        lambda: (joblib.load(published['vectorizer']), joblib.load(published['feature_names'])))
+    trie_vectorizer, trie_seconds, trie_bytes = measure(
+        lambda: load_trie_vectorizer(published['vocabulary_trie'], published['vocabulary_index']))
+
+    start = time.perf_counter()
+    expected = vectorizer.transform(texts)
+    pickle_transform_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = trie_vectorizer.transform(texts)
+    trie_transform_seconds = time.perf_counter() - start
+
+    identical = (expected.shape == actual.shape and np.array_equal(expected.indptr, actual.indptr)
+                 and np.array_equal(expected.indices, actual.indices) and np.array_equal(expected.data, actual.data))
+    print(f"Terms:     {len(trie_vectorizer):,}")
+    print(f"Load:      {pickle_seconds * 1e3:,.1f} ms -> {trie_seconds * 1e3:,.1f} ms")
+    print(f"Heap:      {pickle_bytes / 1e6:,.2f} MB -> {trie_bytes / 1e6:,.2f} MB "
+          f"(trie file {os.path.getsize(published['vocabulary_trie']) / 1e6:,.2f} MB, memory-mapped)")
+    print(f"Transform: {pickle_transform_seconds:.2f}s -> {trie_transform_seconds:.2f}s for {len(texts):,} reviews")
+    print(f"Matrices identical: {identical}; feature names identical: "
+          f"{list(feature_names) == list(trie_vectorizer.get_feature_names_out())}")
+    print(f"Peak RSS:  {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3:,.0f} MB")
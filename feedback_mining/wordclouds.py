@@ -0,0 +1,117 @@
+# feedback_mining/wordclouds.py
+"""
+Per-topic word-cloud images, rendered once at build time.
+
+The pipeline's 'wordclouds' stage renders one PNG per topic from the topic's
+word distribution (`lda_model.components_`), and one per topic x sentiment
+label, where each word's topic weight is multiplied by its summed TF-IDF over
+the reviews of that topic and label. The images are published with the other
+artifacts of a release (so they are keyed by the release's content version)
+and the Topics page shows the files directly.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from feedback_mining.sentiment import SENTIMENT_LABELS
+
+WORDCLOUD_DIRNAME = 'wordclouds'
+WORDCLOUD_SENTIMENTS = ['All'] + SENTIMENT_LABELS
+WORDCLOUD_MAX_WORDS = 60
+WORDCLOUD_SIZE = (640, 360)
+WORDCLOUD_COLUMNS = ['topic', 'sentiment', 'png']
+
+
+def wordcloud_artifact_name(topic: int, sentiment: str = 'All') -> str:
+    """Returns the release artifact name of a topic's (or topic x sentiment's) image."""
+    return f'wordcloud_topic_{topic}' if sentiment == 'All' else f'wordcloud_topic_{topic}_{sentiment.lower()}'
+
+
+def wordcloud_filename(topic: int, sentiment: str = 'All') -> str:
+    """Returns the image's path relative to a release (or the legacy artifacts directory)."""
+    return os.path.join(WORDCLOUD_DIRNAME, wordcloud_artifact_name(topic, sentiment).replace('wordcloud_', '') + '.png')
+
+
+def render_wordcloud_png(frequencies: dict, max_words: int = WORDCLOUD_MAX_WORDS, random_state: int = 42) -> bytes:
+    """Renders word weights as a PNG word cloud and returns its bytes."""
+    from wordcloud import WordCloud
+
+    width, height = WORDCLOUD_SIZE
+    cloud = WordCloud(width=width, height=height, background_color='white', max_words=max_words,
+                      colormap='viridis', random_state=random_state, prefer_horizontal=0.9)
+    buffer = io.BytesIO()
+    cloud.generate_from_frequencies(frequencies).to_image().save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def topic_word_frequencies(weights: np.ndarray, feature_names, max_words: int = WORDCLOUD_MAX_WORDS) -> dict:
+    """Returns the `max_words` heaviest words of a weight vector as {word: weight}."""
+    weights = np.asarray(weights, dtype=np.float64).ravel()
+    top = np.argsort(-weights, kind='stable')[:max_words]
+    return {str(feature_names[i]): float(weights[i]) for i in top if weights[i] > 0}
+
+
+def render_topic_wordclouds(lda_model, feature_names, tfidf_matrix, dominant_topic, sentiment_labels,
+                            max_words: int = WORDCLOUD_MAX_WORDS, random_state: int = 42) -> pd.DataFrame:
+    """
+    Renders the word cloud of every topic and of every topic x sentiment label.
+
+    Args:
+        lda_model: The fitted LDA model.
+        feature_names: The vocabulary, in TF-IDF column order.
+        tfidf_matrix: The reviews' TF-IDF matrix.
+        dominant_topic: Each review's 1-based dominant topic.
+        sentiment_labels: Each review's VADER label ('Positive', 'Neutral' or 'Negative').
+        max_words (int): Words per image.
+        random_state (int): Seed of the word placement.
+
+    Returns:
+        pd.DataFrame: Columns 'topic', 'sentiment' ('All' or a label) and 'png' (the image bytes).
+            Topic x sentiment combinations without reviews are left out.
+    """
+    topic_word = lda_model.components_ / lda_model.components_.sum(axis=1, keepdims=True)
+    dominant_topic, sentiment_labels = np.asarray(dominant_topic), np.asarray(sentiment_labels)
+    images = []
+    for topic in range(1, topic_word.shape[0] + 1):
+        images.append((topic, 'All', render_wordcloud_png(
+            topic_word_frequencies(topic_word[topic - 1], feature_names, max_words), max_words, random_state)))
+        for sentiment in SENTIMENT_LABELS:
+            rows = np.flatnonzero((dominant_topic == topic) & (sentiment_labels == sentiment))
+            if len(rows) == 0:
+                continue
+            weights = np.asarray(tfidf_matrix[rows].sum(axis=0)).ravel() * topic_word[topic - 1]
+            frequencies = topic_word_frequencies(weights, feature_names, max_words)
+            if frequencies:
+                images.append((topic, sentiment, render_wordcloud_png(frequencies, max_words, random_state)))
+    return pd.DataFrame(images, columns=WORDCLOUD_COLUMNS)
+
+
+def write_png(png: bytes, file_path: str) -> None:
+    """Writes image bytes, creating the parent directory."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(png)
+
+
+def wordcloud_paths(artifact_paths: dict, artifacts_dir: str, n_topics: int) -> dict:
+    """
+    Returns the existing word-cloud images of the current release.
+
+    Args:
+        artifact_paths (dict): The resolved artifact paths (see `artifacts.resolve_artifacts`).
+        artifacts_dir (str): The artifacts directory, for images published before releases.
+        n_topics (int): Number of topics of the loaded model.
+
+    Returns:
+        dict: {(topic, sentiment): path} for every image found.
+    """
+    paths = {}
+    for topic in range(1, n_topics + 1):
+        for sentiment in WORDCLOUD_SENTIMENTS:
+            path = artifact_paths.get(wordcloud_artifact_name(topic, sentiment),
+                                      os.path.join(artifacts_dir, wordcloud_filename(topic, sentiment)))
+            if os.path.exists(path):
+                paths[(topic, sentiment)] = path
+    return paths
@@ -1,14 +1,68 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from feedback_mining.streaming import load_stream_state, topic_aggregate_table
+from ui_sections.key_findings import render_key_findings
 
 # Define consistent colors (can be imported from a central config if you have one)
 # For now, defining them here to match potential global theme colors we discussed.
 PRIMARY_BLUE = "#007bff" # Example: Bootstrap Primary Blue
 SUCCESS_GREEN = "#28a745" # Example: Bootstrap Success Green
 BOX_BACKGROUND_COLOR = "#F8F9FA" # A light, neutral background
+LIVE_PANEL_REFRESH_SECONDS = 10
+
+@st.fragment(run_every=LIVE_PANEL_REFRESH_SECONDS)
+def render_live_ingestion_panel(stream_state_path: str | None, topic_labels_config: dict | None):
+    """
+    Displays the running aggregates maintained by `feedback_mining.streaming`.
+
+    Runs as a fragment that re-reads only the small aggregates file every few
+    seconds, so newly ingested reviews appear without reloading the dataset or
+    rerunning the rest of the page. Nothing is shown until ingestion has started.
+
+    Args:
+        stream_state_path (str | None): Path of the aggregates file written by the ingestion process.
+        topic_labels_config (dict | None): A dictionary mapping topic indices (1-based) to labels.
+    """
+    stream_state = load_stream_state(stream_state_path) if stream_state_path else None
+    if stream_state is None or stream_state['aggregates']['n_reviews'] == 0:
+        return
+    aggregates, topic_labels_config = stream_state['aggregates'], topic_labels_config or {}
+
+    st.markdown("---")
+    st.subheader("📡 Live Review Stream:")
+    st.caption(f"Reviews ingested since the last model build (all segments). Last update: {aggregates['updated_at']}; "
+               f"refreshes every {LIVE_PANEL_REFRESH_SECONDS} seconds.")
+    sentiment_counts = aggregates['sentiment_counts']
+    n_streamed = aggregates['n_reviews']
+    col_l1, col_l2, col_l3 = st.columns(3)
+    col_l1.metric(label="New Reviews Ingested", value=f"{n_streamed:,}")
+    col_l2.metric(label="Positive Sentiment 👍", value=f"{sentiment_counts.get('Positive', 0) / n_streamed * 100:.1f}%")
+    col_l3.metric(label="Negative Sentiment 👎", value=f"{sentiment_counts.get('Negative', 0) / n_streamed * 100:.1f}%")
+
+    topic_table = topic_aggregate_table(aggregates)
+    topic_table.insert(0, 'Theme', topic_table['Topic'].map(lambda num: topic_labels_config.get(num, f"Topic {num}")))
+    st.dataframe(
+        topic_table.drop(columns='Topic'), hide_index=True, use_container_width=True,
+        column_config={
+            'Mean Compound': st.column_config.NumberColumn(format="%.3f"),
+            'Std Compound': st.column_config.NumberColumn(format="%.3f"),
+        }
+    )
+    cooccurrence = aggregates['cooccurrence']
+    rows, cols = np.triu_indices_from(cooccurrence, k=1)
+    strongest_pairs = [(rows[i], cols[i], cooccurrence[rows[i], cols[i]]) for i in np.argsort(-cooccurrence[rows, cols])[:3]]
+    strongest_pairs = [pair for pair in strongest_pairs if pair[2] > 0]
+    if strongest_pairs:
+        st.caption("Most frequent theme pairs in new reviews: " + "; ".join(
+            f"{topic_labels_config.get(i + 1, f'Topic {i + 1}')} + {topic_labels_config.get(j + 1, f'Topic {j + 1}')} ({count:,})"
+            for i, j, count in strongest_pairs))
 
-def render_executive_summary(df_processed: pd.DataFrame | None, num_topics_config: int):
+def render_executive_summary(df_processed: pd.DataFrame | None, num_topics_config: int,
+                             stream_state_path: str | None = None, topic_labels_config: dict | None = None,
+                             findings: dict | None = None):
     """
     Renders the Executive Summary page for the E-Commerce Feedback Mining dashboard.
 
@@ -23,6 +77,10 @@ def render_executive_summary(df_processed: pd.DataFrame | None, num_topics_confi
                                             dominant topics, etc. Expected to be None if
                                             data loading failed.
         num_topics_config (int): The configured number of topics from the LDA model.
+        stream_state_path (str | None): Aggregates file of the streaming ingestion process, if any.
+        topic_labels_config (dict | None): A dictionary mapping topic indices (1-based) to labels.
+        findings (dict | None): Ranked findings from `feedback_mining.findings.summarize_findings`
+                                for the same reviews; the key findings are skipped if None.
     """
     st.header("🎯Unlocking Customer Voice with AI")
     st.markdown(f"""
@@ -63,6 +121,12 @@ def render_executive_summary(df_processed: pd.DataFrame | None, num_topics_confi
                       help=f"Number of distinct topics identified from customer reviews using LDA topic modelling (configured as {num_topics_config}).")
     else:
         st.warning("Processed dataset is not available. Key metrics cannot be displayed.")
+    if findings is not None:
+        st.subheader("🔎 Key Findings:")
+        st.markdown("Themes ranked by negative-sentiment lift, rating gap and co-occurrence strength in the selected reviews. "
+                    "The Recommendations page turns them into actions.")
+        render_key_findings(findings, topic_labels_config or {}, num_topics_config)
+    render_live_ingestion_panel(stream_state_path, topic_labels_config)
     st.markdown("---")
 
     col1_sum, col2_sum = st.columns(2)
@@ -0,0 +1,84 @@
+# ui_sections/explore_view.py
+import streamlit as st
+import plotly.express as px
+
+from feedback_mining.query import QUERY_DIMENSIONS, QUERY_METRICS, PRESET_QUERIES, run_aggregate
+
+CUSTOM_QUERY_LABEL = "Custom breakdown"
+SHARE_METRICS = ('Negative Share', 'Positive Share', 'Recommendation Rate')
+
+
+def render_explore(review_table, row_positions, topic_labels_config: dict):
+    """
+    Renders the Explore page: ad-hoc breakdowns over the review dataset.
+
+    Analysts pick a preset or choose up to two dimensions and any metrics; the
+    aggregation runs in the embedded Arrow query engine over the rows selected
+    by the global segment filters.
+
+    Args:
+        review_table: The Arrow form of the review table (see `feedback_mining.query`).
+        row_positions: Row positions selected by the segment filter bar, or None for all rows.
+        topic_labels_config (dict): A dictionary mapping topic indices (1-based) to labels.
+    """
+    st.header("🧮 Explore the Review Dataset")
+    st.markdown("""
+    Build your own breakdown of the review data without rerunning the notebooks. Choose a ready-made
+    question or combine up to two dimensions (e.g. *Class Name* and *Topic*) with the metrics you need.
+    Results respect the segment filters selected in the header.
+    """)
+    st.markdown("---")
+
+    if review_table is None:
+        st.warning("The query table could not be built from the processed dataset. The Explore page is unavailable.")
+        return
+
+    available_dimensions = [name for name, col in QUERY_DIMENSIONS.items() if col in review_table.column_names]
+    available_metrics = [name for name, (col, _) in QUERY_METRICS.items() if col in review_table.column_names]
+
+    preset_label = st.selectbox("Question", [CUSTOM_QUERY_LABEL] + list(PRESET_QUERIES.keys()), index=1,
+                                key="explore_preset_selector")
+    if preset_label == CUSTOM_QUERY_LABEL:
+        col_dims, col_metrics = st.columns(2)
+        with col_dims:
+            dimensions = st.multiselect("Group by (max 2)", available_dimensions, default=['Topic'],
+                                        max_selections=2, key="explore_dimensions")
+        with col_metrics:
+            metrics = st.multiselect("Metrics", available_metrics, default=['Reviews', 'Avg Compound'],
+                                     key="explore_metrics")
+    else:
+        dimensions, metrics = PRESET_QUERIES[preset_label]
+        dimensions = [dim for dim in dimensions if dim in available_dimensions]
+        metrics = [metric for metric in metrics if metric in available_metrics]
+
+    if not metrics:
+        st.info("Select at least one metric to run a breakdown.")
+        return
+    if row_positions is not None and len(row_positions) == 0:
+        st.info("No reviews match the current segment filters.")
+        return
+
+    result_df = run_aggregate(review_table, dimensions, metrics, row_positions)
+    if 'Topic' in result_df.columns:
+        result_df['Topic'] = result_df['Topic'].map(lambda t: topic_labels_config.get(int(t), f"Topic {t}"))
+
+    col_table, col_chart = st.columns([1, 1.3], gap="large")
+    with col_table:
+        st.markdown(f"##### Result ({len(result_df):,} groups)")
+        number_formats = {metric: "{:.1%}" if metric in SHARE_METRICS else ("{:,.0f}" if metric == 'Reviews' else "{:.3f}")
+                          for metric in metrics}
+        st.dataframe(result_df.style.format(number_formats), use_container_width=True, hide_index=True)
+    with col_chart:
+        if dimensions:
+            chart_metric = metrics[0] if metrics[0] != 'Reviews' or len(metrics) == 1 else metrics[1]
+            fig_explore = px.bar(
+                result_df.astype({dim: str for dim in dimensions}),
+                x=dimensions[0], y=chart_metric,
+                color=dimensions[1] if len(dimensions) > 1 else None,
+                barmode='group', template="plotly_white",
+                title=f"{chart_metric} by {' and '.join(dimensions)}",
+            )
+            fig_explore.update_layout(title_x=0.5, height=480, margin=dict(t=60, b=20, l=10, r=10))
+            st.plotly_chart(fig_explore, use_container_width=True)
+        else:
+            st.caption("Add a dimension to chart the breakdown.")
@@ -0,0 +1,72 @@
+# ui_sections/key_findings.py
+import streamlit as st
+
+KEY_FINDINGS_BG = "#FFF9E6" # Light yellow for key findings box
+KEY_FINDINGS_BORDER = "#FFD54F" # Amber for key findings border
+
+
+def topic_label(topic: int, topic_labels_config: dict) -> str:
+    """Returns the label of a 1-based topic."""
+    return topic_labels_config.get(topic, f"Topic {topic}")
+
+
+def key_finding_items(findings: dict, topic_labels_config: dict, num_topics_config: int) -> list[str]:
+    """
+    Writes the key findings as HTML list items.
+
+    Args:
+        findings (dict): Output of `feedback_mining.findings.summarize_findings`.
+        topic_labels_config (dict): A dictionary mapping topic indices (1-based) to labels.
+        num_topics_config (int): The number of topics.
+
+    Returns:
+        list[str]: One `<li>` per finding that the data supports.
+    """
+    table = findings['topics']
+    items = [f"<li><strong>Sentiment Landscape:</strong> <strong>{findings['positive_share']:.1%}</strong> of the reviews are Positive "
+             f"and <strong>{findings['negative_share']:.1%}</strong> Negative (mean VADER compound {findings['mean_compound']:.2f}, "
+             f"mean rating {findings['mean_rating']:.2f}).</li>"]
+    if findings['issue_topics']:
+        issues = "; ".join(
+            f"\"<em>{topic_label(topic, topic_labels_config)}</em>\" ({table.at[topic, 'negative_rate']:.1%} Negative, "
+            f"{table.at[topic, 'negative_lift']:.2f}× the overall rate; rating {table.at[topic, 'rating_gap']:+.2f} vs. average)"
+            for topic in findings['issue_topics'])
+        items.append(f"<li><strong>Themes Driving Negative Sentiment:</strong> {issues}.</li>")
+    else:
+        items.append("<li><strong>Themes Driving Negative Sentiment:</strong> No theme with enough reviews is more negative than average.</li>")
+    discussed = " and ".join(f"\"<em>{topic_label(topic, topic_labels_config)}</em>\" ({table.at[topic, 'share']:.1%})"
+                             for topic in findings['most_discussed'])
+    items.append(f"<li><strong>Dominant Customer Conversations:</strong> Of the {num_topics_config} themes, {discussed} "
+                 f"dominate the most reviews.</li>")
+    if findings['strongest_pair'] is None or findings['strongest_pair'][3] <= 1:
+        items.append("<li><strong>Strongest Topic Interdependency:</strong> No pair of themes co-occurs more often than chance.</li>")
+    else:
+        topic_a, topic_b, pair_reviews, lift = findings['strongest_pair']
+        items.append(f"<li><strong>Strongest Topic Interdependency:</strong> \"<em>{topic_label(topic_a, topic_labels_config)}</em>\" and "
+                     f"\"<em>{topic_label(topic_b, topic_labels_config)}</em>\" appear together in {pair_reviews:,} reviews, "
+                     f"{lift:.2f}× as often as if they were independent.</li>")
+    for topic in findings['strength_topics']:
+        items.append(f"<li><strong>Praise for Specific Attributes:</strong> \"<em>{topic_label(topic, topic_labels_config)}</em>\" reviews are "
+                     f"{table.at[topic, 'positive_rate']:.1%} Positive ({table.at[topic, 'positive_lift']:.2f}× the overall rate) "
+                     f"with a rating {table.at[topic, 'rating_gap']:+.2f} stars vs. average.</li>")
+    return items
+
+
+def render_key_findings(findings: dict | None, topic_labels_config: dict, num_topics_config: int) -> None:
+    """
+    Renders the key findings box shared by the Summary and Recommendations pages.
+
+    Args:
+        findings (dict | None): Output of `feedback_mining.findings.summarize_findings`; None if unavailable.
+        topic_labels_config (dict): A dictionary mapping topic indices (1-based) to labels.
+        num_topics_config (int): The number of topics.
+    """
+    if findings is None or findings['n_reviews'] == 0:
+        st.info("No reviews are available for the key findings (check the segment filters).")
+        return
+    items = "".join(key_finding_items(findings, topic_labels_config, num_topics_config))
+    st.markdown(
+        f'<div style="background-color: {KEY_FINDINGS_BG}; border-left: 6px solid {KEY_FINDINGS_BORDER}; padding: 18px 22px; '
+        f'margin-bottom: 25px; border-radius: 5px; line-height: 1.7;">'
+        f"Based on <strong>{findings['n_reviews']:,} customer reviews</strong>:<ul>{items}</ul></div>",
+        unsafe_allow_html=True)
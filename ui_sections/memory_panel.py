@@ -0,0 +1,38 @@
+# ui_sections/memory_panel.py
+import streamlit as st
+
+from feedback_mining.memory import MemoryLedger, process_memory
+
+
+def _format_mb(num_bytes) -> str:
+    """Formats a byte count as MB ('n/a' if unknown)."""
+    return "n/a" if num_bytes is None else f"{num_bytes / 1e6:,.1f} MB"
+
+
+def render_memory_panel(ledger: MemoryLedger) -> None:
+    """
+    Renders the sidebar's memory report: process RSS and budgets, cache entries, sessions and evictions.
+
+    Args:
+        ledger (MemoryLedger): The process-wide ledger (see `feedback_mining.memory`).
+    """
+    with st.sidebar.expander("🧠 Memory usage"):
+        memory = process_memory()
+        rss_col, peak_col = st.columns(2)
+        rss_col.metric("RSS", _format_mb(memory['rss']))
+        peak_col.metric("Peak RSS", _format_mb(memory['peak_rss']))
+        st.caption(f"Budgets: RSS {_format_mb(ledger.rss_budget) if ledger.rss_budget else 'none'}, "
+                   f"caches {_format_mb(ledger.cache_budget) if ledger.cache_budget else 'none'}. "
+                   f"Tracked cache entries: {_format_mb(ledger.cache_bytes())}.")
+
+        rss_history = ledger.rss_history()
+        if len(rss_history) > 1:
+            st.line_chart(rss_history, height=120)
+
+        st.markdown("**Cache entries** (least recently used are evicted first)")
+        st.dataframe(ledger.cache_table().style.format({'MB': '{:,.2f}', 'Idle (s)': '{:,.0f}'}), hide_index=True)
+        st.markdown("**Sessions**")
+        st.dataframe(ledger.session_table().style.format({'MB': '{:,.3f}', 'Idle (s)': '{:,.0f}'}), hide_index=True)
+        if ledger.evictions:
+            last = ledger.evictions[-1]
+            st.caption(f"{len(ledger.evictions)} evictions; last: `{last['loader']}` ({_format_mb(last['bytes'])}).")
@@ -1,10 +1,99 @@
 # ui_sections/network_view.py
 import streamlit as st
 import networkx as nx
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
+from feedback_mining.network_analytics import edge_analytics_table, node_analytics_table
+from feedback_mining.term_network import TERM_TOP_K, edge_coordinates, top_k_mask
+from feedback_mining.topic_network import PROBABILITY_THRESHOLD
 
-def render_network_analysis(topic_network_graph, num_topics_config, topic_labels_config, df_processed): 
+THRESHOLD_SLIDER_RANGE = (0.05, 0.50)
+NODE_MEASURE_OPTIONS = {"PageRank": 'pagerank', "Weighted degree": 'weighted_degree', "Betweenness": 'betweenness',
+                        "Eigenvector": 'eigenvector', "Degree": 'degree_centrality'}
+NUM_TOP_ASSOCIATIONS = 10
+TERM_DEFAULT_MIN_PMI = 1.0
+TERM_DEFAULT_LINKS = 5
+NUM_TERM_LABELS = 40
+
+
+def render_term_network(term_network: dict | None):
+    """
+    Renders the keyword co-occurrence network with WebGL traces.
+
+    All filtering is array slicing over the published network; edge line
+    coordinates are built in one vectorized step (see `feedback_mining.term_network`).
+
+    Args:
+        term_network (dict | None): The arrays of 'term_network.npz', or None if not published.
+    """
+    st.subheader("🔤 Keyword Co-occurrence Network")
+    st.markdown("""
+    Words (from the TF-IDF vocabulary) linked when they appear in the same reviews more often than chance.
+    Links are scored by **PMI** (pointwise mutual information: how many times more often two words co-occur than if
+    they were unrelated, on a log scale) and only each word's strongest links are kept.
+    """)
+    if term_network is None or len(term_network['source']) == 0:
+        st.info("The keyword network artifact ('term_network.npz') is not available. Rerun the pipeline to publish it.")
+        return
+
+    terms, pmi = term_network['terms'], term_network['pmi']
+    control_cols = st.columns([2, 2, 3])
+    with control_cols[0]:
+        min_pmi = st.slider("Minimum PMI:", min_value=0.0, max_value=float(np.floor(pmi.max() * 10) / 10), value=TERM_DEFAULT_MIN_PMI,
+                            step=0.1, key="term_network_min_pmi", help="Higher values keep only the most surprising word pairs.")
+    with control_cols[1]:
+        top_k = st.slider("Links per word:", min_value=1, max_value=TERM_TOP_K, value=TERM_DEFAULT_LINKS, key="term_network_top_k",
+                          help="Keeps a link if it is among the strongest (by PMI) of either of its words.")
+    with control_cols[2]:
+        focus_term = st.selectbox("Focus on a word:", options=sorted(terms.tolist()), index=None, key="term_network_focus",
+                                  placeholder="All words", help="Shows only this word and its direct neighbours.")
+
+    source, target = term_network['source'], term_network['target']
+    keep = pmi >= min_pmi
+    keep[keep] = top_k_mask(source[keep], target[keep], pmi[keep], top_k)
+    if focus_term is not None:
+        focus_node = int(np.flatnonzero(terms == focus_term)[0])
+        keep &= (source == focus_node) | (target == focus_node)
+    source, target, edge_pmi = source[keep], target[keep], pmi[keep]
+    if len(source) == 0:
+        st.warning("No links pass these filters. Lower the minimum PMI or allow more links per word.")
+        return
+
+    nodes, degree = np.unique(np.concatenate([source, target]), return_counts=True)
+    x, y = term_network['x'], term_network['y']
+    edge_x, edge_y = edge_coordinates(x, y, source, target)
+    document_frequency = term_network['document_frequency'][nodes]
+    node_hover_texts = [f"<b>{term}</b><br>Reviews: {frequency:,}<br>Links shown: {links}"
+                        for term, frequency, links in zip(terms[nodes], document_frequency.tolist(), degree.tolist())]
+    labelled = nodes[np.argsort(-document_frequency, kind='stable')[:NUM_TERM_LABELS]]
+
+    fig_terms = go.Figure(data=[
+        go.Scattergl(x=edge_x, y=edge_y, mode='lines', line=dict(width=0.5, color='rgba(120,120,120,0.35)'), hoverinfo='skip'),
+        go.Scattergl(x=x[nodes], y=y[nodes], mode='markers', hoverinfo='text', hovertext=node_hover_texts,
+                     marker=dict(size=4 + 3 * np.log1p(document_frequency), color=degree, colorscale='Viridis', showscale=True,
+                                 colorbar=dict(thickness=15, title=dict(text='Links', side='right')), line_width=0)),
+        go.Scattergl(x=x[labelled], y=y[labelled], mode='text', text=terms[labelled], textposition='top center',
+                     textfont=dict(size=11, color='#1A5276'), hoverinfo='skip'),
+    ], layout=go.Layout(showlegend=False, hovermode='closest', height=750, margin=dict(b=10, l=5, r=5, t=10),
+                        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False), plot_bgcolor='#f9f9f9'))
+    st.plotly_chart(fig_terms, use_container_width=True)
+    st.caption(f"{len(nodes):,} words and {len(source):,} links shown. Node size: reviews containing the word; "
+               f"color: links shown. Labels: the {min(NUM_TERM_LABELS, len(nodes))} most frequent words.")
+
+    top_pairs = np.argsort(-edge_pmi, kind='stable')[:NUM_TOP_ASSOCIATIONS]
+    st.dataframe(pd.DataFrame({'Word A': terms[source[top_pairs]], 'Word B': terms[target[top_pairs]],
+                               'Reviews': term_network['count'][keep][top_pairs], 'PMI': edge_pmi[top_pairs].round(2)}),
+                 hide_index=True, use_container_width=True)
+
+
+def render_network_analysis(topic_network_graph, num_topics_config, topic_labels_config, df_processed, network_for_threshold=None,
+                            term_network=None):
+    # 'network_for_threshold', if given, returns the co-occurrence graph for a topic probability threshold
+    # (rebuilt from the document-topic matrix for the current segment); otherwise the saved graph is shown.
+    # 'term_network' holds the keyword network arrays published by the pipeline's 'term_network' stage.
     st.header("🕸️ Topic Co-occurrence Network")
     st.info("""
     **What is Topic Co-occurrence Network Analysis?**
@@ -30,8 +119,25 @@ def render_network_analysis(topic_network_graph, num_topics_config, topic_labels
     - **Nodes (Circles):** Represent the topics. Larger nodes indicate topics that are more prevalent overall. Node color intensity reflects centrality.
     - **Edges (Lines):** Connect topics that co-occur. Thicker lines signify stronger co-occurrence.
     """)
+    if network_for_threshold is not None:
+        threshold = st.slider(
+            "Topic probability threshold for co-occurrence:",
+            min_value=THRESHOLD_SLIDER_RANGE[0], max_value=THRESHOLD_SLIDER_RANGE[1],
+            value=PROBABILITY_THRESHOLD, step=0.01, key="network_threshold_slider",
+            help="A topic counts as discussed in a review when its LDA probability is at least this value. "
+                 "Lower values connect more topics; higher values keep only strong co-occurrences."
+        )
+        topic_network_graph = network_for_threshold(threshold)
+    else:
+        st.caption(f"Showing the saved network (topic probability threshold {PROBABILITY_THRESHOLD:.2f}).")
     if topic_network_graph is not None and topic_network_graph.number_of_nodes() > 0 :
         if not nx.is_empty(topic_network_graph):
+            measure_label = st.selectbox(
+                "Color nodes by:", options=list(NODE_MEASURE_OPTIONS), key="network_measure_selector",
+                help="PageRank and eigenvector centrality favour topics linked to other well-connected topics; weighted degree sums "
+                     "a topic's co-occurrence counts; betweenness measures how often a topic bridges two others."
+            )
+            measure = NODE_MEASURE_OPTIONS[measure_label]
             pos = nx.spring_layout(topic_network_graph, k=0.7, iterations=50, seed=42)
             
             edge_x, edge_y, edge_hover_texts = [], [], []
@@ -40,14 +146,14 @@ def render_network_analysis(topic_network_graph, num_topics_config, topic_labels
                 x1, y1 = pos[edge[1]]
                 edge_x.extend([x0, x1, None])
                 edge_y.extend([y0, y1, None])
-                edge_hover_texts.extend([f"Co-occurrence: {edge[2].get('weight', 1)}", f"Co-occurrence: {edge[2].get('weight', 1)}", ""])
+                edge_hover_text = f"Co-occurrence: {edge[2].get('weight', 1):,.0f} (lift {edge[2].get('lift', 0):.2f})"
+                edge_hover_texts.extend([edge_hover_text, edge_hover_text, ""])
 
             edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=1, color='#888'), 
                                      hoverinfo='text', text=edge_hover_texts, mode='lines')
 
             node_x_vals, node_y_vals, node_hover_texts_list, node_sizes_viz, node_color_vals, node_text_labels = [], [], [], [], [], []
-            centrality = nx.degree_centrality(topic_network_graph) if topic_network_graph.number_of_nodes() > 1 else {node_id: 0 for node_id in topic_network_graph.nodes()}
-            max_centrality = max(centrality.values()) if centrality and any(centrality.values()) else 1.0
+            centrality = nx.get_node_attributes(topic_network_graph, measure) # Precomputed by the pipeline's 'network_analytics' stage
             
             
             topic_prevalence_map = df_processed['dominant_lda_topic'].value_counts().to_dict() if df_processed is not None else {}
@@ -58,7 +164,9 @@ def render_network_analysis(topic_network_graph, num_topics_config, topic_labels
                 node_x_vals.append(x); node_y_vals.append(y)
                 label = topic_labels_config.get(int(node_id), f"Topic {node_id}")
                 node_text_labels.append(label)
-                hover_text = f"<b>{label}</b><br>Centrality: {centrality.get(node_id, 0):.3f}"
+                node_data = topic_network_graph.nodes[node_id]
+                hover_text = (f"<b>{label}</b><br>Community: {node_data.get('community', 0) + 1}<br>"
+                              + "<br>".join(f"{name}: {node_data.get(key, 0):,.3f}" for name, key in NODE_MEASURE_OPTIONS.items()))
                 
                 # Use prevalence for node size, with a fallback
                 base_size_for_node = topic_prevalence_map.get(int(node_id), 1) # Get prevalence count
@@ -74,31 +182,58 @@ def render_network_analysis(topic_network_graph, num_topics_config, topic_labels
                                      customdata=node_text_labels, 
                                      marker=dict(showscale=True, colorscale='Blues', reversescale=False, color=node_color_vals, 
                                                  size=node_sizes_viz, line_width=2, line_color='black',
-                                                 colorbar=dict(thickness=15, title=dict(text='Node Centrality', side='right'), xanchor='left')))
+                                                 colorbar=dict(thickness=15, title=dict(text=measure_label, side='right'), xanchor='left')))
             node_trace.text = node_text_labels
 
             fig_network = go.Figure(data=[edge_trace, node_trace],
                                          layout=go.Layout(title=dict(text='<b>Interactive Topic Co-occurrence Network</b>', x=0.5, font_size=20),
                                                           showlegend=False, hovermode='closest', height=800,
                                                           margin=dict(b=20,l=5,r=5,t=50),
-                                                          annotations=[dict(text="Hover: Topic details. Darker/Larger nodes: More central/prevalent. Lines: Co-occurrence.", showarrow=False, xref="paper", yref="paper", x=0.005, y=-0.002, align="left")],
+                                                          annotations=[dict(text=f"Hover: Topic details. Darker nodes: higher {measure_label}. Larger nodes: more prevalent. Lines: Co-occurrence.", showarrow=False, xref="paper", yref="paper", x=0.005, y=-0.002, align="left")],
                                                           xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                                                           yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                                                           plot_bgcolor='#f9f9f9'))
             st.plotly_chart(fig_network, use_container_width=True)
 
             st.markdown("---")
-            st.subheader("Network Insights (Most Central Topics):")
+            st.subheader(f"Network Insights (Most Central Topics by {measure_label}):")
             if topic_network_graph.number_of_nodes() > 1:
-                sorted_degree_centrality = sorted(centrality.items(), key=lambda item: item[1], reverse=True)
-                top_n_centrality = min(5, len(sorted_degree_centrality))
+                sorted_centrality = sorted(centrality.items(), key=lambda item: item[1], reverse=True)
+                top_n_centrality = min(5, len(sorted_centrality))
                 if top_n_centrality > 0:
                     centrality_cols = st.columns(top_n_centrality)
-                    for i, (node_id_cent, centrality_val_cent) in enumerate(sorted_degree_centrality[:top_n_centrality]):
+                    for i, (node_id_cent, centrality_val_cent) in enumerate(sorted_centrality[:top_n_centrality]):
                         label_cent = topic_labels_config.get(int(node_id_cent), f"Topic {node_id_cent}")
-                        centrality_cols[i].metric(label=f"{label_cent}", value=f"{centrality_val_cent:.3f}")
+                        centrality_cols[i].metric(label=f"{label_cent}", value=f"{centrality_val_cent:,.3f}")
                 else: st.info("Not enough central topics to display metrics.")
+
+                col_communities, col_associations = st.columns(2, gap="large")
+                with col_communities:
+                    st.markdown("##### Topic Communities")
+                    st.caption("Groups of topics that co-occur more with each other than with the rest (weighted Louvain partition).")
+                    node_table = node_analytics_table(topic_network_graph)
+                    communities_view = (node_table.assign(Topic=node_table['topic'].map(lambda topic: topic_labels_config.get(int(topic), f"Topic {topic}")))
+                                        .groupby('community')['Topic'].agg(', '.join).reset_index())
+                    communities_view['community'] += 1
+                    st.dataframe(communities_view.rename(columns={'community': 'Community', 'Topic': 'Topics (by PageRank)'}),
+                                 hide_index=True, use_container_width=True)
+                with col_associations:
+                    st.markdown("##### Strongest Associations (Lift)")
+                    st.caption("Lift is how many times more often two topics appear together than if they were unrelated (1.0 = chance).")
+                    edge_table = edge_analytics_table(topic_network_graph).head(NUM_TOP_ASSOCIATIONS)
+                    associations_view = pd.DataFrame({
+                        'Topic A': edge_table['topic_a'].map(lambda topic: topic_labels_config.get(int(topic), f"Topic {topic}")),
+                        'Topic B': edge_table['topic_b'].map(lambda topic: topic_labels_config.get(int(topic), f"Topic {topic}")),
+                        'Reviews': edge_table['count'].astype(int), 'Lift': edge_table['lift'].round(2),
+                    })
+                    st.dataframe(associations_view, hide_index=True, use_container_width=True)
         else:
-            st.warning("The loaded topic network graph has no nodes or edges to display after processing. Check co-occurrence threshold or graph generation process in your notebook.")
+            if network_for_threshold is not None:
+                st.warning("No pair of topics co-occurs at this threshold in the selected reviews. Try a lower threshold or widen the segment filters.")
+            else:
+                st.warning("The loaded topic network graph has no nodes or edges to display after processing. Check co-occurrence threshold or graph generation process in your notebook.")
     else:
-        st.warning("Topic network graph artifact not loaded or not available. Cannot display this section.")
\ No newline at end of file
+        st.warning("Topic network graph artifact not loaded or not available. Cannot display this section.")
+
+    st.markdown("---")
+    render_term_network(term_network)
@@ -0,0 +1,62 @@
+# ui_sections/review_export.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from feedback_mining.export import EXPORT_FORMATS, iter_export_chunks
+
+UI_EXPORT_MAX_ROWS = 100_000 # A prepared export is held in server memory until downloaded; larger exports use the CLI
+
+
+def _drop_prepared(state_key: str) -> None:
+    """Releases a prepared export once it has been downloaded."""
+    st.session_state.pop(state_key, None)
+
+
+def render_review_export(df: pd.DataFrame, positions: np.ndarray, file_stem: str, key: str) -> None:
+    """
+    Renders the download controls for a filtered slice of reviews.
+
+    Nothing is serialized until "Prepare export" is clicked; the rows are then
+    encoded in batches (see `feedback_mining.export`) and the bytes kept in the
+    session state until the download button is clicked, which drops them. They
+    are also dropped when the slice or format changes. The bytes live in server
+    memory meanwhile, so slices above `UI_EXPORT_MAX_ROWS` reviews are left to
+    the command-line export.
+
+    Args:
+        df (pd.DataFrame): The review frame the positions refer to.
+        positions (np.ndarray): Row positions (for `df.iloc`) to export.
+        file_stem (str): Download file name without extension.
+        key (str): Unique prefix of the widget keys.
+    """
+    state_key = f"{key}_prepared"
+    if len(positions) == 0 or len(positions) > UI_EXPORT_MAX_ROWS:
+        _drop_prepared(state_key)
+        st.caption("No reviews to export for this selection." if len(positions) == 0 else
+                   f"{len(positions):,} reviews is more than the {UI_EXPORT_MAX_ROWS:,} the dashboard exports; "
+                   "use `python -m feedback_mining.export` instead.")
+        return
+
+    format_col, action_col = st.columns([2, 3])
+    with format_col:
+        export_format = st.radio("Export format:", options=list(EXPORT_FORMATS), horizontal=True, key=f"{key}_format")
+    extension, mime = EXPORT_FORMATS[export_format]
+    signature = (file_stem, export_format, hash(df.index.to_numpy()[positions].tobytes())) # Rows by dataset index
+    prepared = st.session_state.get(state_key)
+    if prepared is not None and prepared['signature'] != signature:
+        _drop_prepared(state_key)
+        prepared = None
+
+    with action_col:
+        if prepared is None:
+            if st.button(f"📦 Prepare export ({len(positions):,} reviews)", key=f"{key}_prepare"):
+                with st.spinner(f"Encoding {len(positions):,} reviews as {export_format}..."):
+                    prepared = {'signature': signature, 'data': b''.join(iter_export_chunks(df, positions, export_format))}
+                st.session_state[state_key] = prepared
+        if prepared is not None:
+            st.download_button(
+                f"⬇️ Download {len(positions):,} reviews ({export_format})", data=prepared['data'],
+                file_name=f"{file_stem}.{extension}", mime=mime, key=f"{key}_download",
+                on_click=_drop_prepared, args=(state_key,)
+            )
@@ -0,0 +1,47 @@
+# ui_sections/segment_filter_bar.py
+import streamlit as st
+
+RECOMMENDED_LABELS = {1: "Recommended", 0: "Not Recommended"}
+
+
+def _format_filter_value(filter_name: str, value) -> str:
+    """Returns the display label for a filter value."""
+    if filter_name == 'Rating':
+        return f"{value} ⭐"
+    if filter_name == 'Recommended IND':
+        return RECOMMENDED_LABELS.get(value, str(value))
+    return str(value)
+
+
+def render_segment_filter_bar(segment_index: dict | None) -> dict:
+    """
+    Renders the global segment filter bar shown in the dashboard header.
+
+    One multiselect is drawn per indexed filter (Department, Class, Rating,
+    Recommendation, Age Band). An empty multiselect means "all values".
+
+    Args:
+        segment_index (dict | None): The bitmap index built by
+                                     `feedback_mining.segments.build_bitmap_index`.
+                                     Nothing is rendered if it is None.
+
+    Returns:
+        dict: Mapping of filter name to the list of chosen values.
+    """
+    if segment_index is None or not segment_index['bitmaps']:
+        return {}
+
+    selections = {}
+    filter_cols = st.columns(len(segment_index['bitmaps']))
+    for filter_col, (filter_name, value_bitmaps) in zip(filter_cols, segment_index['bitmaps'].items()):
+        with filter_col:
+            placeholder = "Recommendation" if filter_name == 'Recommended IND' else filter_name
+            selections[filter_name] = st.multiselect(
+                filter_name,
+                options=list(value_bitmaps.keys()),
+                format_func=lambda value, name=filter_name: _format_filter_value(name, value),
+                placeholder=f"All: {placeholder}",
+                label_visibility="collapsed",
+                key=f"segment_filter_{filter_name}",
+            )
+    return selections
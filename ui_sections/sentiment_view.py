@@ -3,6 +3,10 @@ import pandas as pd
 import plotly.express as px
 from nltk.sentiment.vader import SentimentIntensityAnalyzer # Ensure VADER is imported
 
+from feedback_mining.export import filter_review_rows
+from feedback_mining.sentiment import SENTIMENT_LABELS
+from ui_sections.review_export import render_review_export
+
 def render_sentiment_analysis(df_processed: pd.DataFrame | None, analyzer: SentimentIntensityAnalyzer | None):
     """
     Renders the Sentiment Analysis Insights page for the E-Commerce Feedback Mining dashboard.
@@ -73,6 +77,7 @@ def render_sentiment_analysis(df_processed: pd.DataFrame | None, analyzer: Senti
         st.markdown("Distribution of positive, negative, and neutral sentiments across all analysed customer reviews.")
         if 'vader_sentiment_label' in df_processed.columns:
             sentiment_counts = df_processed['vader_sentiment_label'].value_counts()
+            sentiment_counts = sentiment_counts[sentiment_counts > 0] # Categorical labels report unused categories as 0
             sentiment_counts_df_display = sentiment_counts.reset_index()
             sentiment_counts_df_display.columns = ['Sentiment Label', 'Number of Reviews']
             
@@ -170,6 +175,18 @@ def render_sentiment_analysis(df_processed: pd.DataFrame | None, analyzer: Senti
         else:
             st.info("The 'Rating' or 'compound' (VADER score) columns are not available. Sentiment vs. Rating plot cannot be displayed.")
 
+    if 'vader_sentiment_label' in df_processed.columns:
+        st.markdown("---")
+        st.subheader("📥 Export Reviews by Sentiment")
+        st.markdown("Download the reviews behind the breakdown above, with their rating, VADER score and dominant topic.")
+        export_sentiments_ui = st.multiselect(
+            "Sentiment of exported reviews:", options=SENTIMENT_LABELS, default=['Negative'],
+            key="sentiment_export_selector"
+        )
+        export_positions = filter_review_rows(df_processed, sentiments=export_sentiments_ui)
+        export_stem = ("_".join(label.lower() for label in export_sentiments_ui) or "no") + "_reviews"
+        render_review_export(df_processed, export_positions, export_stem, key="sentiment_review_export")
+
     st.markdown("---")
     st.subheader("✍️ Test VADER Sentiment on Your Own Text")
     st.markdown("""
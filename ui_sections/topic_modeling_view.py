@@ -3,6 +3,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from feedback_mining.aspects import topic_aspect_scores
+from feedback_mining.doc_topics import strongest_rows
+from feedback_mining.export import filter_review_rows
+from feedback_mining.sentiment import SENTIMENT_LABELS, classify_sentiment
+from ui_sections.review_export import render_review_export
+
 # Define consistent colors (can be imported from a central config if you have one)
 # For now, defining them here to match potential global theme colors or local needs.
 PRIMARY_BLUE = "#007bff"
@@ -13,13 +19,23 @@ NEUTRAL_SENTIMENT_COLOR = '#BDC3C7'
 NEGATIVE_SENTIMENT_COLOR = '#E74C3C'
 BOX_BACKGROUND_COLOR = "#f8f9f9"  # <<< DEFINITION ADDED HERE (matches the hardcoded value used previously)
                                  # You could also use "#FFFFFF" if you want a white background like other content blocks
+TOPIC_MIXTURE_COLORS = px.colors.qualitative.Pastel1 # Same palette as the topic distribution chart
+REVIEW_ORDER_OPTIONS = ["Dataset order", "Strongest match to this theme"]
+NUM_SAMPLE_REVIEWS = 5
+SENTIMENT_BASIS_OPTIONS = ["Whole reviews", "Sentences about this theme"]
+KEYWORD_DISPLAY_OPTIONS = ["Keyword lists", "Word clouds"]
+WORDCLOUD_SENTIMENT_OPTIONS = {"All reviews": "All", "Positive reviews": "Positive",
+                               "Neutral reviews": "Neutral", "Negative reviews": "Negative"}
+INTERVAL_METRIC_OPTIONS = {"Mean VADER compound": "compound", "Mean rating": "rating"}
 
 def display_lda_topics_for_view(
     lda_model_obj, 
     features_list: list[str] | None, 
     num_top_words: int,
     num_topics_config_view: int, 
-    topic_labels_config_view: dict
+    topic_labels_config_view: dict,
+    wordcloud_paths: dict | None = None,
+    wordcloud_sentiment: str = "All"
     ):
     """
     Displays the top keywords for each discovered LDA topic in a structured layout.
@@ -38,6 +54,9 @@ def display_lda_topics_for_view(
         num_topics_config_view (int): The total number of topics configured for the LDA model.
         topic_labels_config_view (dict): A dictionary mapping topic indices (1-based)
                                          to human-interpretable labels.
+        wordcloud_paths (dict | None): Pre-rendered word-cloud images keyed by (topic, sentiment);
+                                       when given, a topic's image replaces its keyword list.
+        wordcloud_sentiment (str): Which image to show: 'All' or a sentiment label.
     """
     if lda_model_obj is not None and features_list is not None and len(features_list) > 0:
         st.markdown("##### Discovered Themes & Their Most Representative Keywords:")
@@ -58,6 +77,13 @@ def display_lda_topics_for_view(
             
             with current_col_display:
                 with st.expander(f"**{label_for_topic}**", expanded=True): 
+                    wordcloud_path = (wordcloud_paths or {}).get((topic_num_for_user, wordcloud_sentiment))
+                    if wordcloud_path is not None:
+                        st.image(wordcloud_path, use_container_width=True) # Rendered at build time; served as a file
+                        col_idx_current += 1
+                        continue
+                    elif wordcloud_paths:
+                        st.caption(f"_(No {wordcloud_sentiment.lower()} reviews for this theme; showing keywords)_")
                     top_word_indices = topic_weights.argsort()[:-num_top_words - 1:-1]
                     top_words = [features_list[i] for i in top_word_indices if i < len(features_list)]
                     
@@ -73,12 +99,129 @@ def display_lda_topics_for_view(
             "Cannot display topic keywords. Please ensure the LDA model was trained and artifacts loaded correctly."
         )
 
+def topic_mixture_html(topic_probabilities, topic_labels_config_view: dict) -> str:
+    """
+    Builds a compact stacked bar (HTML) of one review's full topic mixture.
+
+    Args:
+        topic_probabilities: The review's row of the document-topic matrix.
+        topic_labels_config_view (dict): A dictionary mapping topic indices (1-based)
+                                         to human-interpretable labels.
+
+    Returns:
+        str: HTML for a bar with one segment per topic, widths proportional to probability,
+             followed by the three strongest topics as text.
+    """
+    segments, strongest = [], sorted(enumerate(topic_probabilities, start=1), key=lambda item: -item[1])[:3]
+    for topic_num, probability in enumerate(topic_probabilities, start=1):
+        label = topic_labels_config_view.get(topic_num, f"Topic {topic_num} (Unlabeled)")
+        color = TOPIC_MIXTURE_COLORS[(topic_num - 1) % len(TOPIC_MIXTURE_COLORS)]
+        segments.append(f"<div title='{label}: {probability:.0%}' style='width:{probability * 100:.2f}%; background-color:{color};'></div>")
+    summary = " · ".join(f"{topic_labels_config_view.get(num, f'Topic {num}')} {prob:.0%}" for num, prob in strongest)
+    return (f"<div style='display:flex; height:8px; border-radius:4px; overflow:hidden; margin-top:6px;'>{''.join(segments)}</div>"
+            f"<small style='color:{NEUTRAL_GREY};'>Topic mixture: {summary}</small>")
+
+def display_topic_coherence_for_view(topic_coherence_df: pd.DataFrame | None, topic_labels_config_view: dict):
+    """
+    Displays the per-topic coherence of the LDA model as a bar chart and a table.
+
+    Args:
+        topic_coherence_df (pd.DataFrame | None): Columns 'Topic' (1-based), 'UMass' and 'NPMI',
+                                                  as returned by `feedback_mining.coherence.topic_coherence`.
+        topic_labels_config_view (dict): A dictionary mapping topic indices (1-based)
+                                         to human-interpretable labels.
+    """
+    if topic_coherence_df is None or topic_coherence_df.empty:
+        st.info("Topic coherence scores are not available for the loaded model.")
+        return
+
+    coherence_display_df = topic_coherence_df.copy()
+    coherence_display_df['Interpreted Topic Label'] = coherence_display_df['Topic'].map(
+        lambda num: topic_labels_config_view.get(num, f"Topic {num} (Unlabeled)"))
+
+    col_chart_coh, col_table_coh = st.columns([3, 2], gap="large")
+    with col_chart_coh:
+        fig_coherence = px.bar(
+            coherence_display_df, x='Interpreted Topic Label', y='NPMI',
+            color='NPMI', color_continuous_scale='RdYlGn', range_color=[-0.2, 0.2],
+            text_auto='.3f', template="plotly_white",
+            labels={'Interpreted Topic Label': 'Customer Theme', 'NPMI': 'NPMI Coherence'}
+        )
+        fig_coherence.update_layout(coloraxis_showscale=False, height=400, margin=dict(t=20, b=10, l=10, r=10),
+                                    xaxis_title=None, yaxis_title="NPMI Coherence (top 10 words)")
+        fig_coherence.update_xaxes(tickangle=-45, tickfont=dict(size=10))
+        st.plotly_chart(fig_coherence, use_container_width=True)
+    with col_table_coh:
+        st.dataframe(
+            coherence_display_df[['Interpreted Topic Label', 'UMass', 'NPMI']],
+            hide_index=True, use_container_width=True,
+            column_config={
+                'Interpreted Topic Label': st.column_config.TextColumn("Theme"),
+                'UMass': st.column_config.NumberColumn("UMass", format="%.3f", help="Closer to 0 is more coherent."),
+                'NPMI': st.column_config.NumberColumn("NPMI", format="%.3f", help="Ranges from -1 to 1; higher is more coherent."),
+            }
+        )
+        st.caption(f"Mean UMass: **{coherence_display_df['UMass'].mean():.3f}** | Mean NPMI: **{coherence_display_df['NPMI'].mean():.3f}**")
+
+
+def display_topic_intervals_for_view(topic_intervals: dict | None, topic_labels_config_view: dict):
+    """
+    Displays bootstrap confidence intervals of per-topic means and the pairwise differences they support.
+
+    Args:
+        topic_intervals (dict | None): Output of `feedback_mining.bootstrap.topic_intervals`; None if unavailable.
+        topic_labels_config_view (dict): Mapping of topic numbers to labels.
+    """
+    if topic_intervals is None:
+        st.info("Confidence intervals are not available for the current data.")
+        return
+    metric_label = st.radio("Compare themes by:", list(INTERVAL_METRIC_OPTIONS), horizontal=True, key="topic_interval_metric_selector")
+    metric = INTERVAL_METRIC_OPTIONS[metric_label]
+    intervals = topic_intervals['intervals'].dropna(subset=[f'{metric}_mean']).reset_index()
+    if intervals.empty:
+        st.info("No reviews in the selected segment to estimate intervals from.")
+        return
+    intervals['Theme'] = intervals['topic'].map(lambda num: topic_labels_config_view.get(num, f"Topic {num}"))
+    fig_intervals = px.scatter(
+        intervals, x='Theme', y=f'{metric}_mean', color='Theme', color_discrete_sequence=TOPIC_MIXTURE_COLORS,
+        error_y=intervals[f'{metric}_high'] - intervals[f'{metric}_mean'],
+        error_y_minus=intervals[f'{metric}_mean'] - intervals[f'{metric}_low'],
+        hover_data={'reviews': ':,', f'{metric}_low': ':.3f', f'{metric}_high': ':.3f'},
+        labels={f'{metric}_mean': metric_label, 'reviews': 'Reviews', f'{metric}_low': 'CI low', f'{metric}_high': 'CI high'},
+        template="plotly_white"
+    )
+    fig_intervals.update_traces(marker=dict(size=12, line=dict(width=1, color='black')))
+    fig_intervals.update_layout(showlegend=False, height=420, xaxis_title="Interpreted Customer Theme", margin=dict(t=20, b=10, l=10, r=10))
+    st.plotly_chart(fig_intervals, use_container_width=True)
+
+    differences = topic_intervals['differences']
+    differences = differences[(differences['metric'] == metric) & differences['difference'].notna()]
+    if st.checkbox("Show only differences that exclude zero", value=True, key="topic_interval_significant_only"):
+        differences = differences[differences['significant']]
+    differences_display = pd.DataFrame({
+        'Theme A': differences['topic_a'].map(lambda num: topic_labels_config_view.get(num, f"Topic {num}")),
+        'Theme B': differences['topic_b'].map(lambda num: topic_labels_config_view.get(num, f"Topic {num}")),
+        'Difference (A - B)': differences['difference'], 'CI Low': differences['low'], 'CI High': differences['high'],
+        'Excludes 0': differences['significant'],
+    }).sort_values('Difference (A - B)', key=abs, ascending=False)
+    st.dataframe(differences_display.style.format({'Difference (A - B)': '{:+.3f}', 'CI Low': '{:+.3f}', 'CI High': '{:+.3f}'}),
+                 hide_index=True, use_container_width=True)
+    st.caption(f"{topic_intervals['confidence']:.0%} percentile intervals from {topic_intervals['n_replicates']:,} bootstrap "
+               "replicates over the selected reviews, each theme resampled separately. Where a difference's interval "
+               "excludes zero, the gap between the two themes is unlikely to be sampling noise.")
+
+
 def render_topic_modeling(
     df_processed: pd.DataFrame | None, 
     lda_model: object | None, 
     feature_names: list[str] | None, 
     num_topics_config: int, 
-    topic_labels_config: dict
+    topic_labels_config: dict,
+    topic_coherence_df: pd.DataFrame | None = None,
+    doc_topic_matrix=None,
+    aspect_sentiment: dict | None = None,
+    wordcloud_paths: dict | None = None,
+    topic_intervals_for_segment=None
     ):
     """
     Renders the Topic Modeling Insights page for the E-Commerce Feedback Mining dashboard.
@@ -93,6 +236,13 @@ def render_topic_modeling(
         feature_names: List of feature names (vocabulary) for the LDA model.
         num_topics_config: Configured number of topics for LDA.
         topic_labels_config: Dictionary mapping topic indices to labels.
+        topic_coherence_df: Per-topic UMass/NPMI coherence of the LDA model, or None.
+        doc_topic_matrix: The (memory-mapped) document-topic matrix of the full dataset, or None.
+                          Rows are addressed by `df_processed`'s index, which holds dataset row positions.
+        aspect_sentiment: Sentence-level sentiment per review and topic (see `feedback_mining.aspects`), or None.
+        wordcloud_paths: Word-cloud image paths keyed by (topic, sentiment) (see `feedback_mining.wordclouds`), or None.
+        topic_intervals_for_segment: Callable returning the cached bootstrap intervals of the current
+                                     reviews (see `feedback_mining.bootstrap.topic_intervals`), or None.
     """
     st.header("🔑Topic Modeling Insights")
     st.markdown("""
@@ -139,8 +289,34 @@ def render_topic_modeling(
         return
 
     st.subheader(f"💬 Interpreted Customer Discussion Themes (Based on {num_topics_config} Topics)")
-    display_lda_topics_for_view(lda_model, feature_names, 10, num_topics_config, topic_labels_config)
-    st.caption("The top 10 keywords are displayed for each theme to aid in its interpretation.")
+    show_wordclouds, wordcloud_sentiment = False, "All"
+    if wordcloud_paths:
+        display_col, sentiment_col = st.columns([1, 1])
+        with display_col:
+            show_wordclouds = st.radio("Show themes as:", KEYWORD_DISPLAY_OPTIONS, horizontal=True,
+                                       key="topic_keyword_display_selector") == KEYWORD_DISPLAY_OPTIONS[1]
+        if show_wordclouds:
+            with sentiment_col:
+                wordcloud_sentiment = WORDCLOUD_SENTIMENT_OPTIONS[st.selectbox(
+                    "Word clouds built from:", list(WORDCLOUD_SENTIMENT_OPTIONS), key="topic_wordcloud_sentiment_selector")]
+    display_lda_topics_for_view(lda_model, feature_names, 10, num_topics_config, topic_labels_config,
+                                wordcloud_paths if show_wordclouds else None, wordcloud_sentiment)
+    if show_wordclouds:
+        st.caption("Word size follows each word's weight in the theme; sentiment views weight it by the TF-IDF of that theme's "
+                   "reviews with the chosen sentiment. Images are rendered when the artifacts are built, over all reviews.")
+    else:
+        st.caption("The top 10 keywords are displayed for each theme to aid in its interpretation.")
+
+    st.markdown("---")
+    st.subheader("🧪 Topic Quality: How Coherent Is Each Theme?")
+    st.markdown("""
+    Coherence measures whether a theme's top keywords actually appear together in the same reviews.
+    **NPMI** compares how often each pair of top words co-occurs with how often it would by chance (from -1 to 1),
+    and **UMass** scores the same pairs by conditional document frequency (closer to 0 is better).
+    **Value:** Themes with low coherence are mixtures of unrelated words and their labels should be read with caution;
+    consistently low scores suggest trying a different number of topics.
+    """)
+    display_topic_coherence_for_view(topic_coherence_df, topic_labels_config)
     
     st.markdown("---")
     st.subheader("📊 Overall Distribution of Dominant Topics in Reviews")
@@ -181,6 +357,18 @@ def render_topic_modeling(
     else:
         st.info("Column 'dominant_lda_topic' is not available in the data. Cannot display overall topic distribution.")
 
+    if topic_intervals_for_segment is not None:
+        st.markdown("---")
+        st.subheader("📏 Are the Differences Between Themes Real?")
+        st.markdown("""
+        Average sentiment and ratings per theme are estimates from a sample of reviews. Bootstrap confidence intervals
+        show how much each average could move through sampling noise alone.
+        **Value:** Only act on a gap between two themes when its interval excludes zero; overlapping themes
+        should not be ranked against each other.
+        """)
+        with st.spinner("Bootstrapping the theme averages..."):
+            display_topic_intervals_for_view(topic_intervals_for_segment(), topic_labels_config)
+
     st.markdown("---")
     st.subheader("🔎 Deep Dive: Explore Reviews & Sentiment by Selected Topic")
     st.markdown("""
@@ -223,12 +411,24 @@ def render_topic_modeling(
                     col_rev_topic_ui, col_sent_dist_topic_ui = st.columns([3,2], gap="large")
 
                     with col_rev_topic_ui:
-                        st.markdown(f"##### Representative Customer Reviews (Max 5 Samples):")
-                        if not topic_specific_df_view.empty:
-                            for _, review_row in topic_specific_df_view[['Review Text', 'Rating', 'vader_sentiment_label']].head().iterrows():
+                        st.markdown(f"##### Representative Customer Reviews (Max {NUM_SAMPLE_REVIEWS} Samples):")
+                        sample_reviews_df = topic_specific_df_view.head(NUM_SAMPLE_REVIEWS)
+                        if doc_topic_matrix is not None:
+                            review_order_ui = st.radio(
+                                "Order sample reviews by:", options=REVIEW_ORDER_OPTIONS, horizontal=True,
+                                key="topic_review_order_selector",
+                                help="'Strongest match' picks the reviews with the highest probability for this theme."
+                            )
+                            if review_order_ui == REVIEW_ORDER_OPTIONS[1]:
+                                strongest_positions = strongest_rows(doc_topic_matrix, selected_numeric_topic_val, NUM_SAMPLE_REVIEWS,
+                                                                     df_processed.index.to_numpy())
+                                sample_reviews_df = df_processed.loc[strongest_positions]
+                        if not sample_reviews_df.empty:
+                            for review_position, review_row in sample_reviews_df[['Review Text', 'Rating', 'vader_sentiment_label']].iterrows():
                                 rating_stars = '⭐' * int(review_row['Rating']) if pd.notna(review_row['Rating']) and review_row['Rating'] > 0 else 'N/A'
                                 sentiment_label_review = review_row.get('vader_sentiment_label', 'N/A')
                                 
+                                mixture_html_review = topic_mixture_html(doc_topic_matrix[review_position], topic_labels_config) if doc_topic_matrix is not None else ""
                                 border_color_review = NEUTRAL_GREY 
                                 if sentiment_label_review == 'Positive': border_color_review = SUCCESS_GREEN
                                 elif sentiment_label_review == 'Negative': border_color_review = NEGATIVE_SENTIMENT_COLOR
@@ -239,7 +439,7 @@ def render_topic_modeling(
                                             padding: 12px 15px; margin-bottom: 12px; border-radius: 5px;
                                             box-shadow: 1px 1px 3px #ddd;">
                                     <small><b>Rating: {rating_stars}</b> | VADER Sentiment: <b>{sentiment_label_review}</b></small><br>
-                                    <p style="font-style: italic; margin-top: 5px;">"{review_row['Review Text']}"</p>
+                                    <p style="font-style: italic; margin-top: 5px;">"{review_row['Review Text']}"</p>{mixture_html_review}
                                 </div>
                                 """, unsafe_allow_html=True)
                         else:
@@ -247,8 +447,27 @@ def render_topic_modeling(
                     
                     with col_sent_dist_topic_ui:
                         st.markdown(f"##### Sentiment Distribution within '{selected_topic_label_ui}':")
-                        if not topic_specific_df_view.empty and 'vader_sentiment_label' in topic_specific_df_view.columns:
-                            topic_sent_counts_view = topic_specific_df_view['vader_sentiment_label'].value_counts().reset_index()
+                        sentiment_basis_ui = SENTIMENT_BASIS_OPTIONS[0]
+                        if aspect_sentiment is not None:
+                            sentiment_basis_ui = st.radio(
+                                "Measure sentiment on:", options=SENTIMENT_BASIS_OPTIONS, horizontal=True,
+                                key="topic_sentiment_basis_selector",
+                                help="'Whole reviews' uses each review's overall VADER label for reviews dominated by this theme. "
+                                     "'Sentences about this theme' scores only the sentences assigned to this theme, in any review."
+                            )
+                        if sentiment_basis_ui == SENTIMENT_BASIS_OPTIONS[1]:
+                            aspect_scores_view = topic_aspect_scores(aspect_sentiment, selected_numeric_topic_val, df_processed.index.to_numpy())
+                            topic_sent_counts_view = pd.Series(classify_sentiment(aspect_scores_view['compound'])).value_counts()
+                            if not aspect_scores_view.empty:
+                                st.caption(
+                                    f"{int(aspect_scores_view['n_sentences'].sum()):,} sentences about this theme in {len(aspect_scores_view):,} reviews. "
+                                    f"Mean compound about the theme: **{aspect_scores_view['compound'].mean():.3f}** "
+                                    f"(whole-review mean for its dominant reviews: {topic_specific_df_view['compound'].mean():.3f})."
+                                )
+                        else:
+                            topic_sent_counts_view = topic_specific_df_view['vader_sentiment_label'].value_counts()
+                        if not topic_sent_counts_view.empty:
+                            topic_sent_counts_view = topic_sent_counts_view[topic_sent_counts_view > 0].reset_index() # Categorical labels report unused categories as 0
                             topic_sent_counts_view.columns = ['Sentiment Label', 'Number of Reviews'] # Renamed for clarity
                             
                             if not topic_sent_counts_view.empty:
@@ -278,8 +497,18 @@ def render_topic_modeling(
                                 st.plotly_chart(fig_sentiment_per_topic, use_container_width=True)
                             else:
                                 st.info(f"No sentiment data to display for reviews under '{selected_topic_label_ui}'.")
-                        elif topic_specific_df_view.empty:
+                        else:
                              st.info(f"No reviews found for topic '{selected_topic_label_ui}' to analyze sentiment.")
+
+                    st.markdown(f"##### Export Reviews under '{selected_topic_label_ui}':")
+                    export_sentiments_ui = st.multiselect(
+                        "Sentiment of exported reviews:", options=SENTIMENT_LABELS, default=SENTIMENT_LABELS,
+                        key="topic_export_sentiment_selector",
+                        help="Downloads every matching review of this theme (not just the samples above), with its rating, sentiment and topic."
+                    )
+                    export_positions = filter_review_rows(df_processed, [selected_numeric_topic_val], export_sentiments_ui)
+                    export_stem = f"topic_{selected_numeric_topic_val}_" + ("_".join(label.lower() for label in export_sentiments_ui) or "none") + "_reviews"
+                    render_review_export(df_processed, export_positions, export_stem, key="topic_review_export")
             else:
                 st.warning(f"Selected topic '{selected_topic_label_ui}' could not be mapped to a numeric topic ID. Please check topic configurations.")
     else: